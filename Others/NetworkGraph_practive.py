@@ -16,11 +16,17 @@ This is a *toy example* to help you understand:
 // If experimenting in Python, you'd first do: pip install networkx matplotlib"""
 
 import networkx as nx
-import matplotlib.pyplot as plt
 import random
+import sys
+
+from fraud_graph import TransactionGraph, score
+from fraud_stream import StreamingFraudDetector
+
+# Drawing is optional: pass --no-plot for headless runs and batch jobs
+SHOW_PLOT = "--no-plot" not in sys.argv
 
 # STEP 1: Build a simple transaction network with customers & merchants
-G = nx.Graph()
+G = nx.DiGraph()  # Directed: every edge runs from payer to payee
 customers = ['Alice', 'Bob', 'Carol', 'Dave']
 merchants = ['StoreA', 'StoreB', 'StoreC', 'WeirdShop']
 
@@ -34,33 +40,46 @@ for customer in customers:
 G.add_edge('Dave', 'WeirdShop', amount=1000, time=11, fraud=True)
 
 # STEP 2: Plot the network
-pos = nx.spring_layout(G, seed=42)
-edge_colors = ['red' if G[u][v].get('fraud', False) else 'black' for u, v in G.edges()]
-labels = {}
-for u,v in G.edges():
-    labels[(u,v)] = f"${G[u][v]['amount']}"
+def plot_network(G):
+    import matplotlib.pyplot as plt  # Only needed when drawing
+
+    pos = nx.spring_layout(G, seed=42)
+    edge_colors = ['red' if G[u][v].get('fraud', False) else 'black' for u, v in G.edges()]
+    labels = {}
+    for u,v in G.edges():
+        labels[(u,v)] = f"${G[u][v]['amount']}"
+
+    nx.draw(G, pos, with_labels=True, node_color='skyblue', edge_color=edge_colors, node_size=1500, font_size=12)
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=labels)
+    plt.title("Transaction Network (Red = Potential Fraud!)")
+    plt.show()
 
-nx.draw(G, pos, with_labels=True, node_color='skyblue', edge_color=edge_colors, node_size=1500, font_size=12)
-nx.draw_networkx_edge_labels(G, pos, edge_labels=labels)
-plt.title("Transaction Network (Red = Potential Fraud!)")
-plt.show()
+if SHOW_PLOT:
+    plot_network(G)
 
 # STEP 3: Simple Fraud Detection Algorithm
 # We'll flag transactions if:
 #  - High dollar amount to a "new" merchant for that customer
 #  - Or to a merchant that is "unusual" (few customers go there)
 
+# The same rules run incrementally in fraud_stream.StreamingFraudDetector: transactions are
+# replayed in time order and each one is checked the moment it arrives, so this also works
+# on a live feed instead of a finished graph.
+
 def detect_fraud(G):
-    fraud_suspects = []
+    detector = StreamingFraudDetector(high_amount=500, min_popularity=2)
+    merchant_set = set(merchants)  # Set membership instead of scanning the list per edge
+    transactions = []
     for u, v, data in G.edges(data=True):
         # Only consider customer -> merchant edges
-        if u in customers and v in merchants:
-            is_new = G.number_of_edges(u, v) == 1
-            high_amt = data['amount'] > 500
-            merchant_popularity = G.degree(v)
-            # If large transfer and to a rarely used store, flag it
-            if high_amt and merchant_popularity < 2:
-                fraud_suspects.append((u, v, data['amount']))
+        if v in merchant_set:
+            transactions.append((data['time'], u, v, data['amount']))
+    transactions.sort()
+    fraud_suspects = []
+    for alert in detector.consume(transactions):
+        # If large transfer and to a rarely used store, flag it
+        if alert.rule == "rare_merchant":
+            fraud_suspects.append((alert.customer, alert.merchant, alert.amount))
     return fraud_suspects
 
 suspects = detect_fraud(G)
@@ -68,6 +87,13 @@ print("Potential Fraudulent Transactions Detected:")
 for u, v, amt in suspects:
     print(f" - {u} sent ${amt} to {v}")
 
+# STEP 4: Structural features on the array-backed graph (fraud_graph.py)
+# The same engine scores millions of historical transactions from CSV files:
+#   python fraud_graph.py score transactions.csv --out scores.csv
+features = score(TransactionGraph.from_networkx(G).features(burst_window=5))
+print("\nHighest structural risk scores:")
+print(features.sort_values("risk_score", ascending=False)[["out_degree", "in_degree", "cycles_2", "out_burst", "risk_score"]].head(3))
+
 # ALGORITHM SUMMARY:
 # 1. Build a network graph of users & merchants, each edge = transaction.
 # 2. Find rare patterns: very high transaction, or first-time visits, to odd merchants.
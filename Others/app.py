@@ -1,10 +1,22 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
-import requests
-import feedparser
 import random
+import uuid
 from datetime import datetime, timedelta
 
+# Shared modules (perf, policy retrieval, ...) live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingestion import (INDUSTRY_SEGMENTS, POOL, SOURCE_TTLS, TARGET_COUNTRIES, TENDER_STORE, DataIngestor,
+                       cpv_from_segment)
+from llm_client import configure
+from llm_scheduler import SchedulerBusy, get_scheduler
+from perf import begin_run, debug_panel, end_run, fragment_run, serve_metrics, traced
+from prefetch import PrefetchScheduler
+from signal_cache import SignalCache
+
 # --- PAGE CONFIGURATION (UX Enhancement) ---
 st.set_page_config(
     page_title="Bharat Export Intelligence",
@@ -12,6 +24,8 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+run = begin_run("command_center")  # Per-stage timings of this rerun; see perf.py
+serve_metrics()
 
 # --- CSS FOR "BETTER THAN EXIMGPT" LOOK ---
 st.markdown("""
@@ -38,77 +52,88 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+# Without a key the strategist falls back to the simulated reasoning below
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
+if GEMINI_API_KEY:
+    configure(GEMINI_API_KEY)
+
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex  # Fair-share key for the model request scheduler
+
 # --- CLASS 1: THE DATA INGESTION ENGINE (THE "EARS") ---
-class DataIngestor:
-    def __init__(self, target_country, cpv_code):
-        self.target_country = target_country
-        self.cpv_code = cpv_code
-
-    def get_demand_signals(self):
-        """Fetches Live Tenders from Opentender.eu"""
-        url = "https://opentender.eu/api/tender/search"
-        payload = {
-            "cpv": self.cpv_code,
-            "country": self.target_country,
-            "sort": "date-desc",
-            "limit": 10
-        }
-        try:
-            r = requests.post(url, json=payload)
-            data = r.json().get('data', [])
-            return [
-                {
-                    "Buyer": d.get('buyer', {}).get('name', 'Unknown'),
-                    "Title": d.get('title', 'N/A')[:80] + "...",
-                    "Value": f"{d.get('value', {}).get('amount', 0):,} EUR",
-                    "Deadline": d.get('bidDeadline', 'Check Doc')[:10],
-                    "Link": f"https://opentender.eu/{self.target_country.lower()}/tender/{d.get('id')}"
-                } for d in data
-            ]
-        except:
-            return []
-
-    def get_risk_signals(self):
-        """Fetches Live Regulatory News via RSS"""
-        # RSS feed looking for CBAM or Trade Compliance news
-        rss_url = "https://news.google.com/rss/search?q=CBAM+OR+EU+Import+Regulations+site:europa.eu&hl=en-IN&gl=IN&ceid=IN:en"
-        feed = feedparser.parse(rss_url)
-        return [
-            {
-                "Title": entry.title,
-                "Date": entry.published[:16],
-                "Link": entry.link,
-                "Risk_Level": "High" if "ban" in entry.title.lower() or "tax" in entry.title.lower() else "Medium"
-            } for entry in feed.entries[:5]
-        ]
-
-    def get_supply_signals(self):
-        """
-        Simulates UN Comtrade API v2.
-        (Real API requires a key, this mocks the logic for the UX demo)
-        """
-        # Logic: If you had a key, you'd hit https://comtradeapi.un.org/data/v1/get
-        # Here we simulate a "Competitor Gap Analysis"
-        return pd.DataFrame({
-            "Competitor": ["China", "Vietnam", "Turkey", "India"],
-            "Market_Share_Trend": [-5, 2, 1, 8], # India growing, China shrinking
-            "Avg_Unit_Price_EUR": [120, 115, 130, 110] # India is price competitive
-        })
+# Lives in ingestion.py: concurrent fetches with per-source deadlines
+
+@st.cache_resource
+def get_signal_cache():
+    # One cache per process, shared by every session and rerun
+    return SignalCache(ttls=SOURCE_TTLS, executor=POOL)
+
+@st.cache_resource
+def get_prefetcher():
+    # Keeps every sidebar market/industry combination warm in the shared cache, each source on its own TTL
+    grid = [(country, cpv_from_segment(segment)) for country in TARGET_COUNTRIES for segment in INDUSTRY_SEGMENTS]
+    return PrefetchScheduler(get_signal_cache(), grid, intervals=SOURCE_TTLS).start()
+
+@st.cache_resource
+def get_policy_index():
+    # scikit-learn/SciPy load with the index, on the first question rather than at startup
+    from policy_index import PolicyIndex
+    return PolicyIndex.load_or_build()
+
+# Memoized builders: reruns with unchanged signals reuse the DataFrame and figure
+@st.cache_data(max_entries=64)
+@traced("tender_table")
+def tender_table(demand):
+    return pd.DataFrame(demand)
+
+@st.cache_data(max_entries=64)
+@traced("supply_figure")
+def supply_figure(supply):
+    # Using Plotly for nice charts
+    import plotly.express as px
+    return px.bar(supply, x='Competitor', y='Market_Share_Trend', 
+                  color='Market_Share_Trend', 
+                  title="Market Share Growth (Last Qtr)",
+                  color_continuous_scale=['red', 'green'])
 
 # --- CLASS 2: THE RAG BRAIN (THE "MIND") ---
+ANSWER_TIMEOUT = 120  # Seconds a question may wait for the model before the panel gives up
+
 class RAGBrain:
-    def __init__(self, demand, risk, supply):
+    def __init__(self, demand, risk, supply, policy_index=None, scheduler=None, user="anonymous"):
+        self.policy_index = policy_index
+        self.scheduler = scheduler
+        self.user = user
         self.context = f"""
         DEMAND DATA: {len(demand)} active tenders found. Top buyer: {demand[0]['Buyer'] if demand else 'None'}.
         RISK DATA: {len(risk)} active alerts. Most recent: {risk[0]['Title'] if risk else 'None'}.
         SUPPLY DATA: India has +8% market share growth trend vs China -5%.
         """
+
+    @traced("rag.retrieve")
+    def retrieve(self, query, k=3):
+        """Top-k export-policy passages for the question (empty without an index)."""
+        return self.policy_index.search(query, k=k) if self.policy_index is not None else []
     
+    @traced("rag.ask")
     def ask(self, query):
         """
-        In a real production app, this sends 'self.context + query' to OpenAI/Claude.
-        Here, we simulate the 'Reasoning' based on the data inputs.
+        With a scheduler, sends 'self.prompt' (live context + retrieved policy
+        passages + query) to the model through the shared request queue.
+        Otherwise, we simulate the 'Reasoning' based on the data inputs.
         """
+        from policy_index import format_passages
+        passages = self.retrieve(query)
+        self.prompt = f"{self.context}\n        POLICY PASSAGES:\n{format_passages(passages)}\n\nQUESTION: {query}"
+        if self.scheduler is not None:
+            answer = self.scheduler.submit(self.prompt, self.user).result(timeout=ANSWER_TIMEOUT)
+        else:
+            answer = self._simulate(query)
+        if passages:
+            answer += "\n\n**Policy references:** " + "; ".join(f"{p['source']} p.{p['page']}" for p in passages)
+        return answer
+
+    def _simulate(self, query):
         # Simulation of LLM Reasoning
         if "worth" in query.lower() or "should i" in query.lower():
             return f"**Analysis:** Yes, the opportunity score is high.\n\n1. **Demand:** We found {len(demand_data)} active tenders (e.g., from {demand_data[0]['Buyer']}).\n2. **Supply:** Your pricing (110 EUR) is lower than China (120 EUR) and Turkey (130 EUR).\n3. **Risk:** Be aware of '{risk_data[0]['Title']}' - ensure compliance before bidding."
@@ -122,12 +147,15 @@ class RAGBrain:
 # Sidebar: Controls
 with st.sidebar:
     st.header("⚙️ GTM Configuration")
-    target_country = st.selectbox("Target EU Market", ["DE", "FR", "IT", "ES", "NL"], index=0)
-    industry = st.selectbox("Industry Segment", ["Industrial Machinery (42000000)", "Automotive Parts (34000000)", "Textiles (19000000)"])
-    cpv_code = industry.split("(")[1].replace(")", "")
+    target_country = st.selectbox("Target EU Market", TARGET_COUNTRIES, index=0)
+    industry = st.selectbox("Industry Segment", INDUSTRY_SEGMENTS)
+    cpv_code = cpv_from_segment(industry)
     
     st.divider()
     st.info("Data Sources Active:\n✅ TED (EU Tenders)\n✅ Google News (Regs)\n✅ UN Comtrade (Trade Flow)")
+    cache_stats = get_signal_cache().stats()
+    st.caption(f"Signal cache: {cache_stats['hit_rate']:.0%} hit rate "
+               f"({cache_stats['hits'] + cache_stats['stale_hits']} hits / {cache_stats['misses']} misses)")
 
 # Main Header
 st.title(f"🚀 GTM Command Center: Exporting to {target_country}")
@@ -135,16 +163,30 @@ st.markdown("Real-time Intelligence for Indian Mid-sized Manufacturers")
 st.divider()
 
 # Load Data
-ingestor = DataIngestor(target_country, cpv_code)
+get_prefetcher()  # Started once per process, on the first page load
+ingestor = DataIngestor(target_country, cpv_code, cache=get_signal_cache())
 with st.spinner('Connecting to EU Data Pipelines...'):
-    demand_data = ingestor.get_demand_signals()
-    risk_data = ingestor.get_risk_signals()
-    supply_df = ingestor.get_supply_signals()
+    signals, missing_sources = ingestor.fetch_all()
+demand_data, risk_data, supply_df = signals["demand"], signals["risk"], signals["supply"]
+if missing_sources:
+    st.warning(f"Showing partial results: {', '.join(missing_sources)} signals did not respond in time.")
+
+def freshness(source):
+    # Stored by whichever fetch got there last: this page, a background refresh or the prefetcher
+    refreshed_at = get_signal_cache().stored_at(source, ingestor.cache_params(source))
+    if refreshed_at is None:
+        return f"{source}: pending"
+    return f"{source}: {int((datetime.now().timestamp() - refreshed_at) // 60)} min ago"
+
+st.caption("Data refreshed — " + " · ".join(freshness(source) for source in DataIngestor.SOURCES))
 
 # Top Level Metrics (The Dashboard Feel)
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric(label="Active Procurement Leads", value=len(demand_data), delta="+2 from yesterday")
+    today = datetime.now().date()
+    new_leads = TENDER_STORE.count_published_since(target_country, cpv_code, (today - timedelta(days=1)).isoformat())
+    active_leads = TENDER_STORE.count_active(target_country, cpv_code, today.isoformat())
+    st.metric(label="Active Procurement Leads", value=active_leads, delta=f"+{new_leads} from yesterday")
 with col2:
     st.metric(label="Compliance Risk Level", value="Medium", delta_color="off")
 with col3:
@@ -153,7 +195,11 @@ with col3:
 # Tabs for Deep Dive
 tab1, tab2, tab3, tab4 = st.tabs(["🤖 AI Strategist (RAG)", "📋 Demand Signals", "⚠️ Regulatory Risk", "🏭 Supply Intel"])
 
-with tab1:
+# A fragment: sending a chat message reruns only the strategist panel, not the
+# ingestion, metrics and charts around it (and is timed as its own run)
+@st.fragment
+@fragment_run("command_center.strategist")
+def strategist_panel(demand, risk, supply):
     st.subheader("Talk to your Market Data")
     st.markdown("Ask strategic questions like: *'Is it worth bidding right now?'* or *'Who are my competitors?'*")
     
@@ -166,18 +212,26 @@ with tab1:
             st.write(user_query)
         
         # Generate & Display RAG Response
-        brain = RAGBrain(demand_data, risk_data, supply_df)
-        response = brain.ask(user_query)
+        brain = RAGBrain(demand, risk, supply, policy_index=get_policy_index(),
+                         scheduler=get_scheduler() if GEMINI_API_KEY else None, user=st.session_state.session_id)
         
         with st.chat_message("assistant"):
-            st.markdown(response)
-            st.caption("Generated using live context from TED & Eurostat")
+            try:
+                st.markdown(brain.ask(user_query))
+                st.caption("Generated using live context from TED & Eurostat")
+            except (SchedulerBusy, TimeoutError) as exc:
+                st.warning(str(exc))
+            except Exception as exc:
+                # Provider errors (bad key, 4xx) and transient ones that outlived the retries
+                st.warning(f"The assistant could not answer this question: {exc}")
+
+with tab1:
+    strategist_panel(demand_data, risk_data, supply_df)
 
 with tab2:
     st.subheader(f"Live Tenders in {target_country}")
     if demand_data:
-        df_demand = pd.DataFrame(demand_data)
-        st.dataframe(df_demand, use_container_width=True, hide_index=True, column_config={
+        st.dataframe(tender_table(demand_data), use_container_width=True, hide_index=True, column_config={
             "Link": st.column_config.LinkColumn("Tender URL")
         })
     else:
@@ -186,7 +240,7 @@ with tab2:
 with tab3:
     st.subheader("Compliance & Risk Monitor (CBAM/RoDTEP)")
     for news in risk_data:
-        color = "red" if news["Risk_Level"] == "High" else "orange"
+        color = {"High": "red", "Medium": "orange"}.get(news["Risk_Level"], "green")
         st.markdown(f"**[:{color}[{news['Risk_Level']}]] [{news['Title']}]({news['Link']})**")
         st.caption(f"Published: {news['Date']}")
         st.divider()
@@ -195,12 +249,10 @@ with tab4:
     st.subheader("Competitor Gap Analysis")
     st.markdown("Comparative Advantage vs. Top Exporters to EU")
     
-    # Using Plotly for nice charts
-    import plotly.express as px
-    fig = px.bar(supply_df, x='Competitor', y='Market_Share_Trend', 
-                 color='Market_Share_Trend', 
-                 title="Market Share Growth (Last Qtr)",
-                 color_continuous_scale=['red', 'green'])
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(supply_figure(supply_df), use_container_width=True)
     
-    st.dataframe(supply_df, hide_index=True)
\ No newline at end of file
+    st.dataframe(supply_df, hide_index=True)
+
+# --- PERFORMANCE ---
+end_run(run)
+debug_panel(run)
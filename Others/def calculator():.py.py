@@ -3,8 +3,21 @@
 # Below, the calculator is provided as a web app with routes for user input and result display.
 # Note: To run this, you need to install Flask (`pip install flask`).
 
-from flask import Flask, render_template_string, request # Import necessary Flask functions
+from flask import Flask, Response, jsonify, render_template_string, request # Import necessary Flask functions
+import json  # For parsing batch requests and writing NDJSON lines
 import math  # Import math for scientific calculations
+import os
+import sys
+from functools import lru_cache  # Caches parsed batches and rate tables between requests
+
+import numpy as np  # Vectorized landed-cost maths over whole batches
+
+# Shared modules (compliance duty tables, ...) live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compliance import DUTY_TABLE, EU_MFN_DUTY
+from perf import begin_run, count, end_run, prometheus_text, stage, traced
+from trade_store import USD_TO_EUR
 
 app = Flask(__name__)  # Initialize the Flask app
 
@@ -103,6 +116,157 @@ def calculator():
     # Render the web page with form and result
     return render_template_string(template, result=result)
 
+# --- BATCH LANDED-COST API ---
+# POST /landed-cost with a JSON body of shipment columns (or a list of shipment objects):
+#   {"shipments": {"value": [...], "currency": [...], "hs_code": [...], "duty_rate": [...],
+#                  "cbam_charge": [...], "freight": [...], "insurance": [...], "fx_rate": [...]}}
+# Only "value" is required. Landed cost (EUR) = CIF value in EUR + import duty on it + CBAM charge.
+# Small batches come back as one JSON document; large ones (or Accept: application/x-ndjson)
+# are streamed as one JSON line per shipment followed by a totals line.
+
+STREAM_ROWS = 5000  # Batches larger than this are streamed as NDJSON
+STREAM_BLOCK = 10000  # Shipments serialized per streamed chunk
+FX_RATES_PATH = os.environ.get("GTM_FX_RATES")  # Optional JSON {"USD": 0.92, ...} (EUR per unit)
+NUMERIC_COLUMNS = ("value", "duty_rate", "cbam_charge", "freight", "insurance", "fx_rate")
+POSITIVE_COLUMNS = ("fx_rate",)  # Must be > 0; every other numeric column must be >= 0
+OUTPUT_COLUMNS = ("customs_value_eur", "duty_eur", "cbam_eur", "landed_cost_eur")
+
+
+def _fx_mtime():
+    return os.path.getmtime(FX_RATES_PATH) if FX_RATES_PATH and os.path.exists(FX_RATES_PATH) else None
+
+
+@lru_cache(maxsize=4)
+def fx_rates(mtime):
+    # Keyed on the file's mtime, so an edited rate file is picked up without a restart
+    rates = {"EUR": 1.0, "USD": USD_TO_EUR}
+    if mtime is not None:
+        with open(FX_RATES_PATH, encoding="utf-8") as f:
+            rates.update({k.upper(): float(v) for k, v in json.load(f).items()})
+    return rates
+
+
+@lru_cache(maxsize=64)
+@traced("landed_cost.parse")
+def parse_batch(body):
+    """Parses a raw request body into NumPy columns; ERP re-submissions of the same batch skip this."""
+    payload = json.loads(body)
+    shipments = payload.get("shipments") if isinstance(payload, dict) else None
+    if isinstance(shipments, list):
+        # Row-oriented input: one object per shipment
+        shipments = {k: [row.get(k) for row in shipments] for k in set().union(*shipments)} if shipments else {}
+    if not isinstance(shipments, dict) or "value" not in shipments:
+        raise ValueError('Expected {"shipments": ...} with at least a "value" column.')
+
+    n = len(shipments["value"])
+    columns = {}
+    for name, values in shipments.items():
+        if len(values) != n:
+            raise ValueError(f'Column "{name}" has {len(values)} entries, expected {n}.')
+        if name in NUMERIC_COLUMNS:
+            # None (JSON null) becomes NaN and falls back to the column default below
+            columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            _check_range(name, columns[name][[v is not None for v in values]])
+        elif name in ("hs_code", "currency"):
+            columns[name] = np.array(["" if v is None else str(v) for v in values])
+    for array in columns.values():
+        array.flags.writeable = False  # Shared by every request that hits this cache entry
+    return n, columns
+
+
+def _check_range(name, given):
+    # json.loads accepts NaN / Infinity / 1e309, which would come back out as invalid JSON
+    if not np.isfinite(given).all():
+        raise ValueError(f'Column "{name}" has a non-finite number.')
+    if (given <= 0 if name in POSITIVE_COLUMNS else given < 0).any():
+        raise ValueError(f'Column "{name}" must be {"positive" if name in POSITIVE_COLUMNS else "non-negative"}.')
+
+
+@traced("landed_cost.compute")
+def landed_costs(n, columns, rates):
+    """Vectorized landed cost for every shipment; returns the output columns as arrays."""
+    value = columns["value"]
+    freight = np.nan_to_num(columns.get("freight", np.zeros(n)))
+    insurance = np.nan_to_num(columns.get("insurance", np.zeros(n)))
+
+    # FX: explicit per-line rate, otherwise the currency's rate from the rate table
+    fx = columns.get("fx_rate", np.full(n, np.nan)).copy()
+    missing = np.isnan(fx)
+    if missing.any():
+        currencies = columns.get("currency", np.full(n, "EUR"))[missing]
+        codes, inverse = np.unique(np.char.upper(np.where(currencies == "", "EUR", currencies)), return_inverse=True)
+        unknown = [c for c in codes if c not in rates]
+        if unknown:
+            raise ValueError(f"No FX rate for {', '.join(unknown)}; pass fx_rate for those shipments.")
+        fx[missing] = np.array([rates[c] for c in codes])[inverse]
+
+    # Duty: explicit per-line rate (%), otherwise the EU MFN rate for the HS chapter
+    duty_rate = columns.get("duty_rate", np.full(n, np.nan)).copy()
+    missing = np.isnan(duty_rate)
+    if missing.any():
+        chapters = np.full(missing.sum(), -1)
+        if "hs_code" in columns:
+            heads = columns["hs_code"][missing].astype("<U2")  # Chapter = first two digits
+            numeric = np.char.isdigit(heads) & (np.char.str_len(heads) == 2)
+            chapters[numeric] = heads[numeric].astype(np.int64)
+        duty_rate[missing] = np.where(chapters >= 0, DUTY_TABLE[chapters], EU_MFN_DUTY)
+
+    cbam = np.nan_to_num(columns.get("cbam_charge", np.zeros(n)))
+    with np.errstate(over="ignore"):  # Overflow is reported below as a 400
+        customs_value = (value + freight + insurance) * fx
+        duty = customs_value * duty_rate / 100
+        landed = customs_value + duty + cbam
+    if not np.isfinite(landed.sum()):
+        raise ValueError("Landed costs overflow; check the magnitude of value, freight and fx_rate.")
+    return dict(zip(OUTPUT_COLUMNS, (customs_value, duty, cbam, landed)))
+
+
+# Filled with str.format: several times faster than json.dumps per line (floats repr as valid JSON)
+NDJSON_LINE = "{{" + ", ".join(f'"{c}": {{}}' for c in ("line",) + OUTPUT_COLUMNS) + "}}\n"
+
+
+def iter_ndjson(n, results):
+    # One JSON object per shipment, serialized a block at a time so memory stays flat
+    for start in range(0, n, STREAM_BLOCK):
+        block = zip(range(start, min(start + STREAM_BLOCK, n)),
+                    *(np.round(results[c][start:start + STREAM_BLOCK], 2).tolist() for c in OUTPUT_COLUMNS))
+        yield "".join(NDJSON_LINE.format(*row) for row in block)
+    yield json.dumps({"totals": {c: round(float(results[c].sum()), 2) for c in OUTPUT_COLUMNS}}) + "\n"
+
+
+@app.route('/landed-cost', methods=['POST'])
+def landed_cost():
+    run = begin_run("landed_cost")  # Streamed responses are timed up to the first byte
+    try:
+        body = request.get_data()
+        count("bytes_received", len(body))
+        misses = parse_batch.cache_info().misses
+        n, columns = parse_batch(body)
+        count("cache_lookups", cache="parsed_batch", result="miss" if parse_batch.cache_info().misses > misses else "hit")
+        if np.isnan(columns["value"]).any():
+            raise ValueError('Every shipment needs a numeric "value".')
+        results = landed_costs(n, columns, fx_rates(_fx_mtime()))
+    except (ValueError, TypeError, AttributeError) as exc:
+        # Malformed JSON, ragged columns, non-numeric values or unknown currencies
+        end_run(run)
+        return jsonify(error=str(exc)), 400
+
+    count("shipments_priced", n)
+    if n > STREAM_ROWS or request.accept_mimetypes.best == "application/x-ndjson":
+        end_run(run)
+        return Response(iter_ndjson(n, results), mimetype="application/x-ndjson")
+    with stage("landed_cost.serialize"):
+        response = jsonify(lines={c: np.round(results[c], 2).tolist() for c in OUTPUT_COLUMNS},
+                           totals={c: round(float(results[c].sum()), 2) for c in OUTPUT_COLUMNS})
+    end_run(run)
+    return response
+
+
+# Latency histograms and counters for scraping (see perf.py)
+@app.route('/metrics')
+def metrics():
+    return Response(prometheus_text(), mimetype="text/plain; version=0.0.4")
+
 # Main entry point to run the web server
 # To run: `python filename.py` in terminal and browse to http://localhost:5000/
 if __name__ == '__main__':
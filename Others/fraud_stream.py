@@ -0,0 +1,117 @@
+"""Streaming transaction fraud detector.
+
+Transactions are consumed one at a time and checked against per-merchant
+state kept incrementally over a sliding time window: transaction count,
+amount sum and sum of squares, and distinct customers (the merchant's degree
+in the transaction graph). Expired transactions are subtracted from that
+state as the window slides, so each update is O(1) amortized and memory is
+bounded by the window (and `max_events`). Alerts are returned the moment a
+rule fires.
+
+Rules:
+    rare_merchant  large amount to a merchant few customers use (the batch rule
+                   from NetworkGraph_practive.detect_fraud)
+    amount_spike   amount far above the merchant's mean in the window
+    new_pair_high  large amount on a customer's first transaction with the merchant
+"""
+import math
+from collections import deque
+from typing import NamedTuple
+
+
+class Alert(NamedTuple):
+    time: float
+    customer: str
+    merchant: str
+    amount: float
+    rule: str
+    detail: str
+
+
+class _MerchantState:
+    __slots__ = ("count", "total", "total_sq", "customers")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.customers = {}  # customer -> transactions in the window
+
+    def add(self, customer, amount, sign=1):
+        self.count += sign
+        self.total += sign * amount
+        self.total_sq += sign * amount * amount
+        seen = self.customers.get(customer, 0) + sign
+        if seen:
+            self.customers[customer] = seen
+        else:
+            del self.customers[customer]
+
+
+class StreamingFraudDetector:
+    def __init__(self, window=3600, high_amount=500, min_popularity=2, spike_factor=5.0, min_history=5,
+                 max_events=1_000_000):
+        self.window = window  # in the same unit as transaction times (seconds by default)
+        self.high_amount = high_amount
+        self.min_popularity = min_popularity
+        self.spike_factor = spike_factor
+        self.min_history = min_history  # merchant transactions needed before amount_spike applies
+        self.max_events = max_events
+        self._events = deque()  # (time, customer, merchant, amount), oldest first
+        self._merchants = {}  # merchant -> _MerchantState
+        self.processed = 0
+        self.alerts = 0
+
+    def _expire(self, now):
+        events, merchants = self._events, self._merchants
+        while events and (events[0][0] <= now - self.window or len(events) >= self.max_events):
+            _, customer, merchant, amount = events.popleft()
+            state = merchants[merchant]
+            state.add(customer, amount, -1)
+            if not state.count:
+                del merchants[merchant]
+
+    def process(self, time, customer, merchant, amount):
+        """Adds one transaction and returns the alerts it triggers (usually none)."""
+        self._expire(time)
+        state = self._merchants.get(merchant)
+        if state is None:
+            state = self._merchants[merchant] = _MerchantState()
+
+        alerts = []
+        high = amount > self.high_amount
+        if high and customer not in state.customers:
+            alerts.append(Alert(time, customer, merchant, amount, "new_pair_high",
+                                f"first transaction with {merchant} in the window"))
+        if state.count >= self.min_history:
+            mean = state.total / state.count
+            std = math.sqrt(max(state.total_sq / state.count - mean * mean, 0.0))
+            if amount > mean * self.spike_factor and amount > mean + 3 * std:
+                alerts.append(Alert(time, customer, merchant, amount, "amount_spike",
+                                    f"{amount / mean:.1f}x the merchant's mean of {mean:.2f}"))
+
+        state.add(customer, amount)
+        self._events.append((time, customer, merchant, amount))
+        popularity = len(state.customers)
+        if high and popularity < self.min_popularity:
+            alerts.append(Alert(time, customer, merchant, amount, "rare_merchant",
+                                f"{popularity} customer(s) in the window"))
+
+        self.processed += 1
+        self.alerts += len(alerts)
+        return alerts
+
+    def consume(self, transactions):
+        """Yields alerts from an iterable of (time, customer, merchant, amount), in time order."""
+        for transaction in transactions:
+            yield from self.process(*transaction)
+
+    def merchant_stats(self, merchant):
+        state = self._merchants.get(merchant)
+        if state is None:
+            return {"transactions": 0, "customers": 0, "mean_amount": 0.0}
+        return {"transactions": state.count, "customers": len(state.customers),
+                "mean_amount": state.total / state.count}
+
+    def __len__(self):
+        return len(self._events)
@@ -1,8 +1,17 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+# Shared modules (chart data layer, ...) live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chart_data import CHART_WIDTH, ChartSeries, period_index, point_budget
+from perf import begin_run, debug_panel, end_run, serve_metrics, traced
+from trade_store import TradeFlowStore
+
 # --- 1. THE PROBLEM SOLVING LAYER (JTBD: DATA ACCURACY) ---
 # In a real app, this replaces hardcoded data with live API calls to UN Comtrade
 def get_compliance_data(hs_code):
@@ -14,8 +23,65 @@ def get_compliance_data(hs_code):
     }
     return database.get(hs_code, {"name": "Generic Product", "fta": "Check Tariff", "cbam": False, "scomet": False, "desc": "General Category"})
 
+@st.cache_resource
+def get_trade_store():
+    # Memory-mapped Comtrade flows, shared by every session (see trade_store.py)
+    return TradeFlowStore()
+
+# The demand chart sits in 2 of 5 columns; bars get ~8 px each
+DEMAND_POINTS = point_budget(CHART_WIDTH * 2 / 5, px_per_point=8)
+
+@st.cache_resource(max_entries=256)
+@traced("demand_series")
+def demand_series(hs_code, country):
+    # Totals at every granularity, computed once per selection and shared by every session
+    demand = get_trade_store().import_demand(hs_code, country)
+    if demand.empty:
+        return None
+    return ChartSeries(pd.DataFrame({
+        'Value': (demand['Value'] / 1e6).to_numpy(),    # M €
+        'Volume': (demand['Volume'] / 1e3).to_numpy()   # kg -> MT
+    }, index=period_index(demand['Period'])))
+
+# Figures are memoized per (HS code, market): reruns that don't change the
+# selection reuse them instead of re-querying the store and rebuilding Plotly objects
+@st.cache_data(max_entries=256)
+@traced("demand_figure")
+def demand_figure(hs_code, country, budget=DEMAND_POINTS):
+    """Returns (figure, granularity); long histories are shown at the finest granularity that fits `budget`."""
+    series = demand_series(hs_code, country)
+    granularity = None
+    if series is not None:
+        granularity, frame = series.at(budget, 'Value')
+        df_trend = pd.DataFrame({'Month': frame.index, 'Value': frame['Value'], 'Volume': frame['Volume']})
+    else:
+        # Simulated Trend Data (no Comtrade bulk data loaded for this selection)
+        df_trend = pd.DataFrame({
+            'Month': ['Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+            'Value': [10, 12, 11, 15, 19, 18],
+            'Volume': [100, 115, 108, 140, 170, 165]
+        })
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=df_trend['Month'], y=df_trend['Value'], name="Value (M €)", marker_color='#004d99'))
+    fig.add_trace(go.Scatter(x=df_trend['Month'], y=df_trend['Volume'], name="Volume (MT)", yaxis="y2", line=dict(color="#ff9900")))
+    fig.update_layout(yaxis2=dict(overlaying="y", side="right"), height=350, margin=dict(l=0, r=0, t=30, b=0))
+    return fig, granularity
+
+@st.cache_data(max_entries=256)
+@traced("competitor_figure")
+def competitor_figure(hs_code, country):
+    # Comparison vs Competitor (top suppliers to the selected market, plus India)
+    gap = get_trade_store().competitor_gap(hs_code, country, top=2)
+    if not gap.empty:
+        comp_df = pd.DataFrame({'Entity': gap['Competitor'], 'Unit Price (€)': gap['Avg_Unit_Price_EUR']})
+    else:
+        comp_df = pd.DataFrame({'Entity': ['India', 'China', 'Turkey'], 'Unit Price (€)': [110, 125, 140]})
+    return px.bar(comp_df, x='Entity', y='Unit Price (€)', color='Entity', color_discrete_sequence=['green', 'red', 'blue'])
+
 # --- 2. THE UI/UX FRAMEWORK (JTBD: EASE OF USE) ---
 st.set_page_config(page_title="Bharat-EU Export Engine", layout="wide")
+run = begin_run("export_engine")  # Per-stage timings of this rerun; see perf.py
+serve_metrics()
 
 # Dashboard Styling
 st.markdown("""
@@ -26,7 +92,9 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # SIDEBAR: THE ANALYST (Secondary Support)
-with st.sidebar:
+# A fragment: asking a question reruns only this panel, not the charts below
+@st.fragment
+def analyst_panel():
     st.title("🤖 Strategy Analyst")
     st.markdown("I monitor your dashboard for risks.")
     query = st.text_input("Ask a specific strategy question:")
@@ -35,6 +103,9 @@ with st.sidebar:
     st.divider()
     st.caption("v1.2 | Data: Eurostat & DGFT Live")
 
+with st.sidebar:
+    analyst_panel()
+
 # MAIN DASHBOARD (Primary Job)
 st.title("🚀 Bharat-EU Export Command Center")
 
@@ -58,24 +129,14 @@ c1, c2, c3 = st.columns([2, 2, 1])
 
 with c1:
     st.subheader("Import Demand Trend")
-    # Simulated Trend Data
-    df_trend = pd.DataFrame({
-        'Month': ['Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
-        'Value': [10, 12, 11, 15, 19, 18],
-        'Volume': [100, 115, 108, 140, 170, 165]
-    })
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=df_trend['Month'], y=df_trend['Value'], name="Value (M €)", marker_color='#004d99'))
-    fig.add_trace(go.Scatter(x=df_trend['Month'], y=df_trend['Volume'], name="Volume (MT)", yaxis="y2", line=dict(color="#ff9900")))
-    fig.update_layout(yaxis2=dict(overlaying="y", side="right"), height=350, margin=dict(l=0, r=0, t=30, b=0))
+    fig, granularity = demand_figure(search, country)
     st.plotly_chart(fig, use_container_width=True)
+    if granularity not in (None, "period"):
+        st.caption(f"Totals per {granularity} (full history, aggregated to fit the chart)")
 
 with c2:
     st.subheader("Competitive Gap")
-    # Comparison vs Competitor (China/Turkey)
-    comp_df = pd.DataFrame({'Entity': ['India', 'China', 'Turkey'], 'Unit Price (€)': [110, 125, 140]})
-    fig_comp = px.bar(comp_df, x='Entity', y='Unit Price (€)', color='Entity', color_discrete_sequence=['green', 'red', 'blue'])
-    st.plotly_chart(fig_comp, use_container_width=True)
+    st.plotly_chart(competitor_figure(search, country), use_container_width=True)
 
 with c3:
     st.subheader("Compliance Pulse")
@@ -103,4 +164,8 @@ with s2:
         st.write("The EU Importer will require your 'Embedded Emissions' report quarterly. Failure to provide this will result in a €50/tonne penalty.")
     else:
         st.info("ℹ️ FTA ADVANTAGE")
-        st.write(f"Utilize the {product['fta']} to gain a landing cost advantage over non-FTA countries.")
\ No newline at end of file
+        st.write(f"Utilize the {product['fta']} to gain a landing cost advantage over non-FTA countries.")
+
+# --- PERFORMANCE ---
+end_run(run)
+debug_panel(run)
@@ -0,0 +1,177 @@
+"""Signal ingestion for the GTM Command Center (Others/app.py).
+
+All sources are fetched at the same time on a shared thread pool over pooled
+keep-alive connections. Every source has its own deadline, so the page waits
+about as long as the slowest source that answers in time, and one hung
+upstream only blanks its own panel.
+"""
+import concurrent.futures as cf
+import os
+import time
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from perf import bind, count, record_response, stage, traced
+from risk_monitor import RiskMonitor
+from signal_cache import STALE
+from tender_store import TenderStore
+from trade_store import TradeFlowStore
+
+TENDER_URL = os.environ.get("GTM_TENDER_URL", "https://opentender.eu/api/tender/search")
+
+# The sidebar grid: every combination is prefetched in the background
+TARGET_COUNTRIES = ["DE", "FR", "IT", "ES", "NL"]
+INDUSTRY_SEGMENTS = ["Industrial Machinery (42000000)", "Automotive Parts (34000000)", "Textiles (19000000)"]
+# HS prefix used for trade-flow analytics of each CPV segment
+CPV_HS_PREFIX = {"42000000": "84", "34000000": "8708", "19000000": "52"}
+
+CONNECT_TIMEOUT = 3.05
+# Seconds each source may take before the dashboard renders without it
+SOURCE_DEADLINES = {"demand": 8.0, "risk": 5.0, "supply": 5.0}
+# Seconds a cached result is served as fresh before it is revalidated in the background
+SOURCE_TTLS = {"demand": 900, "risk": 600, "supply": 3600}
+EMPTY_SIGNALS = {
+    "demand": list,
+    "risk": list,
+    "supply": lambda: pd.DataFrame(columns=["Competitor", "Market_Share_Trend", "Avg_Unit_Price_EUR"]),
+}
+
+
+def build_session(pool_size=32):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(record_response)  # Counts bytes fetched per host
+    return session
+
+
+# Shared by every Streamlit session in the process
+SESSION = build_session()
+POOL = cf.ThreadPoolExecutor(max_workers=32, thread_name_prefix="ingest")
+TENDER_STORE = TenderStore()
+RISK_MONITOR = RiskMonitor()
+TRADE_STORE = TradeFlowStore()
+# Tenders shown in the Demand Signals tab; the full history stays in the store
+DEMAND_ROWS = 50
+RISK_ROWS = 20
+
+
+def cpv_from_segment(segment):
+    return segment.split("(")[1].replace(")", "")
+
+
+class DataIngestor:
+    SOURCES = ("demand", "risk", "supply")
+    # Same result for every market and industry (the regulatory news feeds)
+    SHARED_SOURCES = ("risk",)
+
+    def __init__(self, target_country, cpv_code, session=SESSION, cache=None, tender_store=TENDER_STORE,
+                 risk_monitor=RISK_MONITOR):
+        self.target_country = target_country
+        self.cpv_code = cpv_code
+        self.session = session
+        self.cache = cache
+        self.tender_store = tender_store
+        self.risk_monitor = risk_monitor
+        self.params = (target_country, cpv_code)
+
+    def cache_params(self, source):
+        """Cache key params of a source: shared sources have one entry for every market."""
+        return () if source in self.SHARED_SOURCES else self.params
+
+    def _timeout(self, source):
+        return (CONNECT_TIMEOUT, SOURCE_DEADLINES[source])
+
+    @traced("ingest.demand")
+    def get_demand_signals(self):
+        """Syncs new tenders from Opentender.eu into the local history, then reads from it"""
+        try:
+            self.tender_store.sync(self.session, TENDER_URL, self.target_country, self.cpv_code,
+                                   timeout=self._timeout("demand"))
+        except requests.RequestException:
+            if not self.tender_store.count(self.target_country, self.cpv_code):
+                raise
+            # Upstream unavailable: fall back to the stored history
+        return [
+            {
+                "Buyer": buyer,
+                "Title": title[:80] + "...",
+                "Value": f"{amount:,.0f} EUR",
+                "Deadline": deadline,
+                "Link": f"https://opentender.eu/{self.target_country.lower()}/tender/{tender_id}"
+            } for tender_id, buyer, title, amount, deadline
+            in self.tender_store.recent(self.target_country, self.cpv_code, limit=DEMAND_ROWS)
+        ]
+
+    @traced("ingest.risk")
+    def get_risk_signals(self):
+        """Polls the regulatory news feeds for new items, then reads classified items from the store"""
+        try:
+            self.risk_monitor.poll(self.session, timeout=self._timeout("risk"))
+        except requests.RequestException:
+            if not self.risk_monitor.count():
+                raise
+        return [
+            {
+                "Title": title,
+                "Date": published[:16],
+                "Link": link,
+                "Risk_Level": risk_level
+            } for title, published, link, risk_level in self.risk_monitor.recent(limit=RISK_ROWS)
+        ]
+
+    @traced("ingest.supply")
+    def get_supply_signals(self):
+        """
+        Competitor Gap Analysis from the local Comtrade trade-flow store.
+        Falls back to demo figures when no bulk data is loaded for this market.
+        """
+        gap = TRADE_STORE.competitor_gap(CPV_HS_PREFIX.get(self.cpv_code, ""), self.target_country)
+        if not gap.empty:
+            return gap
+        # Load bulk files with `python trade_store.py import ...` to replace these
+        return pd.DataFrame({
+            "Competitor": ["China", "Vietnam", "Turkey", "India"],
+            "Market_Share_Trend": [-5, 2, 1, 8], # India growing, China shrinking
+            "Avg_Unit_Price_EUR": [120, 115, 130, 110] # India is price competitive
+        })
+
+    @traced("ingest.fetch_all")
+    def fetch_all(self):
+        """
+        Fetches every source concurrently, serving cached results where possible.
+        Returns (signals, missing): sources that failed or missed their deadline
+        get an empty result and are listed in `missing`.
+        """
+        started = time.monotonic()
+        signals, missing, futures = {}, [], {}
+        for name in self.SOURCES:
+            # bind(): timings from the pool threads land on the rerun that asked for them
+            fetch = getattr(self, f"get_{name}_signals")
+            if self.cache is None:
+                futures[name] = POOL.submit(bind(fetch))
+                continue
+            params = self.cache_params(name)
+            value, state = self.cache.get(name, params)
+            count("cache_lookups", cache="signals", result=state or "miss")
+            if state == STALE:
+                self.cache.refresh_async(name, params, fetch)
+            if state is not None:
+                signals[name] = value
+            else:
+                futures[name] = POOL.submit(bind(self.cache.fetch_and_store), name, params, fetch)
+
+        for name, future in futures.items():
+            remaining = SOURCE_DEADLINES[name] - (time.monotonic() - started)
+            try:
+                with stage(f"ingest.wait.{name}"):
+                    signals[name] = future.result(timeout=max(remaining, 0))
+            except Exception:
+                # Timed out or failed upstream; a late result still lands in the cache
+                signals[name] = EMPTY_SIGNALS[name]()
+                missing.append(name)
+                count("sources_missing", source=name)
+        return signals, missing
@@ -0,0 +1,93 @@
+"""Background prefetcher that keeps the whole sidebar grid warm.
+
+Every (market, industry) combination offered in the sidebar is refreshed on
+a schedule into the shared SignalCache, so switching selections is served
+from warm data. Each source is refreshed on its own interval (its TTL), counted
+from when its cache entry was last stored, whether by the prefetcher or by a
+page fetch. Sources that do not depend on the selection have a single cache
+entry and are fetched once per cycle. Refreshes run on a small bounded
+pool, and an upstream that errors is backed off exponentially (with jitter)
+for all of its entries.
+"""
+import concurrent.futures as cf
+import random
+import threading
+import time
+
+from ingestion import DataIngestor
+
+
+class PrefetchScheduler:
+    def __init__(self, cache, grid, interval=600, intervals=None, max_concurrency=4, max_backoff=3600, tick=5):
+        self.cache = cache
+        self.grid = list(grid)  # (target_country, cpv_code) pairs
+        self.interval = interval
+        self.intervals = dict(intervals or {})  # source -> seconds, overriding `interval`
+        self.max_backoff = max_backoff
+        self.tick = tick
+        self._pool = cf.ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._in_flight = set()
+        self._failures = {}  # source -> consecutive failures
+        self._backoff_until = {}  # source -> epoch seconds
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="prefetch-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.tick)
+
+    def _due(self, now):
+        for source in DataIngestor.SOURCES:
+            if now < self._backoff_until.get(source, 0):
+                continue
+            grid = [()] if source in DataIngestor.SHARED_SOURCES else self.grid
+            interval = self.intervals.get(source, self.interval)
+            for params in grid:
+                key = (source, params)
+                if key in self._in_flight:
+                    continue
+                if now - (self.cache.stored_at(source, params) or 0) >= interval:
+                    yield key
+
+    def run_once(self):
+        """Submits every grid entry that is due for a refresh."""
+        with self._lock:
+            due = list(self._due(time.time()))
+            self._in_flight.update(due)
+        for source, params in due:
+            self._pool.submit(self._refresh, source, params)
+
+    def _refresh(self, source, params):
+        ingestor = DataIngestor(*(params or self.grid[0]), cache=self.cache)
+        try:
+            self.cache.fetch_and_store(source, params, getattr(ingestor, f"get_{source}_signals"))
+        except Exception:
+            with self._lock:
+                failures = self._failures.get(source, 0) + 1
+                self._failures[source] = failures
+                delay = min(self.tick * 2 ** failures, self.max_backoff)
+                self._backoff_until[source] = time.time() + delay * random.uniform(0.5, 1.0)
+        else:
+            with self._lock:
+                self._failures[source] = 0
+        finally:
+            with self._lock:
+                self._in_flight.discard((source, params))
+
+    def last_refreshed(self, source, params):
+        """Epoch seconds of the last successful refresh (by any fetch), or None if not cached."""
+        if source in DataIngestor.SHARED_SOURCES:
+            params = ()
+        return self.cache.stored_at(source, params)
@@ -0,0 +1,148 @@
+"""Incremental regulatory risk monitor over several news feeds.
+
+Feeds are polled in parallel with ETag / Last-Modified conditional requests,
+so an unchanged feed costs one 304. New entries are deduplicated across
+feeds by normalized title, classified once in a batch with precompiled
+patterns, and stored; the Regulatory Risk tab reads the stored results.
+"""
+import calendar
+import concurrent.futures as cf
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import feedparser
+
+DATA_DIR = os.environ.get("GTM_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+DEFAULT_PATH = os.path.join(DATA_DIR, "risk_feeds.sqlite")
+
+GOOGLE_NEWS = os.environ.get("GTM_NEWS_URL", "https://news.google.com/rss/search") + "?q={}&hl=en-IN&gl=IN&ceid=IN:en"
+RISK_FEEDS = [
+    # RSS feed looking for CBAM or Trade Compliance news
+    GOOGLE_NEWS.format("CBAM+OR+EU+Import+Regulations+site:europa.eu"),
+    GOOGLE_NEWS.format("EU+anti-dumping+duty+India"),
+    GOOGLE_NEWS.format("DGFT+export+policy+notification"),
+    GOOGLE_NEWS.format("RoDTEP+OR+SCOMET"),
+]
+
+# Whole-word matches, so e.g. "bank" or "taxonomy" no longer count as "ban" / "tax"
+HIGH_RISK = re.compile(r"\b(ban(s|ned)?|tax(es)?|anti-dumping|countervailing|sanctions?|embargo|prohibit(s|ed|ion)?|"
+                       r"suspend(s|ed)?|penalt(y|ies)|restrict(s|ed|ions?)?)\b", re.IGNORECASE)
+LOW_RISK = re.compile(r"\b(extend(s|ed)?|relief|exempt(s|ed|ion)?|simplif(y|ies|ied)|free trade|fta)\b", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, checked_at REAL);
+CREATE TABLE IF NOT EXISTS risk_items (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    link TEXT,
+    published TEXT,
+    published_ts REAL,
+    feed TEXT,
+    risk_level TEXT NOT NULL,
+    first_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS risk_items_published ON risk_items (published_ts);
+"""
+
+POOL = cf.ThreadPoolExecutor(max_workers=8, thread_name_prefix="risk-feed")
+
+
+def entry_key(title):
+    """Cross-feed identity: the same story syndicated to several feeds keeps one row."""
+    normalized = re.sub(r"\W+", " ", title.lower()).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def classify(titles):
+    """Classifies a batch of titles into High / Medium / Low risk."""
+    return ["High" if HIGH_RISK.search(t) else "Low" if LOW_RISK.search(t) else "Medium" for t in titles]
+
+
+class RiskMonitor:
+    def __init__(self, feeds=RISK_FEEDS, path=DEFAULT_PATH):
+        self.feeds = list(feeds)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _fetch(self, session, url, validators, timeout):
+        """Conditional GET for one feed. Returns (url, response or None when unchanged)."""
+        etag, last_modified = validators.get(url, (None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        r = session.get(url, headers=headers, timeout=timeout)
+        if r.status_code == 304:
+            return url, None
+        r.raise_for_status()
+        return url, r
+
+    def poll(self, session, timeout):
+        """Polls every feed in parallel and stores new entries. Returns the number of new items."""
+        with self._connect() as conn:
+            validators = {u: (e, lm) for u, e, lm in conn.execute("SELECT url, etag, last_modified FROM feeds")}
+
+        futures = [POOL.submit(self._fetch, session, url, validators, timeout) for url in self.feeds]
+        now = time.time()
+        new_items, feed_rows, errors = {}, [], []
+        for future in cf.as_completed(futures):
+            try:
+                url, r = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            if r is None:
+                feed_rows.append((url, *validators.get(url, (None, None)), now))
+                continue
+            feed_rows.append((url, r.headers.get("ETag"), r.headers.get("Last-Modified"), now))
+            for entry in feedparser.parse(r.content).entries:
+                title = entry.get("title", "")
+                key = entry_key(title)
+                if title and key not in new_items:
+                    parsed = entry.get("published_parsed")
+                    new_items[key] = (key, title, entry.get("link"), entry.get("published", ""),
+                                      calendar.timegm(parsed) if parsed else now, url)
+
+        if errors and not feed_rows:
+            raise errors[0]  # Every feed failed: let the caller fall back
+
+        with self._connect() as conn:
+            keys = list(new_items)
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                for (key,) in conn.execute(f"SELECT key FROM risk_items WHERE key IN ({','.join('?' * len(chunk))})", chunk):
+                    del new_items[key]
+        # Only unseen entries reach the classifier
+        items = list(new_items.values())
+        levels = classify([item[1] for item in items])
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?)", feed_rows)
+            conn.executemany("INSERT OR IGNORE INTO risk_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             [(*item, level, now) for item, level in zip(items, levels)])
+        return len(items)
+
+    def recent(self, limit=20):
+        with self._connect() as conn:
+            return conn.execute("SELECT title, published, link, risk_level FROM risk_items "
+                                "ORDER BY published_ts DESC LIMIT ?", (limit,)).fetchall()
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM risk_items").fetchone()[0]
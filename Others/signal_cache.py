@@ -0,0 +1,130 @@
+"""Process-wide TTL cache for dashboard signals with stale-while-revalidate.
+
+Entries are keyed by (source, params). Within its TTL an entry is served as
+is; after that it is still served for up to `stale_ttl` seconds while a
+single background refresh replaces it. Least recently used entries are
+evicted once `max_entries` is reached.
+
+Concurrent misses for one key share a single upstream fetch, and every
+caller gets its own copy of the value, so a session that mutates its
+signals cannot change what other sessions see.
+"""
+import concurrent.futures as cf
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+FRESH, STALE = "fresh", "stale"
+
+
+class SignalCache:
+    def __init__(self, ttls=None, default_ttl=600, stale_ttl=3600, max_entries=512, executor=None):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._executor = executor or cf.ThreadPoolExecutor(max_workers=4, thread_name_prefix="signal-refresh")
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._refreshing = set()
+        self._loading = {}  # key -> Future of the fetch in flight, shared by concurrent misses
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0,
+                         "refresh_errors": 0, "evictions": 0}
+
+    def _ttl(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def get(self, source, params):
+        """Returns (value, state) where state is FRESH, STALE or None on a miss."""
+        key = (source, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.time() - entry[0]
+                ttl = self._ttl(source)
+                if age < ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    state = FRESH if age < ttl else STALE
+                    self.counters["hits" if state == FRESH else "stale_hits"] += 1
+                    return copy.deepcopy(entry[1]), state
+                del self._entries[key]
+            self.counters["misses"] += 1
+            return None, None
+
+    def stored_at(self, source, params):
+        """Epoch seconds when the entry was last stored (by any fetch), or None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get((source, params))
+            return entry[0] if entry is not None else None
+
+    def put(self, source, params, value):
+        key = (source, params)
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def fetch_and_store(self, source, params, fetch):
+        """Fetches and caches a value; a fetch already in flight for the key is joined instead."""
+        key = (source, params)
+        with self._lock:
+            future = self._loading.get(key)
+            leader = future is None
+            if leader:
+                future = self._loading[key] = cf.Future()
+            else:
+                self.counters["coalesced"] += 1
+        if not leader:
+            return copy.deepcopy(future.result())
+        try:
+            value = fetch()
+            self.put(source, params, value)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._loading[key]
+        return copy.deepcopy(value)
+
+    def refresh_async(self, source, params, fetch):
+        """Schedules one background refresh per key; concurrent requests share it."""
+        key = (source, params)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.counters["refreshes"] += 1
+
+        def run():
+            try:
+                self.fetch_and_store(source, params, fetch)
+            except Exception:
+                # Keep serving the stale value; the next read retries
+                with self._lock:
+                    self.counters["refresh_errors"] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+    def get_or_fetch(self, source, params, fetch):
+        value, state = self.get(source, params)
+        if state == STALE:
+            self.refresh_async(source, params, fetch)
+        if state is not None:
+            return value
+        return self.fetch_and_store(source, params, fetch)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters, entries=len(self._entries))
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        return stats
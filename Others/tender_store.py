@@ -0,0 +1,178 @@
+"""Local, deduplicated tender history fed by paginated opentender.eu ingestion.
+
+Tenders are streamed page by page through generators and upserted in small
+batches keyed by (tender id, country, cpv), so a tender matching several
+markets is counted in each of them and memory stays bounded no matter how
+many tenders match. Each sync only pages back until it reaches tenders that
+are already stored, and never past SYNC_WINDOW_DAYS of publication dates
+(results are sorted newest first), so a first sync is bounded too.
+"""
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import islice
+
+DATA_DIR = os.environ.get("GTM_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+DEFAULT_PATH = os.path.join(DATA_DIR, "tenders.sqlite")
+
+PAGE_SIZE = 100
+BATCH_SIZE = 500
+# How far back (by publication date) a sync pages; older tenders are not ingested
+SYNC_WINDOW_DAYS = int(os.environ.get("GTM_TENDER_SYNC_DAYS", 90))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenders (
+    id TEXT NOT NULL,
+    country TEXT NOT NULL,
+    cpv TEXT NOT NULL,
+    buyer TEXT,
+    title TEXT,
+    amount REAL,
+    deadline TEXT,
+    published TEXT,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (id, country, cpv)
+);
+CREATE INDEX IF NOT EXISTS tenders_market ON tenders (country, cpv, published);
+"""
+
+
+def iter_tender_pages(session, url, country, cpv, timeout, page_size=PAGE_SIZE, max_pages=None):
+    """Yields one page (list of raw tender dicts) at a time, newest first."""
+    page = 1
+    while max_pages is None or page <= max_pages:
+        payload = {"cpv": cpv, "country": country, "sort": "date-desc", "limit": page_size, "page": page}
+        r = session.post(url, json=payload, timeout=timeout)
+        r.raise_for_status()
+        data = r.json().get("data", [])
+        if not data:
+            return
+        yield data
+        if len(data) < page_size:
+            return
+        page += 1
+
+
+def iter_new_tenders(pages, known_latest, oldest=None):
+    """
+    Flattens pages, stopping after the first page that holds nothing newer than
+    `known_latest`, or at the first tender published before `oldest`.
+    """
+    for page in pages:
+        for d in page:
+            if oldest and d.get("date") and d["date"] < oldest:
+                return
+            yield d
+        if known_latest and all((d.get("date") or "") <= known_latest for d in page):
+            return
+
+
+def normalize(d, country, cpv, now):
+    return (
+        str(d.get("id")),
+        country,
+        cpv,
+        (d.get("buyer") or {}).get("name", "Unknown"),
+        d.get("title") or "N/A",
+        (d.get("value") or {}).get("amount") or 0,
+        (d.get("bidDeadline") or "Check Doc")[:10],
+        d.get("date") or "",
+        now,
+        now,
+    )
+
+
+class TenderStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            self._migrate(conn)
+            conn.executescript(SCHEMA)
+
+    def _migrate(self, conn):
+        # Stores created before tenders were keyed per market: keep their rows
+        pk = [row[1] for row in conn.execute("PRAGMA table_info(tenders)") if row[5]]
+        if pk == ["id"]:
+            conn.execute("ALTER TABLE tenders RENAME TO tenders_by_id")
+            conn.execute("DROP INDEX IF EXISTS tenders_market")
+            conn.executescript(SCHEMA)
+            conn.execute("INSERT INTO tenders SELECT * FROM tenders_by_id")
+            conn.execute("DROP TABLE tenders_by_id")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- INGESTION ---
+    def latest_published(self, country, cpv):
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(published) FROM tenders WHERE country = ? AND cpv = ?",
+                               (country, cpv)).fetchone()
+        return row[0]
+
+    def upsert(self, tenders, country, cpv):
+        """Streams raw tenders into the store in batches. Returns the number of tenders new to this market."""
+        tenders = iter(tenders)
+        added = 0
+        while True:
+            now = time.time()
+            batch = [normalize(d, country, cpv, now) for d in islice(tenders, BATCH_SIZE)]
+            if not batch:
+                return added
+            with self._connect() as conn:
+                before = conn.total_changes
+                conn.executemany("INSERT OR IGNORE INTO tenders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                added += conn.total_changes - before
+                # Existing tenders keep first_seen but pick up amended fields
+                conn.executemany(
+                    "UPDATE tenders SET buyer = ?, title = ?, amount = ?, deadline = ?, published = ?, updated_at = ? "
+                    "WHERE id = ? AND country = ? AND cpv = ? AND updated_at < ?",
+                    [(b, t, a, dl, p, u, i, c, cp, u) for i, c, cp, b, t, a, dl, p, _, u in batch])
+
+    def sync(self, session, url, country, cpv, timeout, max_pages=None, window_days=SYNC_WINDOW_DAYS):
+        pages = iter_tender_pages(session, url, country, cpv, timeout, max_pages=max_pages)
+        oldest = (date.today() - timedelta(days=window_days)).isoformat()
+        return self.upsert(iter_new_tenders(pages, self.latest_published(country, cpv), oldest), country, cpv)
+
+    # --- QUERIES ---
+    def recent(self, country, cpv, limit=50):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, buyer, title, amount, deadline FROM tenders WHERE country = ? AND cpv = ? "
+                "ORDER BY published DESC LIMIT ?", (country, cpv, limit)).fetchall()
+
+    def count(self, country, cpv):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tenders WHERE country = ? AND cpv = ?",
+                                (country, cpv)).fetchone()[0]
+
+    def count_active(self, country, cpv, today):
+        """
+        Tenders still open on `today` (ISO date). Tenders without a parsable
+        deadline ("Check Doc") cannot be ruled out and are counted.
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM tenders WHERE country = ? AND cpv = ? "
+                "AND (deadline >= ? OR deadline NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]')",
+                (country, cpv, today)).fetchone()[0]
+
+    def count_published_since(self, country, cpv, since):
+        """
+        Tenders published on or after `since` (ISO date), e.g. for the
+        day-over-day delta. Uses the publication date rather than when the row
+        was stored, so a first backfill does not show up as new.
+        """
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tenders WHERE country = ? AND cpv = ? AND published >= ?",
+                                (country, cpv, since)).fetchone()[0]
@@ -0,0 +1,218 @@
+"""Columnar local trade-flow store built from UN Comtrade bulk files.
+
+Flows are kept as one NumPy array per column (HS6 x reporter x partner x
+period, with value and net weight), memory-mapped on load and sorted by HS
+code so any HS prefix is a contiguous slice. A rollup of totals over all
+partners is precomputed at import time for market-share denominators and
+demand curves. Every analytic is a vectorized group-by over those slices.
+
+    python trade_store.py import comtrade_2023.csv comtrade_2024.csv
+"""
+import json
+import os
+import sys
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.environ.get("GTM_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+DEFAULT_PATH = os.path.join(DATA_DIR, "trade_flows")
+
+# Comtrade bulk CSV columns -> store columns
+SOURCE_COLUMNS = {"cmdCode": "hs", "reporterISO": "reporter", "partnerISO": "partner", "period": "period",
+                  "primaryValue": "value", "netWgt": "weight"}
+DIMENSIONS = ("hs", "reporter", "partner")
+WORLD = "W00"
+USD_TO_EUR = 0.92  # Indicative rate for the EUR-labelled dashboard columns
+
+# Dashboard selections -> Comtrade reporter ISO3 codes
+ISO3 = {"DE": "DEU", "FR": "FRA", "IT": "ITA", "ES": "ESP", "NL": "NLD",
+        "Germany": "DEU", "France": "FRA", "Italy": "ITA", "Netherlands": "NLD", "Spain": "ESP"}
+COUNTRY_NAMES = {"CHN": "China", "VNM": "Vietnam", "TUR": "Turkey", "IND": "India", "USA": "USA", "DEU": "Germany",
+                 "ITA": "Italy", "FRA": "France", "JPN": "Japan", "KOR": "South Korea", "BGD": "Bangladesh"}
+
+
+def _encode(values, labels, lookup):
+    """Maps strings to integer codes, growing the dictionary with unseen values."""
+    local, uniques = pd.factorize(values)
+    mapping = np.empty(len(uniques), dtype=np.int32)
+    for i, v in enumerate(uniques):
+        code = lookup.get(v)
+        if code is None:
+            code = lookup[v] = len(labels)
+            labels.append(v)
+        mapping[i] = code
+    return mapping[local]
+
+
+def _aggregate(keys, values):
+    """Sums `values` rows sharing the same key tuple. Keys and values are dicts of equal-length arrays."""
+    order = np.lexsort([keys[k] for k in reversed(list(keys))])
+    sorted_keys = {k: a[order] for k, a in keys.items()}
+    boundary = np.ones(len(order), dtype=bool)
+    if len(order):
+        boundary[1:] = np.any([np.diff(a) != 0 for a in sorted_keys.values()], axis=0)
+    starts = np.flatnonzero(boundary)
+    out = {k: a[starts] for k, a in sorted_keys.items()}
+    for k, a in values.items():
+        out[k] = np.add.reduceat(a[order], starts) if len(starts) else a[:0]
+    return out
+
+
+def _reporter_period(columns):
+    return (columns["reporter"].astype(np.int64) << 32) | columns["period"].astype(np.int64)
+
+
+class TradeFlowStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.flows, self.rollup, self.dims = {}, {}, {d: [] for d in DIMENSIONS}
+        if os.path.exists(os.path.join(path, "dims.json")):
+            self._load()
+
+    @property
+    def empty(self):
+        return not self.flows or len(self.flows["hs"]) == 0
+
+    # --- BUILD ---
+    def _load(self):
+        with open(os.path.join(self.path, "dims.json"), encoding="utf-8") as f:
+            self.dims = json.load(f)
+        for name in os.listdir(self.path):
+            if name.endswith(".npy"):
+                table, column = name[:-4].split(".", 1)
+                target = self.flows if table == "flows" else self.rollup
+                target[column] = np.load(os.path.join(self.path, name), mmap_mode="r")
+
+    def import_csv(self, paths, chunksize=500_000, flow_code="M"):
+        """
+        Streams Comtrade bulk CSVs in chunks and merges them with what is stored.
+        A (reporter, period) present in the import replaces the stored rows for it,
+        so re-importing the same or a revised file does not double any figure.
+        """
+        labels = {d: list(self.dims[d]) for d in DIMENSIONS}
+        lookups = {d: {v: i for i, v in enumerate(labels[d])} for d in DIMENSIONS}
+        parts = []
+
+        for path in paths:
+            for chunk in pd.read_csv(path, usecols=list(SOURCE_COLUMNS) + ["flowCode"], chunksize=chunksize,
+                                     dtype={"cmdCode": str, "reporterISO": str, "partnerISO": str, "flowCode": str}):
+                chunk = chunk[(chunk["flowCode"] == flow_code) & (chunk["cmdCode"].str.len() == 6)
+                              & (chunk["partnerISO"] != WORLD)].dropna(subset=["reporterISO", "partnerISO"])
+                chunk = chunk.rename(columns=SOURCE_COLUMNS)
+                part = {d: _encode(chunk[d].to_numpy(), labels[d], lookups[d]) for d in DIMENSIONS}
+                part["period"] = chunk["period"].to_numpy(dtype=np.int32)
+                part["value"] = chunk["value"].fillna(0).to_numpy(dtype=np.float64)
+                part["weight"] = chunk["weight"].fillna(0).to_numpy(dtype=np.float64)
+                parts.append(part)
+
+        if not self.empty:
+            # Stored codes stay valid here: the dictionaries above only grew
+            stored = {k: np.asarray(v) for k, v in self.flows.items()}
+            imported = np.unique(np.concatenate([_reporter_period(p) for p in parts])) if parts else []
+            keep = ~np.isin(_reporter_period(stored), imported)
+            parts.append({k: v[keep] for k, v in stored.items()})
+
+        # Re-number every dimension in sorted order so HS prefixes map to code ranges
+        merged = {}
+        for column in ("hs", "reporter", "partner", "period", "value", "weight"):
+            merged[column] = np.concatenate([p[column] for p in parts]) if parts else np.empty(0)
+        for d in DIMENSIONS:
+            order = np.argsort(np.array(labels[d], dtype=object), kind="stable")
+            rank = np.empty(len(order), dtype=np.int32)
+            rank[order] = np.arange(len(order), dtype=np.int32)
+            merged[d] = rank[merged[d].astype(np.int64)] if len(order) else merged[d]
+            labels[d] = [labels[d][i] for i in order]
+
+        flows = _aggregate({k: merged[k] for k in ("hs", "reporter", "partner", "period")},
+                           {k: merged[k] for k in ("value", "weight")})
+        rollup = _aggregate({k: flows[k] for k in ("hs", "reporter", "period")},
+                            {k: flows[k] for k in ("value", "weight")})
+        self._write(flows, rollup, labels)
+
+    def _write(self, flows, rollup, labels):
+        os.makedirs(self.path, exist_ok=True)
+        self.flows, self.rollup = {}, {}  # Release the memory maps before overwriting
+        for table, columns in (("flows", flows), ("rollup", rollup)):
+            for column, array in columns.items():
+                np.save(os.path.join(self.path, f"{table}.{column}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(self.path, "dims.json"), "w", encoding="utf-8") as f:
+            json.dump(labels, f)
+        self._load()
+
+    # --- QUERIES ---
+    def _hs_slice(self, table, hs_prefix):
+        """Rows of a table (sorted by HS code) whose HS code starts with `hs_prefix`."""
+        labels = self.dims["hs"]
+        lo = bisect_left(labels, hs_prefix)
+        hi = bisect_left(labels, hs_prefix + "\x7f")
+        column = table["hs"]
+        return slice(int(np.searchsorted(column, lo, "left")), int(np.searchsorted(column, hi, "left")))
+
+    def _select(self, table, hs_prefix, reporter):
+        rows = self._hs_slice(table, hs_prefix)
+        reporter = ISO3.get(reporter, reporter)
+        code = bisect_left(self.dims["reporter"], reporter)
+        if code >= len(self.dims["reporter"]) or self.dims["reporter"][code] != reporter:
+            return None
+        mask = np.asarray(table["reporter"][rows]) == code
+        return {k: np.asarray(v[rows])[mask] for k, v in table.items()}
+
+    def import_demand(self, hs_prefix, reporter):
+        """Import value and weight per period for all partners, from the rollup."""
+        sel = None if self.empty else self._select(self.rollup, hs_prefix, reporter)
+        if sel is None or not len(sel["period"]):
+            return pd.DataFrame(columns=["Period", "Value", "Volume"])
+        periods, inverse = np.unique(sel["period"], return_inverse=True)
+        return pd.DataFrame({
+            "Period": periods,
+            "Value": np.bincount(inverse, weights=sel["value"]) * USD_TO_EUR,
+            "Volume": np.bincount(inverse, weights=sel["weight"]),
+        })
+
+    def competitor_gap(self, hs_prefix, reporter, top=5, focus="IND"):
+        """
+        Market-share change (percentage points, last vs. previous period) and
+        average unit price of the top supplying partners, always including `focus`.
+        """
+        columns = ["Competitor", "Market_Share_Trend", "Avg_Unit_Price_EUR"]
+        sel = None if self.empty else self._select(self.flows, hs_prefix, reporter)
+        if sel is None or not len(sel["period"]):
+            return pd.DataFrame(columns=columns)
+        periods = np.unique(sel["period"])
+        last, prev = periods[-1], periods[-2] if len(periods) > 1 else periods[-1]
+
+        partners, inverse = np.unique(sel["partner"], return_inverse=True)
+        shares = {}
+        for period in (prev, last):
+            in_period = sel["period"] == period
+            value = np.bincount(inverse[in_period], weights=sel["value"][in_period], minlength=len(partners))
+            shares[period] = (value, value / max(value.sum(), 1e-9))
+        last_value = shares[last][0]
+        last_weight = np.bincount(inverse[sel["period"] == last], weights=sel["weight"][sel["period"] == last],
+                                  minlength=len(partners))
+
+        ranked = list(np.argsort(-last_value)[:top])
+        focus_code = bisect_left(self.dims["partner"], focus)
+        focus_idx = np.flatnonzero(partners == focus_code)
+        if len(focus_idx) and self.dims["partner"][focus_code] == focus and focus_idx[0] not in ranked:
+            ranked.append(focus_idx[0])
+        ranked = np.array(ranked, dtype=np.int64)
+
+        names = [self.dims["partner"][partners[i]] for i in ranked]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            unit_price = np.where(last_weight[ranked] > 0, last_value[ranked] / last_weight[ranked], np.nan)
+        return pd.DataFrame({
+            "Competitor": [COUNTRY_NAMES.get(n, n) for n in names],
+            "Market_Share_Trend": np.round((shares[last][1][ranked] - shares[prev][1][ranked]) * 100, 1),
+            "Avg_Unit_Price_EUR": np.round(unit_price * USD_TO_EUR, 2),
+        }, columns=columns)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "import":
+        sys.exit("usage: python trade_store.py import <comtrade.csv> [...]")
+    store = TradeFlowStore()
+    store.import_csv(sys.argv[2:])
+    print(f"{store.path}: {len(store.flows['hs']):,} flows, {len(store.rollup['hs']):,} rollup rows")
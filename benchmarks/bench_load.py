@@ -0,0 +1,360 @@
+"""Concurrent-session load test for the Streamlit apps and the Flask calculator.
+
+Every upstream is replaced by benchmarks/fake_services.py (with the latency
+and errors given on the command line), and stores live in a temporary
+GTM_DATA_DIR, so runs are offline and reproducible.
+
+* Streamlit apps: each app is served by `streamlit run`; N websocket sessions
+  (speaking the browser's protocol) run a scripted user journey at once for
+  --rounds rounds. Reports p50/p99 per step (page load to script finished)
+  and server memory per session (RSS growth with every session connected,
+  over the server warmed up by one earlier session).
+* Flask calculator: served by werkzeug in a subprocess; N clients post quote
+  (small JSON) and bulk (large NDJSON) landed-cost batches. Reports p50/p99
+  per request type and server RSS growth per concurrent client.
+
+    python benchmarks/bench_load.py [--quick] [--sessions 8] [--rounds 3] [--apps strategy,calculator]
+        [--latency 0.05] [--service gemini:chunk_delay=0.05] [--json] [--save base.json] [--baseline base.json]
+
+The model request scheduler keeps its production limits; set GTM_LLM_RATE /
+GTM_LLM_BURST to load-test other settings.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import OTHERS, ROOT, add_output_arguments, finish, rss_bytes, summarize
+from fake_services import FakeServices, add_behaviour_arguments, parse_behaviours
+
+# Distinct enough that the semantic response cache only answers genuine repeats
+QUESTIONS = ["Is it worth bidding on tenders right now?", "Who are my main competitors in this market?",
+             "What CBAM documents will my EU importer ask for?", "How do I apply for a SCOMET licence?",
+             "Which rules of origin apply under the FTA?", "What price should I quote against Chinese suppliers?"]
+
+# (entry point, steps): each step interacts with a StreamlitSession and returns the rerun's seconds
+STREAMLIT_APPS = {
+    "strategy": (os.path.join(ROOT, "gtm_strategy_v1.py"), [
+        ("search", lambda s, user, i: s.input("Search by Product", "steel")),
+        ("unlock", lambda s, user, i: s.click("Unlock")),
+        ("ask", lambda s, user, i: s.chat(QUESTIONS[(user + i) % len(QUESTIONS)])),
+        ("new_search", lambda s, user, i: s.click("New Search")),
+    ]),
+    "command_center": (os.path.join(OTHERS, "app.py"), [
+        ("switch_market", lambda s, user, i: s.select("Target EU Market", ["DE", "FR", "IT", "ES", "NL"][(user + i) % 5])),
+        ("ask", lambda s, user, i: s.chat(QUESTIONS[(user + i) % len(QUESTIONS)])),
+    ]),
+    "export_engine": (os.path.join(OTHERS, "gtm_platform.py"), [
+        ("search", lambda s, user, i: s.input("🔍 Search HS", ["8481", "7308", "8806"][i % 3])),
+        ("switch_market", lambda s, user, i: s.select(
+            "EU Market", ["Germany", "France", "Italy", "Netherlands"][(user + i) % 4])),
+        ("ask", lambda s, user, i: s.input("Ask a specific", QUESTIONS[(user + i) % len(QUESTIONS)])),
+    ]),
+}
+CALCULATOR = os.path.join(OTHERS, "def calculator():.py.py")
+
+SERVE_SNIPPET = """
+import importlib.util, sys
+from werkzeug.serving import make_server
+spec = importlib.util.spec_from_file_location("calculator", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+server = make_server("127.0.0.1", 0, module.app, threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+
+# --- STREAMLIT ---
+class StreamlitSession:
+    """
+    One browser tab on a `streamlit run` server: sends reruns with widget
+    states over the websocket, as the frontend does, and tracks the widgets
+    the script rendered. Interactions raise StopIteration when the widget is
+    not on the page.
+    """
+
+    def __init__(self, url, timeout=300):
+        from websockets.sync.client import connect  # Installed with streamlit's server
+
+        # Entered by hand: sessions outlive any one block (they stay open for the RSS reading)
+        self.ws = connect(url.replace("http", "ws", 1) + "/_stcore/stream", subprotocols=["streamlit"],
+                          max_size=None, open_timeout=60).__enter__()
+        self.timeout = timeout
+        self.widgets = []  # (element type, id, label, fragment id) on the current page
+        self.values = {}  # widget id -> WidgetState of stateful widgets, sent with every rerun
+        self.errors = []  # Exceptions the script rendered
+
+    def close(self):
+        self.ws.close()
+
+    def rerun(self, triggers=(), fragment_id=""):
+        """Runs the script (or one fragment) and returns the seconds until it finished."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend([*self.values.values(), *triggers])
+        widgets = []
+        start = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(self.ws.recv(timeout=self.timeout))
+            kind = reply.WhichOneof("type")
+            if kind == "script_finished" and reply.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+            if kind != "delta" or reply.delta.WhichOneof("type") != "new_element":
+                continue
+            element = reply.delta.new_element
+            element_type = element.WhichOneof("type")
+            proto = getattr(element, element_type)
+            if element_type == "exception":
+                self.errors.append(proto.message)
+            elif "id" in proto.DESCRIPTOR.fields_by_name and proto.id:
+                widgets.append((element_type, proto.id, getattr(proto, "label", ""), reply.delta.fragment_id))
+        seconds = time.perf_counter() - start
+        if fragment_id:
+            self.widgets = [w for w in self.widgets if w[3] != fragment_id] + widgets
+        else:
+            self.widgets = widgets
+            ids = {w[1] for w in widgets}
+            self.values = {k: v for k, v in self.values.items() if k in ids}
+        return seconds
+
+    def _widget(self, element_type, label=""):
+        return next(w for w in self.widgets if w[0] == element_type and w[2].startswith(label))
+
+    def _set(self, element_type, label, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        _, widget_id, _, fragment_id = self._widget(element_type, label)
+        self.values[widget_id] = WidgetState(id=widget_id, **value)
+        return self.rerun(fragment_id=fragment_id)
+
+    def input(self, label, value):
+        return self._set("text_input", label, string_value=value)
+
+    def select(self, label, option):
+        return self._set("selectbox", label, string_value=option)
+
+    def click(self, label):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        _, widget_id, _, fragment_id = self._widget("button", label)
+        return self.rerun([WidgetState(id=widget_id, trigger_value=True)], fragment_id)
+
+    def chat(self, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        _, widget_id, _, fragment_id = self._widget("chat_input")
+        state = WidgetState(id=widget_id)
+        state.chat_input_value.data = value
+        return self.rerun([state], fragment_id)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_streamlit(path, env, timeout=120):
+    """Serves `path` with `streamlit run` on a free port; returns (process, base URL) once healthy."""
+    import requests
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", path, "--server.headless", "true",
+         "--server.address", "127.0.0.1", "--server.port", str(port), "--server.enableXsrfProtection", "false",
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT, env=env)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with status {server.returncode}")
+        try:
+            if requests.get(url + "/_stcore/health", timeout=1).ok:
+                return server, url
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    server.wait()
+    raise RuntimeError(f"streamlit not healthy after {timeout} s")
+
+
+def _journey(url, steps, user, rounds, timings, errors):
+    """One session: load, then every step per round. Returns the session, still connected."""
+    session = StreamlitSession(url)
+    timings["load"].append(session.rerun())
+    errors.extend(f"load: {e}" for e in session.errors)
+    for i in range(rounds):
+        for name, interact in steps:
+            seen = len(session.errors)
+            try:
+                timings[name].append(interact(session, user, i))
+            except StopIteration:
+                errors.append(f"{name}: widget not rendered")  # The previous step failed to render
+                continue
+            errors.extend(f"{name}: {e}" for e in session.errors[seen:])
+    return session
+
+
+def run_streamlit(app, sessions, rounds, env):
+    path, steps = STREAMLIT_APPS[app]
+    try:
+        server, url = start_streamlit(path, env)
+    except RuntimeError as exc:
+        return {"failed": [str(exc)]}
+    try:
+        names = ["load"] + [name for name, _ in steps]
+        _journey(url, steps, -1, 1, {name: [] for name in names}, []).close()  # Fills process-wide caches
+        time.sleep(1)  # The server drops the closed session's state
+        baseline = rss_bytes(server.pid)
+
+        timings = {name: [] for name in names}
+        errors, alive = [], []
+
+        def session(user):
+            try:
+                alive.append(_journey(url, steps, user, rounds, timings, errors))
+            except Exception as exc:  # A dropped connection or timeout fails this session only
+                errors.append(f"session {user}: {exc!r}")
+
+        threads = [threading.Thread(target=session, args=(user,)) for user in range(sessions)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        rss = rss_bytes(server.pid)
+        for s in alive:
+            s.close()
+        return {"sessions": sessions, "seconds": elapsed, "steps": {k: summarize(v) for k, v in timings.items()},
+                "errors": len(errors), "error_samples": errors[:5], "rss_baseline_bytes": baseline,
+                "rss_bytes": rss, "memory_per_session_bytes": max(rss - baseline, 0) / sessions}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# --- FLASK CALCULATOR ---
+def _batch(rows, seed):
+    rng = random.Random(seed)
+    return {"shipments": {
+        "value": [round(rng.uniform(100, 50_000), 2) for _ in range(rows)],
+        "currency": [rng.choice(["EUR", "USD"]) for _ in range(rows)],
+        "hs_code": [f"{rng.choice([72, 73, 84, 85, 52]):02d}{rng.randint(1, 99):02d}" for _ in range(rows)],
+        "freight": [round(rng.uniform(0, 2_000), 2) for _ in range(rows)],
+    }}
+
+
+def run_calculator(sessions, rounds, env, quote_rows=100, bulk_rows=20_000):
+    import requests
+
+    server = subprocess.Popen([sys.executable, "-c", SERVE_SNIPPET, CALCULATOR], stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True, cwd=ROOT, env=env)
+    try:
+        url = f"http://127.0.0.1:{int(server.stdout.readline())}/landed-cost"
+        bulk = json.dumps(_batch(bulk_rows, 0))
+        requests.post(url, data=bulk, timeout=60).raise_for_status()  # Warm-up: imports, first parse
+        baseline = peak = rss_bytes(server.pid)
+        timings = {"quote": [], "bulk": []}
+        errors = []
+        done = threading.Event()
+
+        def sample():
+            nonlocal peak
+            while not done.wait(0.05):
+                peak = max(peak, rss_bytes(server.pid) or 0)
+
+        def client(user):
+            with requests.Session() as session:
+                for i in range(rounds):
+                    for name, body, headers in (
+                            ("quote", json.dumps(_batch(quote_rows, f"{user}:{i}")), {}),
+                            ("bulk", bulk, {"Accept": "application/x-ndjson"})):
+                        start = time.perf_counter()
+                        r = session.post(url, data=body, headers={"Content-Type": "application/json", **headers},
+                                         timeout=120)
+                        r.content  # Streamed responses count until the last line arrives
+                        timings[name].append(time.perf_counter() - start)
+                        if r.status_code != 200:
+                            errors.append(f"{name}: HTTP {r.status_code}")
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        threads = [threading.Thread(target=client, args=(user,)) for user in range(sessions)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        sampler.join()
+        return {"sessions": sessions, "seconds": elapsed, "steps": {k: summarize(v) for k, v in timings.items()},
+                "errors": len(errors), "error_samples": errors[:5], "rss_baseline_bytes": baseline,
+                "rss_bytes": peak, "memory_per_session_bytes": max(peak - baseline, 0) / sessions}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def print_table(results):
+    print(f"{'app':<16}{'step':<16}{'p50 (ms)':>10}{'p99 (ms)':>10}{'samples':>9}")
+    for app, result in results.items():
+        if "failed" in result:
+            print(f"{app:<16}failed: {' '.join(result['failed'])}")
+            continue
+        for step, stats in result["steps"].items():
+            if stats["n"]:
+                print(f"{app:<16}{step:<16}{stats['p50'] * 1e3:>10.0f}{stats['p99'] * 1e3:>10.0f}{stats['n']:>9}")
+        print(f"{'':<16}{result['sessions']} sessions: {result['memory_per_session_bytes'] / 2**20:.1f} MB/session, "
+              f"RSS {result['rss_bytes'] / 2**20:.0f} MB, {result['errors']} errors")
+        for error in result["error_samples"]:
+            print(f"{'':<16}  ! {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions / clients per app")
+    parser.add_argument("--rounds", type=int, default=3, help="journeys (or request pairs) per session")
+    parser.add_argument("--apps", default=",".join([*STREAMLIT_APPS, "calculator"]))
+    parser.add_argument("--quick", action="store_true", help="2 sessions, 1 round, small batches (CI smoke test)")
+    add_behaviour_arguments(parser)
+    add_output_arguments(parser)
+    args = parser.parse_args(argv)
+    sessions, rounds = (2, 1) if args.quick else (args.sessions, args.rounds)
+
+    results = {}
+    with FakeServices(seed=args.seed, behaviours=parse_behaviours(args)) as fake, \
+            tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, **fake.env(), GTM_DATA_DIR=data_dir)
+        env.pop("GTM_OFFLINE", None)  # The fake upstreams are the point
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, OTHERS, env.get("PYTHONPATH")]))
+        for app in args.apps.split(","):
+            if app == "calculator":
+                results[app] = run_calculator(sessions, rounds, env, bulk_rows=2_000 if args.quick else 20_000)
+            else:
+                results[app] = run_streamlit(app, sessions, rounds, env)
+        results["upstream_requests"] = dict(fake.requests)
+
+    if not args.json:
+        print_table({k: v for k, v in results.items() if k != "upstream_requests"})
+        print("upstream requests: " + ", ".join(f"{k} {v}" for k, v in sorted(results["upstream_requests"].items())))
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
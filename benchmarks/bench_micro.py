@@ -0,0 +1,121 @@
+"""Microbenchmarks for the hot paths that do not need a network.
+
+* HS search: index build and per-query latency over the HS reference fixture
+* compliance: single-code check() and vectorized screen() throughput
+* fraud scoring: TransactionGraph features + score() and the streaming detector
+
+    python benchmarks/bench_micro.py [--quick] [--json] [--save base.json] [--baseline base.json]
+
+Inputs are generated from --seed, so runs on the same machine are comparable;
+--baseline fails the run when a metric is more than --tolerance worse.
+"""
+import argparse
+import random
+import sys
+import time
+
+from common import add_output_arguments, add_paths, finish, summarize
+from fake_services import hs_reference
+
+add_paths()
+
+HS_QUERIES = ["8481", "72", "steel", "stainless steel tubes", "stel", "mach", "cotton yarn", "valves pumps parts"]
+
+
+def timed_calls(fn, args_list, min_seconds):
+    """Per-call latencies of fn(*args), cycling through args_list for at least min_seconds."""
+    samples = []
+    deadline = time.perf_counter() + min_seconds
+    while time.perf_counter() < deadline or not samples:
+        for args in args_list:
+            start = time.perf_counter()
+            fn(*args)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_hs_search(seed, min_seconds):
+    from hs_catalogue import HSCatalogue
+    from hs_search import HSSearchIndex
+
+    rows = [(r["id"], r["text"], r.get("parent")) for r in hs_reference(seed)["results"]]
+    start = time.perf_counter()
+    catalogue = HSCatalogue(rows)
+    index = HSSearchIndex(catalogue)
+    build = time.perf_counter() - start
+    per_query = {q: summarize(timed_calls(index.search, [(q,)], min_seconds / len(HS_QUERIES)))
+                 for q in HS_QUERIES}
+    overall = summarize(timed_calls(index.search, [(q,) for q in HS_QUERIES], min_seconds))
+    return {"records": len(catalogue), "build_seconds": build, "query": overall, "queries": per_query}
+
+
+def bench_compliance(seed, min_seconds, rows):
+    from compliance import check, screen
+
+    rng = random.Random(seed)
+    codes = [f"{rng.randint(1, 97):02d}{rng.randint(1, 99):02d}{rng.randint(0, 99):02d}" for _ in range(rows)]
+    single = summarize(timed_calls(check, [(c,) for c in codes[:200]], min_seconds))
+    start = time.perf_counter()
+    screen(codes)
+    elapsed = time.perf_counter() - start
+    return {"check": single, "screen": {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed}}
+
+
+def bench_fraud(seed, edges, customers, merchants):
+    import numpy as np
+    from fraud_graph import TransactionGraph, score
+    from fraud_stream import StreamingFraudDetector
+
+    rng = np.random.default_rng(seed)
+    sources = np.char.add("C", rng.integers(0, customers, edges).astype(str))
+    # Skewed merchant popularity, as in real card data
+    targets = np.char.add("M", np.minimum(rng.zipf(1.5, edges), merchants).astype(str))
+    amounts = rng.lognormal(4, 1, edges).round(2)
+    times = np.sort(rng.integers(0, 30 * 24 * 3600, edges))
+
+    start = time.perf_counter()
+    graph = TransactionGraph.from_edges(sources, targets, amounts, times)
+    built = time.perf_counter()
+    scores = score(graph.features(workers=1))
+    scored = time.perf_counter()
+
+    detector = StreamingFraudDetector()
+    transactions = list(zip(times.tolist(), sources.tolist(), targets.tolist(), amounts.tolist()))
+    start_stream = time.perf_counter()
+    alerts = sum(1 for _ in detector.consume(transactions))
+    streamed = time.perf_counter() - start_stream
+    return {"edges": edges, "build_seconds": built - start, "score_seconds": scored - built,
+            "scored_nodes": len(scores),
+            "stream": {"seconds": streamed, "transactions_per_second": edges / streamed, "alerts": alerts}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="small inputs and short runs (CI smoke test)")
+    parser.add_argument("--seed", type=int, default=0)
+    add_output_arguments(parser)
+    args = parser.parse_args(argv)
+
+    min_seconds = 0.5 if args.quick else 3.0
+    results = {
+        "hs_search": bench_hs_search(args.seed, min_seconds),
+        "compliance": bench_compliance(args.seed, min_seconds, 10_000 if args.quick else 200_000),
+        "fraud": bench_fraud(args.seed, 20_000 if args.quick else 500_000, 2_000 if args.quick else 50_000,
+                             500 if args.quick else 5_000),
+    }
+
+    if not args.json:
+        hs, comp, fraud = results["hs_search"], results["compliance"], results["fraud"]
+        print(f"HS search       {hs['records']:,} records, index built in {hs['build_seconds'] * 1e3:.0f} ms")
+        for query, stats in hs["queries"].items():
+            print(f"  {query!r:<26} p50 {stats['p50'] * 1e6:8.0f} us   p99 {stats['p99'] * 1e6:8.0f} us")
+        print(f"compliance      check() p50 {comp['check']['p50'] * 1e6:.0f} us, p99 {comp['check']['p99'] * 1e6:.0f} us;"
+              f" screen() {comp['screen']['rows_per_second']:,.0f} rows/s")
+        print(f"fraud scoring   {fraud['edges']:,} edges: build {fraud['build_seconds']:.2f} s,"
+              f" features + score {fraud['score_seconds']:.2f} s;"
+              f" streaming {fraud['stream']['transactions_per_second']:,.0f} tx/s")
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
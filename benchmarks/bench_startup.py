@@ -0,0 +1,112 @@
+"""Cold-start benchmark for the dashboards.
+
+Every measurement runs in a fresh interpreter, as a newly scheduled pod would:
+
+* import time per module (cumulative, from `python -X importtime`)
+* time to first render of each entry point, through streamlit's AppTest,
+  plus which heavy modules that first render actually loaded
+
+    python benchmarks/bench_startup.py [--repeat 5] [--json]
+
+GTM_OFFLINE defaults to 1 so the HS reference store is not refreshed over
+the network. AppTest itself preloads streamlit, so first-render times
+exclude streamlit's own import (reported separately in the module table).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OTHERS = os.path.join(ROOT, "Others")
+
+MODULES = [
+    "streamlit", "pandas", "numpy", "plotly.express", "google.generativeai", "scipy.sparse",
+    "sklearn.feature_extraction.text", "requests", "feedparser",
+    "hs_search", "hs_store", "compliance", "policy_index", "llm_cache", "llm_client", "llm_scheduler",
+    "ingestion", "trade_store",
+]
+HEAVY = ["pandas", "numpy", "plotly.express", "google.generativeai", "scipy", "sklearn"]
+ENTRY_POINTS = [
+    os.path.join(ROOT, "gtm_strategy_v1.py"),
+    os.path.join(OTHERS, "app.py"),
+    os.path.join(OTHERS, "gtm_platform.py"),
+]
+
+RENDER_SNIPPET = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "errors": [e.message for e in at.exception],
+                  "loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("GTM_OFFLINE", "1")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, OTHERS, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_seconds(module):
+    """Cumulative import time of `module` in a fresh interpreter, or None if it fails to import."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, cwd=ROOT, env=_env())
+    if proc.returncode:
+        return None
+    for line in reversed(proc.stderr.splitlines()):
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    return None
+
+
+def first_render(path):
+    proc = subprocess.run([sys.executable, "-c", RENDER_SNIPPET, path, json.dumps(HEAVY)],
+                          capture_output=True, text=True, cwd=os.path.dirname(path), env=_env())
+    if proc.returncode:
+        return {"seconds": None, "errors": [proc.stderr.strip().splitlines()[-1]], "loaded": []}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def median(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    imports = {m: median([import_seconds(m) for _ in range(args.repeat)]) for m in MODULES}
+    renders = {}
+    for path in ENTRY_POINTS:
+        runs = [first_render(path) for _ in range(args.repeat)]
+        renders[os.path.relpath(path, ROOT)] = {"seconds": median([r["seconds"] for r in runs]),
+                                                "errors": runs[-1]["errors"], "loaded": runs[-1]["loaded"]}
+
+    if args.json:
+        print(json.dumps({"imports": imports, "first_render": renders}, indent=2))
+        return
+
+    print(f"{'module':<34}{'import (ms)':>12}")
+    for module, seconds in sorted(imports.items(), key=lambda kv: -(kv[1] or 0)):
+        print(f"{module:<34}{'failed' if seconds is None else f'{seconds * 1e3:.0f}':>12}")
+    print(f"\n{'entry point':<34}{'first render (ms)':>18}  heavy modules loaded")
+    for path, result in renders.items():
+        seconds = result["seconds"]
+        print(f"{path:<34}{'failed' if seconds is None else f'{seconds * 1e3:.0f}':>18}  "
+              f"{', '.join(result['loaded']) or '-'}")
+        for error in result["errors"]:
+            print(f"{'':<34}  ! {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Shared helpers for the benchmark scripts: percentiles, memory, baselines."""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OTHERS = os.path.join(ROOT, "Others")
+
+
+def add_paths():
+    """Makes the app modules importable the way the entry points see them."""
+    for path in (OTHERS, ROOT):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def summarize(seconds):
+    """p50 / p99 / max latency (seconds) of a list of samples."""
+    return {"n": len(seconds), "p50": percentile(seconds, 0.5), "p99": percentile(seconds, 0.99),
+            "max": max(seconds) if seconds else None}
+
+
+def rss_bytes(pid="self"):
+    """Resident memory of a process (Linux /proc; falls back to this process's peak RSS)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid != "self":
+        return None
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def _compared(key):
+    # Latency percentiles, durations, throughput and memory; not counts or single-sample maxima
+    name = key.rsplit(".", 1)[-1]
+    return name in ("p50", "p99") or name.endswith(("seconds", "per_second", "_bytes"))
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Metrics more than `tolerance` (a fraction) worse than `baseline`.
+    Throughput ("..._per_second") is higher-is-better; latencies, durations
+    and memory are lower-is-better.
+    """
+    current, previous = flatten(results), flatten(baseline)
+    worse = []
+    for key, old in previous.items():
+        new = current.get(key)
+        if new is None or not old or not _compared(key):
+            continue
+        change = (old - new) / old if key.endswith("per_second") else (new - old) / old
+        if change > tolerance:
+            worse.append((key, old, new, change))
+    return worse
+
+
+def add_output_arguments(parser):
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON (e.g. a new baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="exit non-zero if a metric regressed against this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression vs --baseline (fraction)")
+
+
+def finish(results, args):
+    """Saves results and checks them against --baseline; returns the process exit code."""
+    if args.json:
+        print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        worse = regressions(results, json.load(f), args.tolerance)
+    for key, old, new, change in worse:
+        print(f"REGRESSION {key}: {old:.6g} -> {new:.6g} ({change:+.0%})", file=sys.stderr)
+    return 1 if worse else 0
@@ -0,0 +1,404 @@
+"""Local stand-ins for every upstream service, for offline benchmarks and CI.
+
+One threaded HTTP server answers for all of them:
+
+    GET  /HS.json                                      Comtrade HS reference (hs_store)
+    POST /api/tender/search                            opentender.eu search, paginated (ingestion)
+    GET  /rss/search?q=...                             Google News RSS, ETag-aware (risk_monitor)
+    POST /v1beta/models/<model>:streamGenerateContent  Gemini REST streaming (llm_client)
+    POST /v1beta/models/<model>:generateContent
+
+No recorded fixtures ship with the repository: out of the box every response
+is synthetic, generated deterministically from --seed, so runs are
+reproducible but do not reflect real payload sizes or text. `record` captures
+the live HS reference, tender pages and news feeds into benchmarks/fixtures/
+(git-ignored); when present they are replayed instead. Gemini answers are
+always synthetic.
+Every service has its own latency, jitter and injected error rate:
+
+    python benchmarks/fake_services.py serve --port 8089 --latency 0.05 \\
+        --service gemini:latency=0.4,chunk_delay=0.05 --service tenders:error_rate=0.1
+    eval "$(python benchmarks/fake_services.py env --port 8089)"   # point the apps at it
+    python benchmarks/fake_services.py record                      # refresh the recorded fixtures
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OTHERS = os.path.join(ROOT, "Others")
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+SERVICES = ("hs", "tenders", "rss", "gemini")
+
+WORDS = ["steel", "iron", "stainless", "alloy", "copper", "aluminium", "valves", "pumps", "tubes", "pipes",
+         "machinery", "parts", "engines", "turbines", "cotton", "yarn", "woven", "fabrics", "knitted", "apparel",
+         "vehicles", "motor", "brakes", "gearboxes", "bearings", "drones", "aircraft", "instruments", "optical",
+         "electrical", "transformers", "cables", "chemicals", "organic", "plastics", "rubber", "tyres", "glass",
+         "ceramic", "tiles", "paper", "wood", "furniture", "tea", "coffee", "spices", "rice", "fish", "frozen",
+         "fresh", "dried", "flat-rolled", "hot-rolled", "coated", "forged", "cast", "welded", "seamless"]
+RISK_WORDS = ["EU extends anti-dumping duty on", "CBAM reporting deadline for", "DGFT notification restricts",
+              "EU sanctions update covers", "Relief measures extended for", "FTA talks simplify rules for",
+              "Customs guidance on", "Commission opens countervailing probe into"]
+
+
+class Behaviour:
+    """Latency and error injection for one service."""
+
+    FIELDS = {"latency": float, "jitter": float, "error_rate": float, "error_status": int, "chunk_delay": float}
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, chunk_delay=0.0):
+        self.latency = latency  # seconds before the response starts
+        self.jitter = jitter  # +/- uniform seconds added to latency
+        self.error_rate = error_rate  # share of requests answered with error_status
+        self.error_status = error_status
+        self.chunk_delay = chunk_delay  # seconds between streamed Gemini chunks
+
+    def updated(self, spec):
+        """Copy with "key=value,key=value" overrides applied."""
+        values = dict(vars(self))
+        for item in filter(None, spec.split(",")):
+            key, _, value = item.partition("=")
+            if key not in self.FIELDS:
+                raise ValueError(f"Unknown setting {key!r}; expected one of {', '.join(self.FIELDS)}")
+            values[key] = self.FIELDS[key](value)
+        return Behaviour(**values)
+
+
+# --- FIXTURES ---
+def _fixture(*parts):
+    path = os.path.join(FIXTURES, *parts)
+    return path if os.path.exists(path) else None
+
+
+def hs_reference(seed=0, chapters=97):
+    """HS.json-shaped reference: chapters, headings and subheadings (~6k rows, like the real file)."""
+    path = _fixture("HS.json")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    rng = random.Random(seed)
+    results = []
+    for chapter in range(1, chapters + 1):
+        if chapter == 77:  # Reserved in the Harmonized System
+            continue
+        ch = f"{chapter:02d}"
+        results.append({"id": ch, "text": f"{ch} - {' '.join(rng.sample(WORDS, 3)).capitalize()}", "parent": "TOTAL"})
+        for heading in range(1, rng.randint(8, 14)):
+            hd = f"{ch}{heading:02d}"
+            results.append({"id": hd, "text": f"{hd} - {', '.join(rng.sample(WORDS, 4)).capitalize()}",
+                            "parent": ch})
+            for sub in range(1, rng.randint(4, 9)):
+                code = f"{hd}{sub * 10:02d}"
+                results.append({"id": code, "text": f"{code} - {' '.join(rng.sample(WORDS, 5)).capitalize()}",
+                                "parent": hd})
+    return {"results": results}
+
+
+def tenders(country, cpv, seed=0, count=400):
+    """Tender search results for one market, newest first (opentender.eu `data` records)."""
+    path = _fixture("tenders", f"{country}_{cpv}.json")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["data"]
+    rng = random.Random(f"{seed}:{country}:{cpv}")
+    day = 24 * 3600
+    now = int(time.time() // day * day)  # Stable within a day, so re-syncs find nothing new
+    data = []
+    for i in range(count):
+        published = now - i * day // 4
+        data.append({
+            "id": f"{country}-{cpv}-{i:05d}",
+            "title": f"Supply of {' '.join(rng.sample(WORDS, 4))} for {rng.choice(['municipal', 'regional', 'federal'])} works",
+            "buyer": {"name": f"{rng.choice(['Stadtwerke', 'Ville de', 'Comune di', 'Gemeente'])} {rng.choice(WORDS).title()}"},
+            "value": {"amount": round(rng.uniform(5e4, 5e6), 2)},
+            "bidDeadline": time.strftime("%Y-%m-%dT00:00:00", time.gmtime(published + 30 * day)),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(published)),
+        })
+    return data
+
+
+def rss_feed(query, seed=0, items=30):
+    """Google News-style RSS document for a search query."""
+    path = _fixture("rss", hashlib.sha1(query.encode("utf-8")).hexdigest() + ".xml")
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    rng = random.Random(f"{seed}:{query}")
+    now = int(time.time() // 3600 * 3600)
+    entries = "".join(
+        f"<item><title>{rng.choice(RISK_WORDS)} {' '.join(rng.sample(WORDS, 2))} ({i})</title>"
+        f"<link>https://news.example.com/{quote(query)}/{i}</link>"
+        f"<pubDate>{formatdate(now - i * 5400, usegmt=True)}</pubDate></item>"
+        for i in range(items))
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{query}</title>'
+            f"{entries}</channel></rss>").encode("utf-8")
+
+
+def gemini_chunks(prompt, seed=0, words=120, words_per_chunk=8):
+    """Answer text, split into streamed chunks; the same prompt always gets the same answer."""
+    rng = random.Random(f"{seed}:{prompt}")
+    text = [rng.choice(WORDS) for _ in range(words)]
+    return [" ".join(text[i:i + words_per_chunk]) + " " for i in range(0, words, words_per_chunk)]
+
+
+def _gemini_response(text, finish=False):
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finish:
+        candidate["finishReason"] = "STOP"
+    return {"candidates": [candidate], "usageMetadata": {"promptTokenCount": 0, "totalTokenCount": 0}}
+
+
+def service_env(url):
+    """Environment variables that point every app and store at fake services on `url`."""
+    return {"GTM_HS_URL": f"{url}/HS.json", "GTM_TENDER_URL": f"{url}/api/tender/search",
+            "GTM_NEWS_URL": f"{url}/rss/search", "GTM_GEMINI_ENDPOINT": url, "GEMINI_API_KEY": "fake-key"}
+
+
+# --- SERVER ---
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real upstreams
+    server_version = "FakeUpstream/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json", headers=()):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _route(self):
+        path = urlparse(self.path).path
+        if path.endswith("/HS.json"):
+            return "hs"
+        if path.startswith("/api/tender/search"):
+            return "tenders"
+        if path.startswith("/rss/search"):
+            return "rss"
+        if re.match(r"^/v1beta/models/[^/:]+:(stream)?[gG]enerateContent", path):
+            return "gemini"
+        return None
+
+    def _handle(self):
+        service = self._route()
+        if service is None:
+            self._body()
+            return self._send(404, {"error": f"no fake service at {self.path}"})
+        fake = self.server.fake
+        body = self._body() if self.command == "POST" else None
+        behaviour = fake.behaviours[service]
+        fake.count(service)
+        delay = behaviour.latency + (fake.uniform(-behaviour.jitter, behaviour.jitter) if behaviour.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if behaviour.error_rate and fake.uniform(0, 1) < behaviour.error_rate:
+            fake.count(f"{service}_errors")
+            return self._send(behaviour.error_status, {"error": {"code": behaviour.error_status,
+                                                                 "message": "injected failure",
+                                                                 "status": "UNAVAILABLE"}})
+        getattr(self, f"_serve_{service}")(body)
+
+    do_GET = do_POST = _handle
+
+    def _serve_hs(self, body):
+        payload = self.server.fake.hs_payload
+        etag = f'"{hashlib.sha1(payload).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", headers=[("ETag", etag)])
+        self._send(200, payload, headers=[("ETag", etag)])
+
+    def _serve_tenders(self, body):
+        data = self.server.fake.tenders(body.get("country", ""), body.get("cpv", ""))
+        limit, page = int(body.get("limit", 100)), int(body.get("page", 1))
+        self._send(200, {"data": data[(page - 1) * limit:page * limit], "total": len(data)})
+
+    def _serve_rss(self, body):
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        feed = rss_feed(query, self.server.fake.seed)
+        etag = f'"{hashlib.sha1(feed).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", headers=[("ETag", etag)])
+        self._send(200, feed, "application/rss+xml; charset=UTF-8", headers=[("ETag", etag)])
+
+    def _serve_gemini(self, body):
+        prompt = " ".join(part.get("text", "") for content in body.get("contents", [])
+                          for part in content.get("parts", []))
+        chunks = gemini_chunks(prompt, self.server.fake.seed)
+        if ":generateContent" in self.path:
+            return self._send(200, _gemini_response("".join(chunks), finish=True))
+        # The REST transport reads the stream as one JSON array, element by element
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        delay = self.server.fake.behaviours["gemini"].chunk_delay
+        for i, text in enumerate(chunks):
+            piece = ("[" if i == 0 else ",") + json.dumps(_gemini_response(text, i == len(chunks) - 1))
+            if i == len(chunks) - 1:
+                piece += "]"
+            data = piece.encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            if delay and i < len(chunks) - 1:
+                time.sleep(delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakeServices:
+    """All fake upstreams on one local port. Use as a context manager or start()/stop()."""
+
+    def __init__(self, port=0, host="127.0.0.1", seed=0, behaviours=None):
+        self.seed = seed
+        self.behaviours = {name: Behaviour() for name in SERVICES}
+        self.behaviours.update(behaviours or {})
+        self.hs_payload = json.dumps(hs_reference(seed)).encode("utf-8")
+        self._tenders = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.requests = {}
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        return service_env(self.url)
+
+    def uniform(self, a, b):
+        with self._lock:
+            return self._rng.uniform(a, b)
+
+    def count(self, name):
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+    def tenders(self, country, cpv):
+        key = (country, cpv)
+        if key not in self._tenders:
+            self._tenders[key] = tenders(country, cpv, self.seed)
+        return self._tenders[key]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_behaviours(args):
+    """{service: Behaviour} from --latency/--jitter/--error-rate defaults plus per-service --service overrides."""
+    default = Behaviour(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    behaviours = {name: default for name in SERVICES}
+    for spec in args.service or ():
+        name, _, settings = spec.partition(":")
+        if name not in SERVICES:
+            raise SystemExit(f"Unknown service {name!r}; expected one of {', '.join(SERVICES)}")
+        behaviours[name] = behaviours[name].updated(settings)
+    return behaviours
+
+
+def add_behaviour_arguments(parser):
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of uniform latency noise")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failed with 503")
+    parser.add_argument("--service", action="append", metavar="NAME:KEY=VALUE,...",
+                        help=f"per-service overrides ({', '.join(SERVICES)}; keys: {', '.join(Behaviour.FIELDS)})")
+
+
+# --- RECORDING ---
+def record(timeout=60):
+    """Captures the live HS reference, one tender page per market and the news feeds as fixtures."""
+    import requests
+
+    for name in ("GTM_HS_URL", "GTM_TENDER_URL", "GTM_NEWS_URL"):
+        os.environ.pop(name, None)  # Record the live services, not a running fake
+    sys.path[:0] = [ROOT, OTHERS]
+    from hs_store import HS_REFERENCE_URL
+    from ingestion import INDUSTRY_SEGMENTS, TARGET_COUNTRIES, TENDER_URL, cpv_from_segment
+    from risk_monitor import RISK_FEEDS
+
+    for sub in ("tenders", "rss"):
+        os.makedirs(os.path.join(FIXTURES, sub), exist_ok=True)
+    r = requests.get(HS_REFERENCE_URL, timeout=timeout)
+    r.raise_for_status()
+    with open(os.path.join(FIXTURES, "HS.json"), "wb") as f:
+        f.write(r.content)
+    for country in TARGET_COUNTRIES:
+        for segment in INDUSTRY_SEGMENTS:
+            cpv = cpv_from_segment(segment)
+            r = requests.post(TENDER_URL, json={"cpv": cpv, "country": country, "sort": "date-desc",
+                                                "limit": 100, "page": 1}, timeout=timeout)
+            r.raise_for_status()
+            with open(os.path.join(FIXTURES, "tenders", f"{country}_{cpv}.json"), "wb") as f:
+                f.write(r.content)
+    for url in RISK_FEEDS:
+        query = parse_qs(urlparse(url).query)["q"][0]
+        r = requests.get(url, timeout=timeout)
+        r.raise_for_status()
+        with open(os.path.join(FIXTURES, "rss", hashlib.sha1(query.encode("utf-8")).hexdigest() + ".xml"), "wb") as f:
+            f.write(r.content)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the fake services until interrupted")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8089)
+    add_behaviour_arguments(serve)
+    env = commands.add_parser("env", help="print shell exports pointing the apps at a running server")
+    env.add_argument("--host", default="127.0.0.1")
+    env.add_argument("--port", type=int, default=8089)
+    commands.add_parser("record", help="refresh benchmarks/fixtures from the live services")
+    args = parser.parse_args(argv)
+
+    if args.command == "env":
+        print("\n".join(f"export {k}={v}" for k, v in service_env(f"http://{args.host}:{args.port}").items()))
+    elif args.command == "record":
+        record()
+        print(f"Fixtures written to {FIXTURES}")
+    else:
+        fake = FakeServices(args.port, args.host, args.seed, parse_behaviours(args))
+        print(f"Fake upstreams on {fake.url} (Ctrl+C to stop)", flush=True)
+        try:
+            fake.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
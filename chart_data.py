@@ -0,0 +1,90 @@
+"""Chart data layer: keeps time-series payloads bounded as history grows.
+
+A ChartSeries precomputes totals at every calendar granularity coarser than
+the source data (week, month, quarter, year), so a bar chart picks the
+finest one that fits its point budget. Line charts keep their shape with
+Largest-Triangle-Three-Buckets (LTTB) downsampling instead. Budgets are
+derived from the chart's width in pixels, so the number of points sent to
+the browser stays flat however many years are stored.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+CHART_WIDTH = int(os.environ.get("GTM_CHART_WIDTH", 1200))  # px of a full-width chart in the wide layout
+GRANULARITIES = [("day", "D"), ("week", "W-MON"), ("month", "MS"), ("quarter", "QS"), ("year", "YS")]
+PERIOD_FORMATS = {4: "%Y", 6: "%Y%m", 8: "%Y%m%d"}  # Comtrade-style integer periods
+
+
+def point_budget(width=CHART_WIDTH, px_per_point=2, minimum=24, maximum=2000):
+    """Points worth sending for a chart `width` pixels wide (bars need more pixels per point than lines)."""
+    return int(min(max(width / px_per_point, minimum), maximum))
+
+
+def period_index(periods):
+    """DatetimeIndex from YYYY / YYYYMM / YYYYMMDD periods (or anything pandas can parse)."""
+    values = pd.Series(periods).astype(str)
+    widths = values.str.len().unique()
+    if len(widths) == 1 and widths[0] in PERIOD_FORMATS:
+        return pd.DatetimeIndex(pd.to_datetime(values, format=PERIOD_FORMATS[widths[0]]))
+    return pd.DatetimeIndex(pd.to_datetime(values))
+
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points that best preserve the visual shape of (x, y)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample(frame, budget, column):
+    """Rows of a DatetimeIndex-ed frame reduced to `budget` by LTTB on `column`."""
+    if len(frame) <= budget:
+        return frame
+    return frame.iloc[lttb(frame.index.asi8, frame[column].to_numpy(), budget)]
+
+
+class ChartSeries:
+    def __init__(self, frame, how="sum"):
+        """`frame`: numeric columns on a DatetimeIndex, at whatever granularity the source reports."""
+        frame = frame.sort_index()
+        self.levels = [("period", frame)]  # (granularity, frame), finest first
+        for name, rule in GRANULARITIES:
+            aggregated = frame.resample(rule).agg(how)
+            if len(aggregated) < len(self.levels[-1][1]):
+                self.levels.append((name, aggregated))
+
+    def __len__(self):
+        return len(self.levels[0][1])
+
+    def at(self, budget, column=None):
+        """
+        (granularity, frame) at the finest granularity with at most `budget`
+        rows. If even yearly totals do not fit, they are LTTB-downsampled on
+        `column` (default: the first).
+        """
+        for name, frame in self.levels:
+            if len(frame) <= budget:
+                return name, frame
+        name, frame = self.levels[-1]
+        return name, downsample(frame, budget, column or frame.columns[0])
+
+    def shape(self, budget, column):
+        """Source-granularity rows LTTB-downsampled on `column`, for line charts."""
+        return downsample(self.levels[0][1], budget, column)
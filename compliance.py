@@ -0,0 +1,120 @@
+"""Vectorized SCOMET / CBAM / duty / export-policy screening for single codes and whole catalogues.
+
+Flags are looked up from per-chapter tables with array indexing, so a chunk
+of any size is screened in a handful of NumPy operations. Large catalogues
+are screened chunk by chunk in-process, with each chunk yielded as soon as it
+finishes so the page can show progress.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from export_policy import POLICIES, TABLE_PATH, ExportPolicyTable
+
+SCOMET_CHAPTERS = ["84", "85", "88", "90"]
+CBAM_CHAPTERS = ["72", "73", "76"]
+EU_MFN_DUTY = 4.5  # % applied when no chapter-specific rate is known
+DUTY_BY_CHAPTER = {}  # Chapter-specific overrides, e.g. {"84": 1.7}
+
+CHUNK_SIZE = 50_000
+# Digits with the usual separators ("8481.80", "8481 80 81"); anything else is not an HS code
+HS_CODE_PATTERN = r"[\d.\s-]+"
+
+# Lookup tables indexed by the numeric HS chapter (0-99)
+SCOMET_TABLE = np.zeros(100, dtype=bool)
+SCOMET_TABLE[[int(c) for c in SCOMET_CHAPTERS]] = True
+CBAM_TABLE = np.zeros(100, dtype=bool)
+CBAM_TABLE[[int(c) for c in CBAM_CHAPTERS]] = True
+DUTY_TABLE = np.full(100, EU_MFN_DUTY)
+DUTY_TABLE[[int(c) for c in DUTY_BY_CHAPTER]] = list(DUTY_BY_CHAPTER.values())
+
+# DGFT export policy (Schedule-2), compiled offline by `python export_policy.py build`
+POLICY_TABLE = ExportPolicyTable() if os.path.exists(TABLE_PATH) else None
+
+
+def _policy_arrays(table):
+    """NumPy views of the policy intervals plus a sparse table for O(1) range-max queries."""
+    starts = np.frombuffer(table.starts, dtype=np.uint32).astype(np.int64)
+    ends = np.frombuffer(table.ends, dtype=np.uint32).astype(np.int64)
+    levels = [np.frombuffer(table.policy, dtype=np.uint8).astype(np.int8)]
+    while (1 << len(levels)) <= len(starts):
+        half = 1 << (len(levels) - 1)
+        prev = levels[-1]
+        levels.append(np.concatenate([np.maximum(prev[:-half], prev[half:]), prev[-half:]]))
+    return starts, ends, np.vstack(levels)
+
+
+POLICY_ARRAYS = _policy_arrays(POLICY_TABLE) if POLICY_TABLE is not None else None
+
+
+def export_policy(codes):
+    """
+    Vectorized policy lookup for digit strings (Series). Codes shorter than 8
+    digits get the most restrictive policy among their tariff lines.
+    """
+    if POLICY_ARRAYS is None or not len(codes):
+        return np.full(len(codes), None, dtype=object)
+    starts, ends, sparse = POLICY_ARRAYS
+    digits = codes.str[:8]
+    pad = 8 - digits.str.len().to_numpy()
+    base = pd.to_numeric(digits, errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+    lo = base * 10 ** pad
+    hi = lo + 10 ** pad - 1
+    first = np.searchsorted(ends, lo, "left")
+    last = np.searchsorted(starts, hi, "right") - 1
+    found = (first <= last) & (base >= 0)
+    length = np.where(found, last - first + 1, 1)
+    level = np.floor(np.log2(length)).astype(np.int64)
+    first, last = np.clip(first, 0, len(starts) - 1), np.clip(last, 0, len(starts) - 1)
+    policy = np.maximum(sparse[level, first], sparse[level, np.clip(last - (1 << level) + 1, 0, None)])
+    return np.where(found, np.array(POLICIES, dtype=object)[policy], None)
+
+
+def screen(hs_codes):
+    """Screens an array-like of HS codes. Returns one row of flags per input code."""
+    raw = pd.Series(hs_codes, dtype=str).str.strip()
+    codes = raw.str.replace(r"\D", "", regex=True)
+    digits = codes.str.len().to_numpy()
+    chapter = pd.to_numeric(codes.str[:2], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    numeric = raw.str.fullmatch(HS_CODE_PATTERN).fillna(False).to_numpy(dtype=bool)
+    valid = numeric & np.isin(digits, (2, 4, 6, 8, 10)) & (chapter >= 1) & (chapter <= 97)
+    chapter = np.where(valid, chapter, 0)
+    return pd.DataFrame({
+        "HS": codes.to_numpy(),
+        "Valid": valid,
+        "SCOMET": SCOMET_TABLE[chapter] & valid,
+        "CBAM": CBAM_TABLE[chapter] & valid,
+        "EU_MFN_Duty_%": np.where(valid, DUTY_TABLE[chapter], np.nan),
+        "Export_Policy": np.where(valid, export_policy(codes), None),
+    }, index=codes.index)
+
+
+def check(hs_code):
+    """Flags for a single HS code, as a plain dict (duty is None for an invalid code)."""
+    row = screen([hs_code]).iloc[0]
+    valid = bool(row["Valid"])
+    policy = POLICY_TABLE.lookup(hs_code) if POLICY_TABLE is not None and valid else None
+    return {"valid": valid, "scomet": bool(row["SCOMET"]), "cbam": bool(row["CBAM"]),
+            "duty": float(row["EU_MFN_Duty_%"]) if valid else None,
+            "export_policy": policy[0] if policy else None, "policy_condition": policy[1] if policy else None}
+
+
+def iter_screen_chunks(hs_codes, chunk_size=CHUNK_SIZE):
+    """
+    Screens a large Series of HS codes chunk by chunk. Yields
+    (rows_done, rows_total, chunk_result) as each chunk completes.
+    """
+    hs_codes = pd.Series(hs_codes)
+    total = len(hs_codes)
+    for start in range(0, total, chunk_size):
+        chunk = hs_codes.iloc[start:start + chunk_size]
+        yield start + len(chunk), total, screen(chunk)
+
+
+def read_catalogue(name, data):
+    """Reads an uploaded CSV/XLSX catalogue with every column as text (keeps leading zeros)."""
+    if name.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(io.BytesIO(data), dtype=str)
+    return pd.read_csv(io.BytesIO(data), dtype=str)
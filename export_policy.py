@@ -0,0 +1,214 @@
+"""Compiled ITC(HS) export-policy lookup built from the bundled DGFT notifications.
+
+The Schedule-2 entries (ITC-HS code -> Free / Restricted / Prohibited / STE
+and its policy condition) are extracted offline from the PDFs and compiled
+into a sorted table of disjoint 8-digit code intervals, where the most
+specific entry wins. Lookups are two bisects plus a sparse-table range-max
+for codes shorter than 8 digits; the compiled table is a small binary file
+that loads in well under a millisecond.
+
+Coverage: the bundled PDFs only list Schedule-2 chapters 01-39, so every code
+in chapter 40 or above looks up as None ("not covered"), which says nothing
+about whether its export is restricted.
+
+    python export_policy.py build    # recompile after DGFT publishes a new notification
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PDFS = [
+    os.path.join(ROOT, "English-Notification No. 60-2023.pdf"),
+    os.path.join(ROOT, "General_Note_on_Export_Policy_2025.pdf"),
+]
+TABLE_PATH = os.path.join(ROOT, "export_policy.bin")
+
+# Ordered from least to most restrictive; the index is the stored policy code
+POLICIES = ["Free", "STE", "Restricted", "Prohibited"]
+ENTRY_RE = re.compile(r"^(\d{1,2}) (\d{4}|\d{6}|\d{8})\b\s*(.*)$")
+POLICY_RE = re.compile(r"-\s*(Free|Restricted|Prohibited|STE)\b\s*(.*)$", re.DOTALL)
+MAX_CONDITION = 200
+# Trailing "Notification No" / "Notification Date" columns, e.g. "47/2015-2020 22.12.2020" or
+# "2(RE-2012)/2009- 2014 08.06.2012"; a row amended several times lists every notification
+NOTIFICATION = (r"\d{1,2}\.\d{1,2}\.\d{4}|\d+\s*(?:\(\s*RE\s*[-–]\s*\d{4}\s*\))?\s*/\s*\d{4}(?:\s*[-–]\s*\d{2,4})?"
+                r"|\d+\s*\(\s*RE\s*[-–]\s*\d{4}\s*\)|\d{4}\s*[-–]\s*\d{2,4}")
+NOTIFICATION_TAIL_RE = re.compile(rf"(?:\s*(?:Notification No\.?\s*)?(?:{NOTIFICATION}))+\s*$")
+# The next chapter's heading, picked up as a continuation of the last row on the page
+CHAPTER_HEADING_RE = re.compile(r"\bCHAPTER \d{1,2}\b.*$", re.DOTALL)
+
+
+# --- COMPILER ---
+def iter_entries(lines):
+    """Yields (code, text) for each Schedule-2 row; a row may wrap over several lines."""
+    code, parts = None, []
+    for line in lines:
+        match = ENTRY_RE.match(line.strip())
+        # The chapter column must agree with the code, which filters out unrelated tables
+        if match and match.group(2)[:2] == f"{int(match.group(1)):02d}":
+            if code:
+                yield code, " ".join(parts)
+            code, parts = match.group(2), [match.group(3)]
+        elif code:
+            parts.append(line.strip())
+    if code:
+        yield code, " ".join(parts)
+
+
+def iter_pdf_lines(path):
+    from pypdf import PdfReader  # Only needed to rebuild the table
+
+    for page in PdfReader(path).pages:  # Page by page, so large notifications stream
+        yield from (page.extract_text() or "").splitlines()
+
+
+def parse_policy(text):
+    match = POLICY_RE.search(text)
+    if not match:
+        return None
+    condition = CHAPTER_HEADING_RE.sub("", re.sub(r"\s+", " ", match.group(2)))
+    tail = NOTIFICATION_TAIL_RE.search(condition)
+    # Only with a notification number: a bare date ("Prohibited till 31.03.2024") is part of the condition
+    if tail and re.search(r"/|\(\s*RE", tail.group()):
+        condition = condition[:tail.start()]
+    return POLICIES.index(match.group(1)), condition.strip()[:MAX_CONDITION]
+
+
+def flatten(entries):
+    """
+    Turns nested (start, end, policy, condition) code ranges into disjoint
+    intervals where the innermost (most specific) range wins.
+    """
+    out = []
+
+    def emit(lo, hi, entry):
+        if lo <= hi:
+            out.append((lo, hi, entry[2], entry[3]))
+
+    stack, cursor = [], 0
+    for entry in sorted(entries, key=lambda e: (e[0], -e[1])):
+        while stack and stack[-1][1] < entry[0]:
+            top = stack.pop()
+            emit(cursor, top[1], top)
+            cursor = top[1] + 1
+        if stack:
+            emit(cursor, entry[0] - 1, stack[-1])
+        stack.append(entry)
+        cursor = entry[0]
+    while stack:
+        top = stack.pop()
+        emit(cursor, top[1], top)
+        cursor = top[1] + 1
+    return out
+
+
+def compile_table(pdfs=SOURCE_PDFS, path=TABLE_PATH):
+    entries = {}
+    for pdf in pdfs:
+        for code, text in iter_entries(iter_pdf_lines(pdf)):
+            parsed = parse_policy(text)
+            if parsed:
+                # Later sources (newer notifications) override earlier ones
+                entries[code] = parsed
+
+    ranges = []
+    for code, (policy, condition) in entries.items():
+        pad = 8 - len(code)
+        ranges.append((int(code) * 10 ** pad, int(code) * 10 ** pad + 10 ** pad - 1, policy, condition))
+    intervals = flatten(ranges)
+
+    conditions = sorted({c for *_, c in intervals})
+    condition_idx = {c: i for i, c in enumerate(conditions)}
+    header = {
+        "version": time.strftime("%Y-%m-%d"),
+        "sources": [{"file": os.path.basename(p), "sha256": hashlib.sha256(open(p, "rb").read()).hexdigest()}
+                    for p in pdfs],
+        "entries": len(entries),
+        "intervals": len(intervals),
+        "policies": POLICIES,
+        "conditions": conditions,
+    }
+    with open(path, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(array("I", [lo for lo, *_ in intervals]).tobytes())
+        f.write(array("I", [hi for _, hi, *_ in intervals]).tobytes())
+        f.write(array("B", [p for _, _, p, _ in intervals]).tobytes())
+        f.write(array("H", [condition_idx[c] for *_, c in intervals]).tobytes())
+    return header
+
+
+# --- LOOKUP ---
+class ExportPolicyTable:
+    def __init__(self, path=TABLE_PATH):
+        with open(path, "rb") as f:
+            self.header = json.loads(f.readline())
+            blob = f.read()
+        n = self.header["intervals"]
+        self.starts, self.ends = array("I"), array("I")
+        self.policy, self.condition = array("B"), array("H")
+        offset = 0
+        for column in (self.starts, self.ends, self.policy, self.condition):
+            size = n * column.itemsize
+            column.frombytes(blob[offset:offset + size])
+            offset += size
+
+    @property
+    def version(self):
+        return self.header["version"]
+
+    @cached_property
+    def _sparse(self):
+        """
+        Range-max over `policy`: level k holds, for each i, the index of the most
+        restrictive interval in i .. i + 2**k - 1 (the first one on ties).
+        Built on the first short-code lookup.
+        """
+        policy = self.policy
+        levels = [array("I", range(len(policy)))]
+        while (1 << len(levels)) <= len(policy):
+            prev, half = levels[-1], 1 << (len(levels) - 1)
+            level = array("I", prev)
+            for i in range(len(policy) - half):
+                a, b = prev[i], prev[i + half]
+                level[i] = b if policy[b] > policy[a] else a
+            levels.append(level)
+        return levels
+
+    def _span(self, hs_code):
+        digits = re.sub(r"\D", "", str(hs_code))[:8]
+        if not digits:
+            return None
+        pad = 8 - len(digits)
+        return int(digits) * 10 ** pad, int(digits) * 10 ** pad + 10 ** pad - 1
+
+    def lookup(self, hs_code):
+        """
+        Returns (policy, condition) for an HS / ITC-HS code, or None when the
+        code is not covered. Codes shorter than 8 digits report the most
+        restrictive policy among their tariff lines.
+        """
+        span = self._span(hs_code)
+        if span is None:
+            return None
+        lo, hi = span
+        # Intervals are disjoint and sorted, so the ones overlapping lo..hi are a contiguous run
+        first, last = bisect_left(self.ends, lo), bisect_right(self.starts, hi) - 1
+        if first > last:
+            return None
+        level = (last - first + 1).bit_length() - 1
+        a, b = self._sparse[level][first], self._sparse[level][last - (1 << level) + 1]
+        best = b if self.policy[b] > self.policy[a] else a
+        return POLICIES[self.policy[best]], self.header["conditions"][self.condition[best]]
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        sys.exit("usage: python export_policy.py build")
+    info = compile_table()
+    print(f"{TABLE_PATH}: {info['entries']} entries -> {info['intervals']} intervals (version {info['version']})")
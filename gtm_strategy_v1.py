@@ -1,12 +1,24 @@
+import os
+import sys
+import uuid
 import streamlit as st
-import pandas as pd
-import numpy as np
-import requests
-import plotly.express as px
-import google.generativeai as genai
+
+# The trade-flow store lives with the Command Center modules in Others/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Others"))
+
+from hs_search import HSSearchIndex
+from hs_store import REFRESH_INTERVAL, HSReferenceStore
+from llm_cache import ResponseCache
+from llm_client import Generation, configure
+from llm_scheduler import SchedulerBusy, get_scheduler
+from perf import begin_run, count, debug_panel, end_run, serve_metrics, stage, traced
+# pandas/NumPy (compliance), plotly and scikit-learn (policy_index) are imported
+# where first needed, so the search page paints without loading them
 
 # --- 1. SETUP & THEME ---
 st.set_page_config(page_title="Bharat-EU Genius Dashboard", layout="wide")
+run = begin_run("strategy")  # Per-stage timings of this rerun; see perf.py
+serve_metrics()
 
 # Modern UI Styling
 st.markdown("""
@@ -16,16 +28,67 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# API Keys (Replace with your actual keys)
-GEMINI_API_KEY = "YOUR_GEMINI_API_KEY"
+# API Keys (Replace with your actual keys, or set GEMINI_API_KEY)
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY")
 if GEMINI_API_KEY != "YOUR_GEMINI_API_KEY":
-    genai.configure(api_key=GEMINI_API_KEY)
+    configure(GEMINI_API_KEY)
 
 # --- 2. DATA ENGINES ---
-@st.cache_data
-def fetch_hsn_metadata():
-    url = "https://comtradeapi.un.org/files/v1/app/reference/HS.json"
-    return requests.get(url).json()['results']
+MAX_MATCHES = 50
+EU_MARKETS = ["Germany", "France", "Italy", "Spain", "Netherlands"]  # Comtrade reporters (trade_store.ISO3)
+ANSWER_TIMEOUT = 120  # Seconds a question may wait for the model before the chat gives up
+
+@st.cache_resource(ttl=REFRESH_INTERVAL)
+def hs_reference_version():
+    # Conditional GET at most once per refresh interval; the catalogue and index
+    # below are keyed on the stored version, so they are rebuilt only when the
+    # remote copy actually changed
+    store = HSReferenceStore()
+    store.refresh_if_stale()
+    return store.version()
+
+@st.cache_resource(max_entries=1)
+@traced("fetch_hsn_metadata")
+def fetch_hsn_metadata(version):
+    # Served from the local store. cache_resource hands every session the same
+    # read-only HSCatalogue instead of unpickling a private copy on each call.
+    return HSReferenceStore().load()
+
+@st.cache_resource(max_entries=1)
+@traced("build_hs_index")
+def build_hs_index(version):
+    # Built once per reference version and shared by every session
+    return HSSearchIndex(fetch_hsn_metadata(version))
+
+@st.cache_resource
+@traced("build_policy_index")
+def get_policy_index():
+    # BM25 passages from the bundled DGFT PDFs; only new/changed PDFs are re-read
+    from policy_index import PolicyIndex
+    return PolicyIndex.load_or_build()
+
+@st.cache_resource
+def get_trade_store():
+    # Memory-mapped Comtrade flows, shared by every session (see Others/trade_store.py)
+    from trade_store import TradeFlowStore
+    return TradeFlowStore()
+
+@st.cache_resource(max_entries=256)
+@traced("demand_series")
+def demand_series(hs_code, market):
+    # Import value per period from every partner, computed once per selection
+    import pandas as pd
+    from chart_data import ChartSeries, period_index
+    demand = get_trade_store().import_demand(hs_code, market)
+    if demand.empty:
+        return None
+    return ChartSeries(pd.DataFrame({'Value': (demand['Value'] / 1e6).to_numpy()},  # M €
+                                    index=period_index(demand['Period'])))
+
+@st.cache_resource
+def get_response_cache():
+    # Shared by every session; persisted in data/llm_cache.sqlite
+    return ResponseCache()
 
 def reset_session():
     st.session_state.confirmed_hs = None
@@ -33,6 +96,8 @@ def reset_session():
 # --- 3. SESSION STATE ---
 if 'confirmed_hs' not in st.session_state:
     st.session_state.confirmed_hs = None
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex  # Fair-share key for the model request scheduler
 
 # --- 4. THE SEARCH HERO ---
 if not st.session_state.confirmed_hs:
@@ -40,15 +105,49 @@ if not st.session_state.confirmed_hs:
     query = st.text_input("Search by Product Name or HS Code", placeholder="e.g. 'Steel' or '8481'")
     
     if query:
-        data = fetch_hsn_metadata()
-        matches = [i for i in data if query.lower() in i['text'].lower() or query in i['id']]
+        index = build_hs_index(hs_reference_version())
+        with stage("hs.search"):
+            matches = index.search(query, limit=MAX_MATCHES)
         if matches:
-            selected = st.selectbox("Confirm Product:", matches, format_func=lambda x: f"HS {x['id']} - {x['text']}")
+            selected = st.selectbox("Confirm Product:", matches, format_func=lambda x: f"HS {x.id} - {x.text}")
             if st.button("Unlock Strategy Dashboard →", type="primary"):
-                st.session_state.confirmed_hs = selected['id']
-                st.session_state.confirmed_text = selected['text']
+                st.session_state.confirmed_hs = selected.id
+                st.session_state.confirmed_text = selected.text
                 st.rerun()
 
+    # Bulk mode: screen a whole catalogue instead of typing codes one by one
+    with st.expander("📦 Bulk Catalogue Screening (CSV / XLSX)"):
+        upload = st.file_uploader("Upload a catalogue with an HS code column", type=["csv", "xlsx"])
+        if upload:
+            import pandas as pd
+            from compliance import iter_screen_chunks, read_catalogue
+            catalogue = read_catalogue(upload.name, upload.getvalue())
+            guess = next((i for i, c in enumerate(catalogue.columns) if "hs" in c.lower()), 0)
+            column = st.selectbox("HS code column", catalogue.columns, index=guess)
+            if st.button("Screen Catalogue", type="primary"):
+                progress, live = st.progress(0.0), st.empty()
+                chunks, flagged = [], 0
+                with stage("compliance.screen"):
+                    for done, total, chunk in iter_screen_chunks(catalogue[column]):
+                        chunks.append(chunk)
+                        flagged += int((chunk["SCOMET"] | chunk["CBAM"]).sum())
+                        progress.progress(done / total, text=f"Screened {done:,} / {total:,} rows")
+                        live.caption(f"{flagged:,} rows flagged so far")
+                screened = pd.concat(chunks).sort_index().drop(columns="HS")
+                # Uploaded columns named like the results (e.g. an earlier export) are kept, renamed
+                clashes = {c: f"{c} (uploaded)" for c in screened.columns if c in catalogue.columns}
+                st.session_state.screening = (upload.name, catalogue.rename(columns=clashes).join(screened))
+
+            if st.session_state.get("screening", (None,))[0] == upload.name:
+                results = st.session_state.screening[1]
+                s1, s2, s3 = st.columns(3)
+                s1.metric("SCOMET Flags", int(results["SCOMET"].sum()))
+                s2.metric("CBAM Flags", int(results["CBAM"].sum()))
+                s3.metric("Invalid Codes", int((~results["Valid"]).sum()))
+                st.dataframe(results.head(1000), use_container_width=True, hide_index=True)
+                st.download_button("Download Screening Results (CSV)", results.to_csv(index=False),
+                                   file_name="compliance_screening.csv", mime="text/csv")
+
 # --- 5. THE RAG DASHBOARD ---
 else:
     hs = st.session_state.confirmed_hs
@@ -60,34 +159,95 @@ else:
     col_r.button("New Search", on_click=reset_session)
 
     # Metrics Row
+    from compliance import check
     m1, m2, m3, m4 = st.columns(4)
-    chapter = hs[:2]
-    is_scomet = chapter in ["84", "85", "88", "90"]
-    is_cbam = chapter in ["72", "73", "76"]
+    with stage("compliance.check"):
+        flags = check(hs)
+    is_scomet = flags["scomet"]
+    is_cbam = flags["cbam"]
     
-    m1.metric("EU MFN Duty", "4.5%")
+    m1.metric("EU MFN Duty", f"{flags['duty']:g}%" if flags["valid"] else "n/a")
     m2.metric("SCOMET Status", "🚨 ALERT" if is_scomet else "✅ SAFE")
     m3.metric("CBAM Risk", "⚠️ HIGH" if is_cbam else "✅ LOW")
     m4.metric("Market Sentiment", "Bullish")
+    if flags["export_policy"]:
+        condition = flags["policy_condition"] or ("no restriction" if flags["export_policy"] == "Free" else "")
+        st.caption(f"DGFT export policy (ITC-HS Schedule 2): **{flags['export_policy']}**"
+                   + (f" — {condition}" if condition else ""))
+    elif flags["valid"]:
+        # The bundled notifications only cover chapters 01-39; no entry is not the same as "Free"
+        st.caption("DGFT export policy (ITC-HS Schedule 2): **not covered** by the bundled notifications "
+                   "— check the current Schedule 2 before shipping")
 
     # Tabs for Data and AI
     tab_data, tab_ai = st.tabs(["📊 Market Analytics", "🤖 RAG Strategy Analyst"])
 
     with tab_data:
-        # Dynamic Chart
-        df = pd.DataFrame({'Month': ['Jan', 'Feb', 'Mar', 'Apr'], 'Value': np.random.randint(10, 100, 4)})
-        st.plotly_chart(px.line(df, x='Month', y='Value', title="Import Demand Curve"), use_container_width=True)
+        # Import demand from the local Comtrade trade-flow store
+        import plotly.express as px
+        from chart_data import point_budget
+        market = st.selectbox("EU market", EU_MARKETS)
+        with stage("chart.dataframe"):
+            series = demand_series(hs, market)
+            # Long histories are LTTB-downsampled to what a full-width chart can show
+            df = series.shape(point_budget(), 'Value').rename_axis('Month').reset_index() if series else None
+        if df is None:
+            st.info(f"No Comtrade import data loaded for HS {hs} into {market}. "
+                    "Load bulk files with `python Others/trade_store.py import ...`.")
+        else:
+            with stage("chart.figure"):
+                fig = px.line(df, x='Month', y='Value', labels={'Value': 'Imports (M €)'},
+                              title=f"Import Demand Curve: {market}")
+            st.plotly_chart(fig, use_container_width=True)
 
     with tab_ai:
         st.subheader("Context-Aware RAG Assistant")
         # Injects current dashboard context into Gemini
         if user_msg := st.chat_input("Ask about compliance or market entry..."):
+            from policy_index import format_passages
             with st.chat_message("assistant"):
                 context = f"User is exporting {name} (HS {hs}). SCOMET: {is_scomet}, CBAM: {is_cbam}."
+                # Ground the answer in the top-k policy passages instead of whole documents
+                policy_index = get_policy_index()
+                with stage("policy.search"):
+                    passages = policy_index.search(f"{user_msg} {name}", k=4)
+                if passages:
+                    context += f"\n\nRelevant DGFT export-policy passages:\n{format_passages(passages)}"
                 
                 if GEMINI_API_KEY != "YOUR_GEMINI_API_KEY":
-                    model = genai.GenerativeModel('gemini-1.5-flash')
-                    response = model.generate_content(f"Context: {context}. User Question: {user_msg}")
-                    st.write(response.text)
+                    # Repeated questions in the same context skip the model call
+                    cache_context = {"hs": hs, "scomet": is_scomet, "cbam": is_cbam,
+                                     "passages": [f"{p['source']}:{p['page']}" for p in passages]}
+                    answer = get_response_cache().get(cache_context, user_msg)
+                    count("cache_lookups", cache="llm_response", result="miss" if answer is None else "hit")
+                    if answer is None:
+                        # A new message supersedes any answer still streaming for this session
+                        if st.session_state.get("generation"):
+                            st.session_state.generation.cancel()
+                        generation = st.session_state.generation = Generation()
+                        try:
+                            # Queued behind the process-wide rate limit, shared with identical in-flight prompts
+                            with stage("llm.answer"):
+                                answer = st.write_stream(get_scheduler().stream(
+                                    f"Context: {context}. User Question: {user_msg}",
+                                    user=st.session_state.session_id, generation=generation,
+                                    timeout=ANSWER_TIMEOUT))
+                        except (SchedulerBusy, TimeoutError) as exc:
+                            st.warning(str(exc))
+                        except Exception as exc:
+                            # Provider errors (bad key, 4xx) and transient ones that outlived the retries
+                            st.warning(f"The assistant could not answer this question: {exc}")
+                        # Only complete answers are cached, never a cancelled or failed partial one
+                        if generation.completed:
+                            get_response_cache().put(cache_context, user_msg, answer)
+                    else:
+                        st.caption("⚡ Answered from cache")
+                        st.write(answer)
+                    if passages:
+                        st.caption("Sources: " + "; ".join(f"{p['source']} p.{p['page']}" for p in passages))
                 else:
-                    st.warning("Please configure your Gemini API Key to enable RAG features.")
\ No newline at end of file
+                    st.warning("Please configure your Gemini API Key to enable RAG features.")
+
+# --- 6. PERFORMANCE ---
+end_run(run)
+debug_panel(run)
@@ -0,0 +1,45 @@
+"""Compact, read-only HS catalogue shared by every Streamlit session.
+
+Each HS row is an immutable HSEntry (a slotted tuple) instead of a dict, ids
+and parent codes are interned, and duplicate descriptions across HS revisions
+share one string. The catalogue is built once per process and handed out by
+reference, so sessions never copy or unpickle it.
+"""
+import sys
+from collections.abc import Sequence
+from typing import NamedTuple, Optional
+
+
+class HSEntry(NamedTuple):
+    id: str
+    text: str
+    parent: Optional[str]
+
+
+class HSCatalogue(Sequence):
+    __slots__ = ("_entries", "_by_id")
+
+    def __init__(self, rows):
+        """`rows` is any iterable of (id, text, parent) tuples."""
+        texts = {}
+        entries = []
+        for hs_id, text, parent in rows:
+            entries.append(HSEntry(sys.intern(hs_id), texts.setdefault(text, text),
+                                   sys.intern(parent) if parent else None))
+        self._entries = tuple(entries)
+        by_id = {}
+        for entry in self._entries:
+            by_id.setdefault(entry.id, entry)
+        self._by_id = by_id
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        return self._entries[index]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def get(self, hs_id, default=None):
+        return self._by_id.get(hs_id, default)
@@ -0,0 +1,161 @@
+"""Prebuilt search index for the Comtrade HS reference.
+
+The search hero used to lowercase and scan every HS description on every
+keystroke. This index is built once per process: a prefix trie over HS ids
+answers numeric queries, and an inverted token index (plus a trigram index
+over the vocabulary for typo tolerance) answers product-name queries. An id
+query costs one trie walk; a word query walks the posting list of each
+matching vocabulary token, so rare words are cheap and very common ones cost
+up to one pass over the records that contain them.
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import nsmallest
+from math import log
+
+TOKEN_RE = re.compile(r"[a-z]+|\d+")
+STOPWORDS = frozenset({"a", "an", "and", "or", "of", "the", "for", "in", "on", "with", "to", "by"})
+
+# Relative weight of an exact token hit vs. a prefix (as-you-type) or fuzzy hit
+EXACT_WEIGHT, PREFIX_WEIGHT, FUZZY_WEIGHT = 1.0, 0.8, 0.6
+MAX_PREFIX_EXPANSIONS = 64
+MIN_FUZZY_LEN = 4
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_edits(a, b, max_edits):
+    """Bounded Levenshtein check: True if a and b differ by at most max_edits."""
+    if abs(len(a) - len(b)) > max_edits:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_edits:
+            return False
+        previous = current
+    return previous[-1] <= max_edits
+
+
+class _TrieNode:
+    __slots__ = ("children", "positions")
+
+    def __init__(self):
+        self.children = {}
+        self.positions = []
+
+
+class HSSearchIndex:
+    """Ranked, typo-tolerant search over HS records (HSEntry rows from hs_catalogue)."""
+
+    def __init__(self, records):
+        # General headings before their subheadings, so capped results stay useful.
+        # Holds references to the shared catalogue entries, not copies.
+        self.records = sorted(records, key=lambda r: (len(r.id), r.id))
+        self._trie = _TrieNode()
+        postings = defaultdict(list)
+
+        for pos, record in enumerate(self.records):
+            node = self._trie
+            for ch in record.id:
+                node = node.children.setdefault(ch, _TrieNode())
+                node.positions.append(pos)
+            for token in set(tokenize(record.text)):
+                postings[token].append(pos)
+
+        n_docs = max(len(self.records), 1)
+        self._postings = dict(postings)
+        self._idf = {t: log(1 + n_docs / len(p)) for t, p in postings.items()}
+        self._vocab = sorted(postings)
+        self._trigrams = defaultdict(list)
+        for token in self._vocab:
+            for gram in trigrams(token):
+                self._trigrams[gram].append(token)
+
+    def __len__(self):
+        return len(self.records)
+
+    # --- ID LOOKUP ---
+    def _id_prefix(self, prefix):
+        node = self._trie
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.positions
+
+    # --- TEXT LOOKUP ---
+    def _expand(self, token, is_last):
+        """Maps a query token to {vocab token: weight} for exact, prefix and fuzzy hits."""
+        hits = {}
+        if token in self._postings:
+            hits[token] = EXACT_WEIGHT
+        if is_last:
+            # The user is probably still typing the final word
+            start = bisect_left(self._vocab, token)
+            for candidate in self._vocab[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not candidate.startswith(token):
+                    break
+                hits.setdefault(candidate, PREFIX_WEIGHT)
+        if not hits and len(token) >= MIN_FUZZY_LEN:
+            grams = trigrams(token)
+            shared = defaultdict(int)
+            for gram in grams:
+                for candidate in self._trigrams.get(gram, ()):
+                    shared[candidate] += 1
+            max_edits = 1 if len(token) <= 5 else 2
+            for candidate, count in shared.items():
+                dice = 2 * count / (len(grams) + len(candidate) + 2)
+                if dice >= 0.4 and within_edits(token, candidate, max_edits):
+                    hits[candidate] = FUZZY_WEIGHT
+        return hits
+
+    def _score_token(self, token, is_last):
+        scores = {}
+        for candidate, weight in self._expand(token, is_last).items():
+            score = weight * self._idf[candidate]
+            for pos in self._postings[candidate]:
+                if score > scores.get(pos, 0.0):
+                    scores[pos] = score
+        return scores
+
+    def search(self, query, limit=50):
+        """Returns up to `limit` records ranked by relevance."""
+        query = query.strip()
+        if not query:
+            return []
+
+        compact = re.sub(r"[\s.]", "", query)
+        if compact.isdigit():
+            return [self.records[p] for p in self._id_prefix(compact)[:limit]]
+
+        tokens = tokenize(query)
+        codes = [t for t in tokens if t.isdigit()]
+        words = [t for t in tokens if not t.isdigit()]
+        allowed = None
+        for code in codes:
+            matched = set(self._id_prefix(code))
+            allowed = matched if allowed is None else allowed & matched
+        if not words:
+            return [self.records[p] for p in sorted(allowed or ())[:limit]]
+
+        per_token = [self._score_token(t, i == len(words) - 1) for i, t in enumerate(words)]
+        candidates = set.intersection(*(set(s) for s in per_token))
+        if not candidates:
+            # No record matches every word: fall back to best partial matches
+            candidates = set().union(*per_token)
+        if allowed is not None:
+            candidates &= allowed
+
+        ranked = nsmallest(limit, candidates, key=lambda p: (-sum(s.get(p, 0.0) for s in per_token), p))
+        return [self.records[p] for p in ranked]
@@ -0,0 +1,143 @@
+"""Persistent local store for the Comtrade HS reference.
+
+The reference is downloaded once into a SQLite file and afterwards only
+re-downloaded when the remote ETag / Last-Modified changes, so container
+starts open the local copy instead of fetching and parsing HS.json. The store
+can also be seeded from a local HS.json for air-gapped deployments:
+
+    python hs_store.py                 # build or conditionally refresh
+    python hs_store.py --import HS.json
+"""
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+
+import requests
+
+from hs_catalogue import HSCatalogue
+from perf import record_response
+
+HS_REFERENCE_URL = os.environ.get("GTM_HS_URL", "https://comtradeapi.un.org/files/v1/app/reference/HS.json")
+DATA_DIR = os.environ.get("GTM_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+DEFAULT_PATH = os.path.join(DATA_DIR, "hs_reference.sqlite")
+
+# How often a running pod re-checks the remote copy; GTM_OFFLINE=1 never does
+REFRESH_INTERVAL = int(os.environ.get("GTM_HS_REFRESH_SECONDS", 24 * 3600))
+OFFLINE = os.environ.get("GTM_OFFLINE") == "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hs_codes (id TEXT NOT NULL, text TEXT NOT NULL, parent TEXT);
+CREATE INDEX IF NOT EXISTS hs_codes_id ON hs_codes (id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class HSReferenceStore:
+    def __init__(self, path=DEFAULT_PATH, url=HS_REFERENCE_URL):
+        self.path = path
+        self.url = url
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")  # readers never wait on a refresh
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _meta(self, conn, key):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn, **values):
+        # None clears the key, so a copy without an ETag never revalidates against an older one
+        conn.executemany("DELETE FROM meta WHERE key = ?", [(k,) for k, v in values.items() if v is None])
+        conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         [(k, str(v)) for k, v in values.items() if v is not None])
+
+    def is_empty(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM hs_codes LIMIT 1").fetchone() is None
+
+    # --- WRITING ---
+    def replace(self, records, **meta):
+        """Atomically swaps the stored reference for `records`."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM hs_codes")
+            conn.executemany("INSERT INTO hs_codes (id, text, parent) VALUES (?, ?, ?)",
+                             ((r["id"], r["text"], r.get("parent")) for r in records))
+            self._set_meta(conn, loaded_at=time.time(), checked_at=time.time(), **meta)
+
+    def import_file(self, path):
+        with open(path, encoding="utf-8") as f:
+            self.replace(json.load(f)["results"], source=os.path.abspath(path), etag=None, last_modified=None)
+
+    def refresh(self, timeout=30):
+        """Conditional GET against the remote reference. Returns True if the store changed."""
+        with self._connect() as conn:
+            etag, last_modified = self._meta(conn, "etag"), self._meta(conn, "last_modified")
+        empty = self.is_empty()
+        headers = {}
+        if not empty:
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        try:
+            r = requests.get(self.url, headers=headers, timeout=timeout, hooks={"response": record_response})
+            r.raise_for_status()
+        except requests.RequestException:
+            if empty:
+                raise
+            return False  # Unreachable upstream: keep serving the local copy
+
+        if r.status_code == 304:
+            with self._connect() as conn:
+                self._set_meta(conn, checked_at=time.time())
+            return False
+        self.replace(r.json()["results"], source=self.url,
+                     etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"))
+        return True
+
+    def refresh_if_stale(self):
+        """
+        Refreshes only when the store is empty or the last check is older than
+        REFRESH_INTERVAL; never under GTM_OFFLINE=1 (seed the store with --import).
+        """
+        if OFFLINE:
+            return False
+        with self._connect() as conn:
+            checked_at = float(self._meta(conn, "checked_at") or 0)
+        if not self.is_empty() and time.time() - checked_at < REFRESH_INTERVAL:
+            return False
+        return self.refresh()
+
+    # --- READING ---
+    def version(self):
+        """When the stored reference was last replaced; changes on every refresh that brought new data."""
+        with self._connect() as conn:
+            return self._meta(conn, "loaded_at")
+
+    def load(self):
+        """Streams the stored rows straight into a compact HSCatalogue."""
+        with self._connect() as conn:
+            return HSCatalogue(conn.execute("SELECT id, text, parent FROM hs_codes ORDER BY rowid"))
+
+
+if __name__ == "__main__":
+    store = HSReferenceStore()
+    if len(sys.argv) == 3 and sys.argv[1] == "--import":
+        store.import_file(sys.argv[2])
+        print(f"Imported {sys.argv[2]} into {store.path}")
+    else:
+        changed = store.refresh()
+        print(f"{store.path}: {'updated' if changed else 'already current'}")
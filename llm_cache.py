@@ -0,0 +1,159 @@
+"""Response cache for the strategy assistant.
+
+Answers are keyed on the normalized dashboard context (HS code, compliance
+flags, retrieved passages) plus the normalized question. Exact repeats hit
+an in-process LRU or the persistent SQLite backend. Near-duplicate
+questions in the same context can optionally (`near_threshold`) match by
+token overlap, but never when they differ in a negation or a number.
+Entries expire after `ttl` seconds.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+DATA_DIR = os.environ.get("GTM_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+DEFAULT_PATH = os.path.join(DATA_DIR, "llm_cache.sqlite")
+
+STOPWORDS = frozenset("a an and any are be can do does for how i in is it me my of on or our should that the "
+                      "there this to we what when which with would you your".split())
+# Tokens that change what a question asks; "t" is what normalization leaves of n't (don't -> don t)
+NEGATIONS = frozenset("no not never without nor neither none nothing except cannot t".split())
+NEAR_CANDIDATES = 200  # Most recent answers per context compared for near-duplicates
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    context_key TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_context ON responses (context_key, created_at);
+"""
+
+
+def normalize_question(question):
+    return " ".join(re.findall(r"[a-z0-9]+", question.lower()))
+
+
+def question_tokens(normalized):
+    return frozenset(t for t in normalized.split() if t not in STOPWORDS)
+
+
+def guard_tokens(tokens):
+    """Negations and numbers: questions only match as near-duplicates when these are identical."""
+    return frozenset(t for t in tokens if t in NEGATIONS or any(c.isdigit() for c in t))
+
+
+def context_key(context):
+    """Stable digest of a context dict (key order and whitespace do not matter)."""
+    return hashlib.sha256(json.dumps(context, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def cache_keys(context, question):
+    """(context digest, normalized question, entry key) for a lookup."""
+    ctx = context_key(context)
+    normalized = normalize_question(question)
+    return ctx, normalized, hashlib.sha256(f"{ctx}:{normalized}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_PATH, ttl=7 * 24 * 3600, max_memory=1024, near_threshold=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self.near_threshold = near_threshold  # Jaccard overlap, e.g. 0.8; None (default) matches exact repeats only
+        self._memory = OrderedDict()  # key -> (created_at, answer)
+        self._lock = threading.Lock()
+        self.counters = {"exact_hits": 0, "near_hits": 0, "misses": 0, "stores": 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self.purge_expired()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, key, created_at, answer):
+        with self._lock:
+            self._memory[key] = (created_at, answer)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory:
+                self._memory.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def get(self, context, question):
+        """Cached answer for this context and question, or None."""
+        ctx, normalized, key = cache_keys(context, question)
+        oldest = time.time() - self.ttl
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] >= oldest:
+                self._memory.move_to_end(key)
+                self.counters["exact_hits"] += 1
+                return entry[1]
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT created_at, answer FROM responses WHERE key = ? AND created_at >= ?",
+                               (key, oldest)).fetchone()
+            if row is None and self.near_threshold is not None:
+                candidates = conn.execute(
+                    "SELECT question, created_at, answer FROM responses WHERE context_key = ? AND created_at >= ? "
+                    "ORDER BY created_at DESC LIMIT ?", (ctx, oldest, NEAR_CANDIDATES)).fetchall()
+                tokens = question_tokens(normalized)
+                guard = guard_tokens(tokens)
+                best, best_score = None, self.near_threshold
+                for other, created_at, answer in candidates:
+                    other_tokens = question_tokens(other)
+                    if guard_tokens(other_tokens) != guard:
+                        continue  # "... need a licence" vs "... not need a licence"
+                    union = tokens | other_tokens
+                    score = len(tokens & other_tokens) / len(union) if union else 0.0
+                    if score >= best_score:
+                        best, best_score = (created_at, answer), score
+                if best is not None:
+                    self._count("near_hits")
+                    return best[1]
+
+        if row is None:
+            self._count("misses")
+            return None
+        self._remember(key, *row)
+        self._count("exact_hits")
+        return row[1]
+
+    def put(self, context, question, answer):
+        ctx, normalized, key = cache_keys(context, question)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, ctx, normalized, answer, now))
+        self._remember(key, now, answer)
+        self._count("stores")
+
+    def purge_expired(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters, memory_entries=len(self._memory))
+        lookups = stats["exact_hits"] + stats["near_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["exact_hits"] + stats["near_hits"]) / lookups if lookups else 0.0
+        return stats
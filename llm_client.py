@@ -0,0 +1,62 @@
+"""Process-wide Gemini client with streaming, cancellable generations.
+
+The GenerativeModel is created once per process and reused by every session.
+Answers are streamed chunk by chunk so the first tokens render immediately,
+and a Generation handle lets a newer message cancel an in-flight answer.
+
+Set GTM_GEMINI_ENDPOINT (e.g. http://127.0.0.1:8088) to point the client at a
+local fake endpoint instead of the Gemini API.
+"""
+import os
+import threading
+from functools import lru_cache
+
+MODEL_NAME = "gemini-1.5-flash"
+ENDPOINT = os.environ.get("GTM_GEMINI_ENDPOINT")
+
+_OPTIONS = {}  # genai.configure() arguments, applied when the model is first built
+
+
+def configure(api_key):
+    _OPTIONS["api_key"] = api_key
+    if ENDPOINT:
+        _OPTIONS.update(transport="rest", client_options={"api_endpoint": ENDPOINT})
+
+
+@lru_cache(maxsize=None)
+def get_model(name=MODEL_NAME):
+    # google.generativeai takes about a second to import, so it is only loaded for the first question
+    import google.generativeai as genai
+
+    genai.configure(**_OPTIONS)
+    return genai.GenerativeModel(name)
+
+
+class Generation:
+    """Tracks one streamed answer: whether it was cancelled or ran to completion."""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self.completed = False
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+
+def stream_text(prompt, generation=None, model=None):
+    """Yields answer text as it arrives; stops reading the stream once `generation` is cancelled."""
+    response = (model or get_model()).generate_content(prompt, stream=True)
+    for chunk in response:
+        if generation is not None and generation.cancelled:
+            return
+        # Chunks without text parts (e.g. safety metadata) carry nothing to render
+        text = "".join(part.text for candidate in chunk.candidates for part in candidate.content.parts
+                       if getattr(part, "text", None))
+        if text:
+            yield text
+    if generation is not None:
+        generation.completed = True
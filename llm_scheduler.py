@@ -0,0 +1,279 @@
+"""Process-wide scheduler for model requests from every session.
+
+Requests wait in a bounded queue that is served round-robin across users, so
+one busy session cannot starve the others, and a token bucket keeps the
+process under the provider's rate limit. Transient failures (429 / 5xx /
+connection errors) are retried with jittered exponential backoff, and an
+identical prompt already queued or running is shared instead of sent twice.
+Answers stay streamed: every subscriber of a request sees chunks as they
+arrive.
+
+The model call is injected (`call(prompt)` yields text chunks), so the same
+scheduler runs against a local fake endpoint; see llm_client.configure.
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+import requests
+
+from perf import count, stage
+
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+WAIT_SAMPLES = 512  # Recent queue waits kept for the percentiles in stats()
+
+
+class SchedulerBusy(Exception):
+    """The queue, or this user's share of it, is full; the caller should retry later."""
+
+
+@lru_cache(maxsize=None)
+def transient_types():
+    """Exception types worth retrying: connection drops and timeouts from every transport."""
+    types = [ConnectionError, TimeoutError, requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+             requests.exceptions.ChunkedEncodingError]
+    try:
+        from google.api_core import exceptions as api_errors
+    except ImportError:
+        pass
+    else:
+        types += [api_errors.TooManyRequests, api_errors.InternalServerError, api_errors.BadGateway,
+                  api_errors.ServiceUnavailable, api_errors.GatewayTimeout, api_errors.DeadlineExceeded]
+    return tuple(types)
+
+
+def is_transient(exc):
+    # google.api_core errors carry the HTTP status in `code`, requests errors in `response.status_code`
+    status = getattr(exc, "code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return isinstance(exc, transient_types()) or status in TRANSIENT_STATUS
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate  # tokens per second
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Job:
+    """One scheduled model request; any number of subscribers can stream its answer."""
+
+    def __init__(self, key, prompt, user):
+        self.key = key
+        self.prompt = prompt
+        self.user = user
+        self.submitted_at = time.monotonic()
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.cancelled = False  # Every subscriber left before the answer finished
+        self._subscribers = 0
+        self._cond = threading.Condition()
+
+    def _append(self, chunk):
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def _finish(self, error=None):
+        with self._cond:
+            self.done, self.error = True, error
+            self._cond.notify_all()
+
+    def stream(self, generation=None, poll=0.25, timeout=None):
+        """
+        Yields the answer chunks, replaying any already received. Stops early
+        once `generation` (llm_client.Generation) is cancelled and marks it
+        completed when the whole answer was delivered. Raises TimeoutError when
+        the answer is not complete within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._subscribers += 1
+        sent = 0
+        try:
+            while True:
+                with self._cond:
+                    while sent == len(self.chunks) and not self.done and not (generation and generation.cancelled):
+                        if deadline is not None and time.monotonic() >= deadline:
+                            raise TimeoutError(f"No answer from the model within {timeout:g} s")
+                        self._cond.wait(poll)
+                    if generation is not None and generation.cancelled:
+                        return
+                    new, done, error = self.chunks[sent:], self.done, self.error
+                sent += len(new)
+                yield from new
+                if done:
+                    if error is not None:
+                        raise error
+                    if generation is not None:
+                        generation.completed = True
+                    return
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+                if not self._subscribers and not self.done:
+                    self.cancelled = True
+
+    def result(self, timeout=None):
+        return "".join(self.stream(timeout=timeout))
+
+
+class LLMScheduler:
+    def __init__(self, call, rate=1.0, burst=5, workers=4, max_queue=64, max_per_user=4,
+                 retries=3, base_delay=1.0, max_delay=30.0):
+        self.call = call
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._queues = OrderedDict()  # user -> deque of jobs; a served user moves to the back
+        self._pending = {}  # prompt key -> queued or running job, for coalescing
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._running = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        self.counters = {"submitted": 0, "coalesced": 0, "rejected": 0, "retries": 0,
+                         "completed": 0, "failed": 0, "cancelled": 0}
+
+    def start(self):
+        if not self._threads:
+            self._threads = [threading.Thread(target=self._work, name=f"llm-scheduler-{i}", daemon=True)
+                             for i in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _count(self, name):
+        with self._cond:
+            self.counters[name] += 1
+        count("llm_requests", outcome=name)
+
+    # --- SUBMISSION ---
+    def submit(self, prompt, user="anonymous"):
+        """Queues a prompt (or joins the identical one in flight) and returns its Job."""
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._cond:
+            job = self._pending.get(key)
+            if job is not None and not job.cancelled:
+                self.counters["coalesced"] += 1
+                count("llm_requests", outcome="coalesced")
+                return job
+            queued = self._queues.get(user, ())
+            if sum(len(q) for q in self._queues.values()) >= self.max_queue or len(queued) >= self.max_per_user:
+                self.counters["rejected"] += 1
+                count("llm_requests", outcome="rejected")
+                raise SchedulerBusy("The assistant is handling too many requests; please retry shortly.")
+            job = self._pending[key] = Job(key, prompt, user)
+            self._queues.setdefault(user, deque()).append(job)
+            self.counters["submitted"] += 1
+            count("llm_requests", outcome="submitted")
+            self._cond.notify()
+            return job
+
+    def stream(self, prompt, user="anonymous", generation=None, timeout=None):
+        return self.submit(prompt, user).stream(generation, timeout=timeout)
+
+    # --- WORKERS ---
+    def _next(self):
+        with self._cond:
+            while not self._queues and not self._stop.is_set():
+                self._cond.wait()
+            if self._stop.is_set():
+                return None
+            user, queue = self._queues.popitem(last=False)
+            job = queue.popleft()
+            if queue:
+                self._queues[user] = queue
+            self._running += 1
+            return job
+
+    def _work(self):
+        while (job := self._next()) is not None:
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    if self._pending.get(job.key) is job:
+                        del self._pending[job.key]
+
+    def _run(self, job):
+        for attempt in range(self.retries + 1):
+            if job.cancelled:
+                self._count("cancelled")
+                job._finish()
+                return
+            self.bucket.acquire()
+            if not attempt:
+                with self._cond:
+                    self._waits.append(time.monotonic() - job.submitted_at)
+            try:
+                with stage("llm.generate"):
+                    for chunk in self.call(job.prompt):
+                        if job.cancelled:
+                            break
+                        job._append(chunk)
+            except Exception as exc:
+                # Once text has been streamed a retry would repeat it, so only clean failures are retried
+                if job.chunks or attempt == self.retries or not is_transient(exc):
+                    self._count("failed")
+                    job._finish(exc)
+                    return
+                self._count("retries")
+                time.sleep(min(self.base_delay * 2 ** attempt, self.max_delay) * random.uniform(0.5, 1.0))
+            else:
+                self._count("cancelled" if job.cancelled else "completed")
+                job._finish()
+                return
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self.counters, queue_depth=sum(len(q) for q in self._queues.values()),
+                         running=self._running, users_waiting=len(self._queues))
+            waits = sorted(self._waits)
+        for name, q in (("wait_p50", 0.5), ("wait_p95", 0.95)):
+            stats[name] = waits[min(int(len(waits) * q), len(waits) - 1)] if waits else 0.0
+        return stats
+
+
+@lru_cache(maxsize=None)
+def get_scheduler():
+    """The scheduler shared by every session in this process."""
+    from llm_client import stream_text
+
+    return LLMScheduler(
+        stream_text,
+        rate=float(os.environ.get("GTM_LLM_RATE", 1.0)),  # requests per second
+        burst=int(os.environ.get("GTM_LLM_BURST", 5)),
+        workers=int(os.environ.get("GTM_LLM_WORKERS", 4)),
+        max_queue=int(os.environ.get("GTM_LLM_MAX_QUEUE", 64)),
+    ).start()
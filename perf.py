@@ -0,0 +1,247 @@
+"""Lightweight per-stage tracing for the dashboards and APIs.
+
+Wrap a stage in `with stage("name"):` or decorate it with `@traced("name")`.
+Every stage feeds a process-wide latency histogram; stages that run during a
+rerun opened with `begin_run()` are also recorded on that rerun, so one page
+load can be broken down into network, model and rendering time. Counters
+(cache hits, bytes fetched, ...) work the same way through `count()`.
+
+Exports:
+    debug_panel(run)    expander with this rerun's stages and counters; shown when
+                        GTM_PERF_PANEL=1 or the page URL has ?debug=perf
+    prometheus_text()   histograms and counters in the Prometheus text format, also
+                        served on GTM_PERF_METRICS_PORT (/metrics) when set
+    GTM_PERF_LOG        path of a JSON-lines file receiving one record per rerun
+
+Work submitted to thread pools is attributed to the submitting rerun when
+wrapped with `bind(fn)`, and fragment-only reruns get their own run through
+`@fragment_run(app)`.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOG_PATH = os.environ.get("GTM_PERF_LOG")
+PANEL = os.environ.get("GTM_PERF_PANEL") == "1"
+METRICS_PORT = int(os.environ.get("GTM_PERF_METRICS_PORT", 0))
+
+_run = contextvars.ContextVar("perf_run", default=None)
+_depth = contextvars.ContextVar("perf_depth", default=0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in key) + "}" if key else ""
+
+
+class Registry:
+    """Process-wide histograms and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}  # (metric, label key) -> [per-bucket counts..., +Inf count, sum]
+        self.counters = defaultdict(float)  # (metric, label key) -> value
+
+    def observe(self, metric, seconds, **labels):
+        key = (metric, _label_key(labels))
+        with self._lock:
+            buckets = self.histograms.get(key)
+            if buckets is None:
+                buckets = self.histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            buckets[len(BUCKETS)] += 1
+            buckets[-1] += seconds
+
+    def inc(self, metric, value=1, **labels):
+        with self._lock:
+            self.counters[(metric, _label_key(labels))] += value
+
+    def prometheus(self):
+        lines = []
+        with self._lock:
+            histograms, counters = dict(self.histograms), dict(self.counters)
+        for metric in sorted({m for m, _ in histograms}):
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, key), buckets in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+                    lines.append(f"{metric}_bucket{_format_labels(key + (('le', bound),))} {n}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {buckets[-1]:.6f}")
+                lines.append(f"{metric}_count{_format_labels(key)} {buckets[len(BUCKETS)]}")
+        for metric in sorted({m for m, _ in counters}):
+            lines.append(f"# TYPE {metric} counter")
+            for (name, key), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f"{metric}{_format_labels(key)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Run:
+    """Stages and counters recorded during one script rerun (or one request)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.stages = []  # (name, seconds, depth, offset from the rerun start), in completion order
+        self.counters = defaultdict(float)
+        self.seconds = None
+
+    @property
+    def elapsed(self):
+        return self.seconds if self.seconds is not None else time.perf_counter() - self._start
+
+    def record(self):
+        return {"ts": self.started_at, "app": self.app, "seconds": round(self.elapsed, 6),
+                "stages": [{"stage": n, "seconds": round(s, 6), "depth": d, "offset": round(o, 6)}
+                           for n, s, d, o in self.stages],
+                "counters": dict(self.counters)}
+
+
+# --- RECORDING ---
+def begin_run(app):
+    run = Run(app)
+    _run.set(run)
+    _depth.set(0)
+    return run
+
+
+def end_run(run=None):
+    run = run or _run.get()
+    if run is None:
+        return None
+    run.seconds = time.perf_counter() - run._start
+    REGISTRY.observe("gtm_rerun_seconds", run.seconds, app=run.app)
+    if LOG_PATH:
+        with open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run.record()) + "\n")
+    _run.set(None)
+    return run
+
+
+@contextmanager
+def stage(name):
+    run, depth = _run.get(), _depth.get()
+    token = _depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _depth.reset(token)
+        REGISTRY.observe("gtm_stage_seconds", elapsed, stage=name)
+        if run is not None:
+            run.stages.append((name, elapsed, depth, start - run._start))
+
+
+def traced(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def fragment_run(app):
+    """
+    Decorator for `st.fragment` bodies. Inside a full rerun the stages land on
+    that rerun; a fragment-only rerun opens (and closes) its own run `app`.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            outer = _run.get()
+            if outer is not None and outer.seconds is None:
+                return fn(*args, **kwargs)
+            run = begin_run(app)
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                end_run(run)
+            debug_panel(run)
+            return result
+        return wrapper
+    return decorate
+
+
+def count(metric, value=1, **labels):
+    REGISTRY.inc(f"gtm_{metric}_total", value, **labels)
+    run = _run.get()
+    if run is not None:
+        run.counters[metric + _format_labels(_label_key(labels))] += value
+
+
+def bind(fn):
+    """`fn` running in the caller's context, so pool threads record onto the current rerun."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def record_response(response, *args, **kwargs):
+    """requests response hook counting bytes fetched per host."""
+    size = response.headers.get("Content-Length")
+    count("bytes_fetched", int(size) if size and size.isdigit() else len(response.content),
+          host=urlparse(response.url).hostname or "")
+
+
+# --- EXPORT ---
+def prometheus_text():
+    return REGISTRY.prometheus()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200 if self.path.startswith("/metrics") else 404)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def serve_metrics(port=METRICS_PORT):
+    """Serves /metrics on `port` from a daemon thread (once per process; no-op when port is 0)."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="perf-metrics", daemon=True).start()
+    return server
+
+
+def debug_panel(run):
+    import streamlit as st
+
+    if run is None or not (PANEL or st.query_params.get("debug") == "perf"):
+        return
+    with st.expander(f"⏱️ Performance: {run.elapsed * 1000:.0f} ms this rerun"):
+        if run.stages:
+            # Start order, so nested stages sit under their parent
+            st.dataframe([{"Stage": "  " * d + n, "Start (ms)": round(o * 1000, 1), "ms": round(s * 1000, 1)}
+                          for n, s, d, o in sorted(run.stages, key=lambda stage: (stage[3], stage[2]))],
+                         hide_index=True, use_container_width=True)
+        if run.counters:
+            st.json(dict(run.counters))
+        st.download_button("Download Prometheus metrics", prometheus_text(), file_name="metrics.txt",
+                           mime="text/plain")
@@ -0,0 +1,151 @@
+"""Passage retrieval over the bundled export-policy PDFs for the RAG assistants.
+
+PDFs are streamed page by page into overlapping word-window passages and
+indexed with BM25 over hashed term counts (scikit-learn HashingVectorizer),
+so documents can be added incrementally without refitting a vocabulary. The
+index is persisted under data/policy_index and only new or changed PDFs are
+re-read on startup.
+
+    python policy_index.py build [extra.pdf ...]
+"""
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("GTM_DATA_DIR", os.path.join(ROOT, "data"))
+DEFAULT_PATH = os.path.join(DATA_DIR, "policy_index")
+BUNDLED_PDFS = [
+    os.path.join(ROOT, "English-Notification No. 60-2023.pdf"),
+    os.path.join(ROOT, "General_Note_on_Export_Policy_2025.pdf"),
+]
+
+PASSAGE_WORDS = 120
+PASSAGE_OVERLAP = 30
+K1, B = 1.5, 0.75  # BM25 parameters
+VECTORIZER = HashingVectorizer(n_features=2 ** 20, alternate_sign=False, norm=None, stop_words="english")
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_passages(path):
+    """Yields (page_number, text) passages, reading one PDF page at a time."""
+    from pypdf import PdfReader
+
+    step = PASSAGE_WORDS - PASSAGE_OVERLAP
+    for number, page in enumerate(PdfReader(path).pages, 1):
+        words = (page.extract_text() or "").split()
+        for start in range(0, max(len(words) - PASSAGE_OVERLAP, 1), step):
+            chunk = words[start:start + PASSAGE_WORDS]
+            if chunk:
+                yield number, " ".join(chunk)
+
+
+class PolicyIndex:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.passages = []  # {"text", "source", "page"}
+        self.documents = {}  # file name -> sha256
+        self.counts = sparse.csc_matrix((0, VECTORIZER.n_features), dtype=np.float32)
+        self._refresh_stats()
+
+    # --- PERSISTENCE ---
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        index = cls(path)
+        meta_path = os.path.join(path, "passages.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            index.passages, index.documents = meta["passages"], meta["documents"]
+            index.counts = sparse.load_npz(os.path.join(path, "counts.npz")).tocsc()
+            index._refresh_stats()
+        return index
+
+    @classmethod
+    def load_or_build(cls, pdfs=BUNDLED_PDFS, path=DEFAULT_PATH):
+        """Opens the persisted index and indexes any PDF that is new or has changed."""
+        index = cls.load(path)
+        changed = [index.add_document(pdf) for pdf in pdfs]
+        if any(changed):
+            index.save()
+        return index
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        sparse.save_npz(os.path.join(self.path, "counts.npz"), self.counts.tocsr())
+        with open(os.path.join(self.path, "passages.json"), "w", encoding="utf-8") as f:
+            json.dump({"passages": self.passages, "documents": self.documents}, f)
+
+    # --- INDEXING ---
+    def _refresh_stats(self):
+        self.doc_len = np.asarray(self.counts.sum(axis=1)).ravel()
+        self.doc_freq = np.diff(self.counts.indptr)
+        self.avg_len = self.doc_len.mean() if len(self.doc_len) else 0.0
+
+    def add_document(self, path):
+        """Indexes a PDF. Returns False if this exact file is already indexed."""
+        name, digest = os.path.basename(path), file_digest(path)
+        if self.documents.get(name) == digest:
+            return False
+        if name in self.documents:
+            self._drop(name)
+
+        new = [{"text": text, "source": name, "page": page} for page, text in iter_passages(path)]
+        if new:
+            counts = VECTORIZER.transform(p["text"] for p in new).astype(np.float32)
+            self.counts = sparse.vstack([self.counts.tocsr(), counts]).tocsc()
+            self.passages.extend(new)
+        self.documents[name] = digest
+        self._refresh_stats()
+        return True
+
+    def _drop(self, name):
+        keep = np.array([p["source"] != name for p in self.passages], dtype=bool)
+        self.counts = self.counts.tocsr()[keep].tocsc()
+        self.passages = [p for p, k in zip(self.passages, keep) if k]
+        del self.documents[name]
+
+    # --- RETRIEVAL ---
+    def search(self, query, k=4):
+        """Top-k passages by BM25, each with its score."""
+        if not self.passages:
+            return []
+        terms = VECTORIZER.transform([query]).indices
+        if not len(terms):
+            return []
+        hits = self.counts[:, terms].tocoo()
+        n = len(self.passages)
+        df = self.doc_freq[terms][hits.col]
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        tf = hits.data
+        norm = K1 * (1 - B + B * self.doc_len[hits.row] / self.avg_len)
+        scores = np.bincount(hits.row, weights=idf * tf * (K1 + 1) / (tf + norm), minlength=n)
+
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [dict(self.passages[i], score=float(scores[i])) for i in top if scores[i] > 0]
+
+
+def format_passages(passages):
+    """Renders retrieved passages as a prompt block with citations."""
+    return "\n\n".join(f"[{p['source']}, p.{p['page']}] {p['text']}" for p in passages)
+
+
+if __name__ == "__main__":
+    if not sys.argv[1:] or sys.argv[1] != "build":
+        sys.exit("usage: python policy_index.py build [extra.pdf ...]")
+    built = PolicyIndex.load_or_build(BUNDLED_PDFS + sys.argv[2:])
+    print(f"{built.path}: {len(built.passages)} passages from {len(built.documents)} documents")
@@ -0,0 +1,15 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules import each other the way the entry points see them: shared ones
+# from the repository root, the Command Center's from Others/
+for path in (os.path.join(ROOT, "Others"), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Stores opened at import time (ingestion's module-level TenderStore, ...) must
+# not touch the real data/ directory, and nothing may reach the network
+os.environ["GTM_DATA_DIR"] = tempfile.mkdtemp(prefix="gtm-tests-")
+os.environ["GTM_OFFLINE"] = "1"
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.join(ROOT, "benchmarks")
+
+
+def run(script, *args, timeout):
+    # As from the command line: the scripts import their helpers from benchmarks/
+    done = subprocess.run([sys.executable, os.path.join(BENCHMARKS, script), "--quick", "--json", *args],
+                          capture_output=True, text=True, cwd=ROOT, timeout=timeout)
+    assert done.returncode == 0, done.stderr
+    return json.loads(done.stdout)
+
+
+def test_bench_micro_quick():
+    results = run("bench_micro.py", timeout=120)
+    assert results["hs_search"]["records"] > 0
+    assert results["compliance"]["screen"]["rows_per_second"] > 0
+    assert results["fraud"]["edges"] == 20_000 and results["fraud"]["stream"]["transactions_per_second"] > 0
+
+
+def test_bench_load_quick():
+    pytest.importorskip("flask")
+    results = run("bench_load.py", timeout=600)
+    upstream = results.pop("upstream_requests")
+    assert set(results) == {"strategy", "command_center", "export_engine", "calculator"}
+    for app, result in results.items():
+        assert "failed" not in result, (app, result)
+        assert result["errors"] == 0, (app, result["error_samples"])
+        assert all(stats["n"] == 2 for stats in result["steps"].values()), app
+    assert upstream["hs"] and upstream["tenders"] and upstream["gemini"]
@@ -0,0 +1,59 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+pytest.importorskip("flask")
+
+PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Others", "def calculator():.py.py")
+
+
+@pytest.fixture(scope="module")
+def client():
+    spec = importlib.util.spec_from_file_location("calculator", PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app.test_client()
+
+
+def post(client, shipments, **headers):
+    return client.post("/landed-cost", data=json.dumps({"shipments": shipments}),
+                       content_type="application/json", headers=headers)
+
+
+def test_landed_cost_columns(client):
+    r = post(client, {"value": [1000, 2000], "currency": ["EUR", "EUR"], "hs_code": ["7208", "TOTAL"],
+                      "freight": [100, 0], "cbam_charge": [50, None]})
+    assert r.status_code == 200
+    lines = r.get_json()["lines"]
+    assert lines["customs_value_eur"] == [1100.0, 2000.0]
+    assert lines["duty_eur"] == [49.5, 90.0]  # 4.5 % MFN, also the default for unparsable codes
+    assert lines["landed_cost_eur"] == [1199.5, 2090.0]
+
+
+def test_row_oriented_batches_and_ndjson(client):
+    r = post(client, [{"value": 100, "fx_rate": 0.5}, {"value": 200, "fx_rate": 2}],
+             Accept="application/x-ndjson")
+    lines = [json.loads(line) for line in r.get_data(as_text=True).splitlines()]
+    assert [line["customs_value_eur"] for line in lines[:2]] == [50.0, 400.0]
+    assert lines[-1]["totals"]["customs_value_eur"] == 450.0
+
+
+@pytest.mark.parametrize("shipments", [
+    {"value": [1e309]},
+    {"value": [float("nan")]},
+    {"value": [100], "freight": [float("inf")]},
+    {"value": [-1]},
+    {"value": [100], "insurance": [-5]},
+    {"value": [100], "fx_rate": [0]},
+    {"value": [100], "fx_rate": [-0.9]},
+    {"value": [1e308], "fx_rate": [1e10]},
+    {"value": [None]},
+    {"value": [1, 2], "freight": [1]},
+    {"value": [100], "currency": ["XYZ"]},
+])
+def test_invalid_batches_are_rejected(client, shipments):
+    r = post(client, shipments)
+    assert r.status_code == 400
+    assert "error" in json.loads(r.get_data(as_text=True))  # Always valid JSON
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from chart_data import ChartSeries, downsample, lttb, period_index, point_budget
+
+
+def test_lttb_keeps_endpoints_and_returns_sorted_unique_indices():
+    x = np.arange(10_000)
+    y = np.sin(x / 300.0)
+    idx = lttb(x, y, 200)
+    assert len(idx) == 200
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_keeps_spikes():
+    y = np.zeros(5_000)
+    y[1234], y[3456] = 100.0, -50.0
+    idx = lttb(np.arange(len(y)), y, 50)
+    assert 1234 in idx and 3456 in idx
+
+
+def test_lttb_is_a_no_op_under_the_threshold():
+    assert lttb([0, 1, 2], [1, 2, 3], 10).tolist() == [0, 1, 2]
+    assert lttb(range(10), range(10), 2).tolist() == list(range(10))
+
+
+def test_downsample_bounds_rows():
+    frame = pd.DataFrame({"value": np.random.default_rng(0).normal(size=3_000)},
+                         index=pd.date_range("2000-01-01", periods=3_000, freq="D"))
+    assert len(downsample(frame, 100, "value")) == 100
+    assert downsample(frame, 5_000, "value") is frame
+
+
+def test_chart_series_picks_the_finest_granularity_within_budget():
+    index = pd.date_range("2015-01-01", "2024-12-31", freq="D")
+    series = ChartSeries(pd.DataFrame({"value": 1.0}, index=index))
+    assert [name for name, _ in series.levels] == ["period", "week", "month", "quarter", "year"]
+
+    name, frame = series.at(200)
+    assert name == "month" and len(frame) == 120
+    assert frame["value"].sum() == len(index)  # Totals, not samples
+    name, frame = series.at(5)
+    assert name == "year" and len(frame) == 5
+    assert len(series.shape(300, "value")) == 300
+
+
+def test_period_index_parses_comtrade_periods():
+    assert period_index([2023, 2024]).year.tolist() == [2023, 2024]
+    assert period_index(["202301", "202302"]).month.tolist() == [1, 2]
+
+
+def test_point_budget_is_clamped():
+    assert point_budget(1200) == 600
+    assert point_budget(10) == 24
+    assert point_budget(10_000, px_per_point=1) == 2000
@@ -0,0 +1,37 @@
+import math
+
+import pandas as pd
+
+from compliance import check, iter_screen_chunks, screen
+
+
+def test_screen_flags_by_chapter():
+    result = screen(["8481.80", "7208", "0101", "52"])
+    assert result["Valid"].tolist() == [True, True, True, True]
+    assert result["SCOMET"].tolist() == [True, False, False, False]
+    assert result["CBAM"].tolist() == [False, True, False, False]
+    assert result["HS"].tolist() == ["848180", "7208", "0101", "52"]
+
+
+def test_non_numeric_and_malformed_codes_are_invalid():
+    result = screen(["TOTAL", "84A1", "TOTAL 8481", "", None, "123", "9999"])
+    assert not result["Valid"].any()
+    assert not (result["SCOMET"] | result["CBAM"]).any()
+    assert result["EU_MFN_Duty_%"].isna().all()
+
+
+def test_check_reports_no_duty_for_invalid_codes():
+    assert check("TOTAL")["duty"] is None
+    assert check("TOTAL")["valid"] is False
+    flags = check("7208")
+    assert flags["valid"] and flags["cbam"] and not math.isnan(flags["duty"])
+
+
+def test_chunks_cover_every_row_in_order():
+    codes = pd.Series([f"{c:02d}01" for c in range(1, 98)] * 3)
+    chunks = list(iter_screen_chunks(codes, chunk_size=50))
+    assert [done for done, _, _ in chunks] == [50, 100, 150, 200, 250, 291]
+    assert all(total == len(codes) for _, total, _ in chunks)
+    combined = pd.concat(chunk for _, _, chunk in chunks)
+    assert combined.index.tolist() == codes.index.tolist()
+    assert combined["Valid"].all()
@@ -0,0 +1,100 @@
+import os
+import re
+
+import pandas as pd
+import pytest
+
+import compliance
+import export_policy
+from export_policy import ExportPolicyTable, compile_table, flatten, iter_entries
+
+SCHEDULE = [
+    "Chapter 84 Nuclear reactors, boilers, machinery",
+    "85 8481 Mismatched chapter column: not a Schedule-2 row - Prohibited",
+    "84 8401 Nuclear reactors - Prohibited Not permitted",
+    "84 8481 Taps, cocks, valves - Free",
+    "84 848180 Other appliances - Restricted Export under",
+    "licence only",  # Wrapped condition
+    "84 84818011 Pressure reducing valves - Free",
+    "10 1006 Rice - STE Through STE only",
+]
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    source = tmp_path / "notification.pdf"
+    source.write_bytes(b"%PDF stand-in")
+    monkeypatch.setattr(export_policy, "iter_pdf_lines", lambda path: iter(SCHEDULE))
+    path = str(tmp_path / "export_policy.bin")
+    compile_table([str(source)], path)
+    return ExportPolicyTable(path)
+
+
+def test_iter_entries_joins_wrapped_rows_and_skips_other_tables():
+    entries = dict(iter_entries(SCHEDULE))
+    assert entries["848180"] == "Other appliances - Restricted Export under licence only"
+    assert "8481" in entries and entries["8481"].endswith("- Free")
+    assert list(entries) == ["8401", "8481", "848180", "84818011", "1006"]
+
+
+def test_flatten_gives_the_innermost_range_precedence():
+    intervals = flatten([(0, 99, 0, "outer"), (10, 19, 2, "inner"), (12, 12, 3, "line")])
+    assert intervals == [(0, 9, 0, "outer"), (10, 11, 2, "inner"), (12, 12, 3, "line"),
+                         (13, 19, 2, "inner"), (20, 99, 0, "outer")]
+
+
+def test_lookup_most_specific_entry_wins(table):
+    assert table.lookup("8481.80.11") == ("Free", "")
+    assert table.lookup("84818019") == ("Restricted", "Export under licence only")
+    assert table.lookup("84812000") == ("Free", "")
+    assert table.lookup("1006 10 10") == ("STE", "Through STE only")
+
+
+def test_short_codes_report_the_most_restrictive_tariff_line(table):
+    assert table.lookup("8481")[0] == "Restricted"
+    assert table.lookup("84")[0] == "Prohibited"
+
+
+def test_uncovered_and_empty_codes(table):
+    assert table.lookup("0101") is None
+    assert table.lookup("TOTAL") is None
+
+
+def test_vectorized_lookup_agrees_with_the_table(table, monkeypatch):
+    monkeypatch.setattr(compliance, "POLICY_ARRAYS", compliance._policy_arrays(table))
+    codes = ["84818011", "84818019", "84812000", "8481", "84", "10061010", "0101", "8401"]
+    expected = [(table.lookup(c) or (None,))[0] for c in codes]
+    assert compliance.export_policy(pd.Series(codes)).tolist() == expected
+
+
+def test_parse_policy_drops_notification_columns_and_chapter_headings():
+    assert export_policy.parse_policy("Articles - Free 47/2015-2020 22.12.2020") == (0, "")
+    assert export_policy.parse_policy(
+        "Oils - Free Subject to Policy Condition 1 of the Chapter 2(RE-2012)/2009- 2014 08.06.2012"
+    ) == (0, "Subject to Policy Condition 1 of the Chapter")
+    assert export_policy.parse_policy("Rice - Prohibited Not permitted 20/2023 19/2023 20.07.2023 18.07.2023")[1] \
+        == "Not permitted"
+    assert export_policy.parse_policy("Tea - Free CHAPTER 10 CEREALS Main Notes")[1] == ""
+    # A date that is part of the condition stays
+    assert export_policy.parse_policy("Onions - Prohibited till 31.03.2024")[1] == "till 31.03.2024"
+
+
+def test_lookup_agrees_with_a_scan_over_every_span(table):
+    def scan(code):
+        lo, hi = table._span(code)
+        hits = [i for i in range(len(table.starts)) if table.starts[i] <= hi and table.ends[i] >= lo]
+        best = max(hits, key=lambda i: (table.policy[i], -i)) if hits else None
+        return None if best is None else (export_policy.POLICIES[table.policy[best]],
+                                          table.header["conditions"][table.condition[best]])
+
+    for code in ["0", "1", "10", "84", "848", "8481", "84818", "848180", "8481801", "84818011", "84819", "99"]:
+        assert table.lookup(code) == scan(code)
+
+
+@pytest.mark.skipif(not os.path.exists(export_policy.TABLE_PATH), reason="export_policy.bin not built")
+def test_bundled_table():
+    table = ExportPolicyTable()
+    assert table.lookup("39269099") == ("Free", "")
+    assert table.lookup("1006")[0] == "Prohibited"  # Most restrictive of its tariff lines
+    assert table.lookup("40") is None and table.lookup("84818011") is None  # Chapters 40+ are not covered
+    assert not [c for c in table.header["conditions"] if re.search(r"\d+/\d{4}|CHAPTER \d", c)]
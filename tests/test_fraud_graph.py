@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from fraud_graph import TransactionGraph, score
+
+
+def graph(edges):
+    sources, targets, amounts, times = zip(*edges)
+    return TransactionGraph.from_edges(sources, targets, amounts, times)
+
+
+def test_csr_slices_follow_source_and_time():
+    g = graph([("b", "a", 5.0, 3), ("a", "b", 1.0, 2), ("a", "c", 2.0, 1)])
+    a, b = list(g.labels).index("a"), list(g.labels).index("b")
+    out = slice(g.out_indptr[a], g.out_indptr[a + 1])
+    assert g.time[out].tolist() == [1, 2]
+    assert g.amount[g.in_order][g.in_indptr[a]:g.in_indptr[a + 1]].tolist() == [5.0]
+    assert np.diff(g.out_indptr)[b] == 1
+
+
+def test_cycle_counts():
+    # a <-> b is a 2-cycle; a -> b -> c -> a a 3-cycle; the self-loop and d are neither
+    g = graph([("a", "b", 1, 0), ("b", "a", 1, 1), ("b", "c", 1, 2), ("c", "a", 1, 3),
+               ("d", "d", 1, 4), ("d", "a", 1, 5)])
+    features = g.features(workers=1)
+    assert features["cycles_2"].to_dict() == {"a": 1, "b": 1, "c": 0, "d": 0}
+    assert features["cycles_3"].to_dict() == {"a": 1, "b": 1, "c": 1, "d": 0}
+
+
+def test_degree_amount_and_burst_features():
+    g = graph([("a", "x", 10.0, 0), ("a", "y", 30.0, 10), ("a", "x", 20.0, 5000), ("b", "x", 5.0, 20)])
+    features = g.features(burst_window=100, workers=1)
+    a, x = features.loc["a"], features.loc["x"]
+    assert (a["out_degree"], a["in_degree"], a["out_counterparties"]) == (3, 0, 2)
+    assert (a["out_amount_total"], a["out_amount_mean"], a["out_amount_max"]) == (60.0, 20.0, 30.0)
+    assert a["out_burst"] == 2
+    assert (x["in_degree"], x["in_amount_max"], x["in_burst"]) == (3, 20.0, 2)
+    assert score(features)["risk_score"].between(0, 1).all()
+
+
+def test_save_and_load_round_trip(tmp_path):
+    g = graph([("a", "b", 1.5, 1), ("b", "c", 2.5, 2)])
+    g.save(tmp_path)
+    loaded = TransactionGraph.load(tmp_path)
+    assert loaded.labels.tolist() == g.labels.tolist()
+    assert loaded.features(workers=1).equals(g.features(workers=1))
+
+
+def test_from_networkx_needs_a_directed_graph():
+    nx = pytest.importorskip("networkx")
+    G = nx.DiGraph()
+    G.add_edge("a", "b", amount=3.0, time=1)
+    assert TransactionGraph.from_networkx(G).features(workers=1).loc["b", "in_degree"] == 1
+    with pytest.raises(ValueError):
+        TransactionGraph.from_networkx(G.to_undirected())
@@ -0,0 +1,65 @@
+from fraud_stream import StreamingFraudDetector
+
+
+def rules(alerts):
+    return [a.rule for a in alerts]
+
+
+def test_large_first_payment_to_a_rare_merchant_alerts_immediately():
+    detector = StreamingFraudDetector()
+    alerts = detector.process(0, "alice", "shell_co", 900)
+    assert rules(alerts) == ["new_pair_high", "rare_merchant"]
+    assert alerts[1].detail == "1 customer(s) in the window"
+    assert detector.alerts == 2 and detector.processed == 1
+
+
+def test_popular_merchants_and_small_amounts_do_not_alert():
+    detector = StreamingFraudDetector()
+    assert list(detector.consume([(0, "alice", "grocer", 40), (1, "bob", "grocer", 60)])) == []
+    # Second customer of the merchant and a repeat pair: neither rule applies
+    assert detector.process(2, "bob", "grocer", 900) == []
+    assert detector.merchant_stats("grocer") == {"transactions": 3, "customers": 2,
+                                                 "mean_amount": 1000 / 3}
+
+
+def test_amount_spike_needs_history():
+    detector = StreamingFraudDetector(high_amount=10_000, min_history=5)
+    for t in range(4):
+        detector.process(t, f"c{t}", "cafe", 10)
+    assert detector.process(4, "c4", "cafe", 400) == []  # Only 4 transactions of history
+    detector = StreamingFraudDetector(high_amount=10_000, min_history=5)
+    for t in range(5):
+        detector.process(t, f"c{t}", "cafe", 10)
+    alerts = detector.process(5, "c5", "cafe", 400)
+    assert rules(alerts) == ["amount_spike"]
+    assert alerts[0].detail == "40.0x the merchant's mean of 10.00"
+
+
+def test_expired_transactions_leave_the_merchant_state():
+    detector = StreamingFraudDetector(window=100)
+    detector.process(0, "alice", "shop", 50)
+    detector.process(50, "bob", "shop", 70)
+    assert len(detector) == 2 and detector.merchant_stats("shop")["customers"] == 2
+    detector.process(100, "carol", "other", 10)  # alice's payment is exactly one window old
+    assert len(detector) == 2
+    assert detector.merchant_stats("shop") == {"transactions": 1, "customers": 1, "mean_amount": 70.0}
+    detector.process(500, "carol", "other", 10)
+    assert len(detector) == 1
+    assert detector.merchant_stats("shop") == {"transactions": 0, "customers": 0, "mean_amount": 0.0}
+
+
+def test_a_merchant_becomes_rare_again_once_its_customers_expire():
+    detector = StreamingFraudDetector(window=100)
+    detector.process(0, "alice", "shop", 50)
+    assert rules(detector.process(10, "bob", "shop", 900)) == ["new_pair_high"]  # Two customers
+    assert rules(detector.process(20, "bob", "shop", 900)) == []
+    # Both earlier customers have left the window: bob is its only customer again
+    assert rules(detector.process(200, "bob", "shop", 900)) == ["new_pair_high", "rare_merchant"]
+
+
+def test_max_events_bounds_memory():
+    detector = StreamingFraudDetector(window=10**9, max_events=3)
+    for t in range(10):
+        detector.process(t, f"c{t}", "shop", 10)
+    assert len(detector) == 3
+    assert detector.merchant_stats("shop")["transactions"] == 3
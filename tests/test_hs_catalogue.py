@@ -0,0 +1,25 @@
+import pytest
+
+from hs_catalogue import HSCatalogue, HSEntry
+
+ROWS = [("84", "Machinery", None), ("8481", "Valves", "84"), ("8481", "Valves", "84")]
+
+
+def test_entries_are_immutable_and_share_duplicate_text():
+    # Built at runtime, so the two descriptions start out as distinct objects
+    catalogue = HSCatalogue([(hs_id, "".join(text), parent) for hs_id, text, parent in ROWS])
+    assert len(catalogue) == 3 and list(catalogue)[0] == HSEntry("84", "Machinery", None)
+    assert catalogue[1].text is catalogue[2].text
+    with pytest.raises(AttributeError):
+        catalogue[0].text = "changed"
+
+
+def test_get_returns_the_first_entry_for_an_id():
+    catalogue = HSCatalogue(ROWS)
+    assert catalogue.get("8481") is catalogue[1]
+    assert catalogue.get("8481").parent == "84"
+    assert catalogue.get("9999") is None and catalogue.get("9999", "x") == "x"
+
+
+def test_empty_parent_is_stored_as_none():
+    assert HSCatalogue([("84", "Machinery", "")])[0].parent is None
@@ -0,0 +1,57 @@
+from hs_catalogue import HSCatalogue
+from hs_search import HSSearchIndex, within_edits
+
+ROWS = [
+    ("84", "Nuclear reactors, boilers, machinery and mechanical appliances", None),
+    ("8481", "Taps, cocks, valves and similar appliances for pipes", "84"),
+    ("848180", "Other appliances: valves", "8481"),
+    ("8482", "Ball or roller bearings", "84"),
+    ("848210", "Ball bearings", "8482"),
+    ("52", "Cotton", None),
+    ("5201", "Cotton, not carded or combed", "52"),
+]
+
+
+def index():
+    return HSSearchIndex(HSCatalogue(ROWS))
+
+
+def ids(results):
+    return [r.id for r in results]
+
+
+def test_numeric_query_walks_the_id_trie_headings_first():
+    assert ids(index().search("848")) == ["8481", "8482", "848180", "848210"]
+    assert ids(index().search("8481.80")) == ["848180"]
+    assert ids(index().search("848", limit=2)) == ["8481", "8482"]
+    assert index().search("99") == []
+
+
+def test_last_word_matches_as_a_prefix():
+    assert ids(index().search("bear")) == ["8482", "848210"]
+
+
+def test_records_matching_every_word_come_first():
+    assert ids(index().search("ball roller")) == ["8482"]
+    assert ids(index().search("valves appliances"))[:2] == ["8481", "848180"]
+
+
+def test_partial_matches_rank_rarer_words_higher():
+    # No record has both words; "roller" is in one record, "cotton" in two
+    assert ids(index().search("roller cotton")) == ["8482", "52", "5201"]
+
+
+def test_typos_match_through_the_trigram_index():
+    assert "8482" in ids(index().search("bearngs"))
+    assert ids(index().search("coton")) == ["52", "5201"]
+
+
+def test_codes_and_words_combine():
+    assert ids(index().search("8482 ball")) == ["8482", "848210"]
+    assert ids(index().search("52 bearings")) == []
+
+
+def test_within_edits():
+    assert within_edits("valve", "valves", 1)
+    assert not within_edits("valve", "cotton", 2)
+
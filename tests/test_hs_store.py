@@ -0,0 +1,90 @@
+import json
+
+import pytest
+import requests
+
+import hs_store
+from hs_store import HSReferenceStore
+
+RESULTS = [{"id": "84", "text": "Machinery", "parent": None}, {"id": "8481", "text": "Valves", "parent": "84"}]
+
+
+class FakeResponse:
+    def __init__(self, status_code, results=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._results = results
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+    def json(self):
+        return {"results": self._results}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HSReferenceStore(path=str(tmp_path / "hs.sqlite"), url="http://hs.test/HS.json")
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    responses, requests_made = [], []
+
+    def get(url, headers=None, **kwargs):
+        requests_made.append(headers)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(requests, "get", get)
+    return responses, requests_made
+
+
+def test_refresh_revalidates_with_the_stored_etag(store, upstream):
+    responses, sent = upstream
+    responses += [FakeResponse(200, RESULTS, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+                  FakeResponse(304)]
+    assert store.refresh() is True
+    version = store.version()
+    assert store.refresh() is False
+    assert sent == [{}, {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}]
+    assert store.version() == version
+    assert [e.id for e in store.load()] == ["84", "8481"]
+
+
+def test_unreachable_upstream_keeps_the_local_copy(store, upstream):
+    responses, _ = upstream
+    responses += [FakeResponse(200, RESULTS), requests.ConnectionError("down")]
+    store.refresh()
+    assert store.refresh() is False
+    assert len(store.load()) == 2
+
+
+def test_empty_store_raises_when_upstream_is_unreachable(store, upstream):
+    upstream[0].append(requests.ConnectionError("down"))
+    with pytest.raises(requests.ConnectionError):
+        store.refresh()
+
+
+def test_import_clears_the_remote_validators(store, upstream, tmp_path):
+    responses, sent = upstream
+    responses += [FakeResponse(200, RESULTS, {"ETag": '"v1"'}), FakeResponse(200, RESULTS[:1])]
+    store.refresh()
+    path = tmp_path / "HS.json"
+    path.write_text(json.dumps({"results": RESULTS}))
+    store.import_file(str(path))
+    store.refresh()
+    assert sent[-1] == {}  # No If-None-Match against the older remote copy
+
+
+def test_refresh_if_stale(store, upstream, monkeypatch):
+    responses, sent = upstream
+    monkeypatch.setattr(hs_store, "OFFLINE", True)
+    assert store.refresh_if_stale() is False and not sent
+    monkeypatch.setattr(hs_store, "OFFLINE", False)
+    responses.append(FakeResponse(200, RESULTS))
+    assert store.refresh_if_stale() is True
+    assert store.refresh_if_stale() is False and len(sent) == 1  # Checked within REFRESH_INTERVAL
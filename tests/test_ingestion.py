@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+ingestion = pytest.importorskip("ingestion")
+from signal_cache import SignalCache
+
+
+class FakeTenderStore:
+    def sync(self, *args, **kwargs):
+        return 0
+
+    def count(self, country, cpv):
+        return 0
+
+    def recent(self, country, cpv, limit):
+        return [("T1", "Buyer", "Title", 1000.0, "2030-01-01")]
+
+
+class FakeRiskMonitor:
+    def __init__(self, delay=0.0, error=None):
+        self.polls = 0
+        self.delay, self.error = delay, error
+
+    def poll(self, session, timeout):
+        self.polls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+    def count(self):
+        return 1
+
+    def recent(self, limit):
+        return [("CBAM update", "Mon, 01 Jan 2024 10:00", "https://example.org", "High")]
+
+
+def test_risk_signals_are_cached_once_for_every_market():
+    cache, monitor = SignalCache(), FakeRiskMonitor()
+    for country in ("DE", "FR", "IT"):
+        ingestor = ingestion.DataIngestor(country, "42000000", session=None, cache=cache,
+                                          tender_store=FakeTenderStore(), risk_monitor=monitor)
+        signals, missing = ingestor.fetch_all()
+        assert not missing
+        assert signals["risk"][0]["Risk_Level"] == "High"
+    assert monitor.polls == 1
+    assert cache.get("demand", ("FR", "42000000"))[1] is not None
+
+
+@pytest.fixture
+def short_deadlines(monkeypatch):
+    monkeypatch.setitem(ingestion.SOURCE_DEADLINES, "risk", 0.2)
+
+
+def test_a_source_past_its_deadline_is_missing_and_the_rest_are_served(short_deadlines):
+    ingestor = ingestion.DataIngestor("DE", "42000000", session=None, tender_store=FakeTenderStore(),
+                                      risk_monitor=FakeRiskMonitor(delay=1.0))
+    started = time.monotonic()
+    signals, missing = ingestor.fetch_all()
+    assert time.monotonic() - started < 0.9  # Did not wait for the slow source
+    assert missing == ["risk"] and signals["risk"] == []
+    assert signals["demand"][0]["Buyer"] == "Buyer"
+    assert not signals["supply"].empty
+
+
+def test_a_failing_source_is_missing(short_deadlines):
+    ingestor = ingestion.DataIngestor("DE", "42000000", session=None, tender_store=FakeTenderStore(),
+                                      risk_monitor=FakeRiskMonitor(error=RuntimeError("feed down")))
+    signals, missing = ingestor.fetch_all()
+    assert missing == ["risk"] and signals["risk"] == [] and signals["demand"]
+
+
+def test_a_late_result_still_lands_in_the_cache(short_deadlines):
+    cache = SignalCache()
+    ingestor = ingestion.DataIngestor("DE", "42000000", session=None, cache=cache, tender_store=FakeTenderStore(),
+                                      risk_monitor=FakeRiskMonitor(delay=0.5))
+    assert ingestor.fetch_all()[1] == ["risk"]
+    time.sleep(0.6)
+    signals, missing = ingestor.fetch_all()
+    assert not missing and signals["risk"][0]["Title"] == "CBAM update"
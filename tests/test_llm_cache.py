@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from llm_cache import ResponseCache, guard_tokens, question_tokens
+
+CONTEXT = {"hs": "848180", "scomet": True, "passages": ["Appendix 3 SCOMET list"]}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "llm_cache.sqlite")
+
+
+def test_exact_repeat_hits_memory_and_survives_restart(path):
+    cache = ResponseCache(path)
+    cache.put(CONTEXT, "Do I need a SCOMET licence?", "Yes.")
+    assert cache.get(CONTEXT, "do i need a SCOMET licence") == "Yes."
+    assert ResponseCache(path).get(dict(reversed(list(CONTEXT.items()))), "Do I need a SCOMET licence?") == "Yes."
+
+
+def test_different_context_misses(path):
+    cache = ResponseCache(path)
+    cache.put(CONTEXT, "Do I need a SCOMET licence?", "Yes.")
+    assert cache.get(dict(CONTEXT, hs="720810"), "Do I need a SCOMET licence?") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(path, monkeypatch):
+    cache = ResponseCache(path, ttl=60)
+    cache.put(CONTEXT, "Which documents are required?", "A licence.")
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get(CONTEXT, "Which documents are required?") is None
+    cache.purge_expired()
+    assert ResponseCache(path, ttl=60).get(CONTEXT, "Which documents are required?") is None
+
+
+def test_near_duplicates_are_opt_in(path):
+    cache = ResponseCache(path)
+    cache.put(CONTEXT, "Do I need a SCOMET licence for valves?", "Yes.")
+    assert cache.get(CONTEXT, "Do I need SCOMET licence for the valves?") is None
+
+    near = ResponseCache(path, near_threshold=0.8)
+    assert near.get(CONTEXT, "Do I need SCOMET licence for the valves?") == "Yes."
+    assert near.stats()["near_hits"] == 1
+
+
+@pytest.mark.parametrize("question", [
+    "Do I not need a SCOMET licence for valves?",
+    "Don't I need a SCOMET licence for valves?",
+    "Do I need a SCOMET licence for valves without drawings?",
+    "Do I need a SCOMET licence for 8481 valves?",
+])
+def test_negation_or_number_change_is_never_a_near_duplicate(path, question):
+    cache = ResponseCache(path, near_threshold=0.5)
+    cache.put(CONTEXT, "Do I need a SCOMET licence for valves?", "Yes.")
+    assert cache.get(CONTEXT, question) is None
+
+
+def test_guard_tokens():
+    assert guard_tokens(question_tokens("is cbam not due in 2026")) == {"not", "2026"}
+    assert guard_tokens(question_tokens("is cbam due")) == frozenset()
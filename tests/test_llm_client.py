@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from llm_client import Generation, stream_text
+
+
+def chunk(*texts):
+    parts = [SimpleNamespace(text=t) if t is not None else SimpleNamespace() for t in texts]
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))])
+
+
+class FakeModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    def generate_content(self, prompt, stream):
+        assert stream
+        for c in self.chunks:
+            self.read += 1
+            yield c
+
+
+def test_streams_text_and_marks_the_generation_complete():
+    generation = Generation()
+    model = FakeModel([chunk("Hello"), chunk(None), chunk(", ", "world")])
+    assert list(stream_text("hi", generation, model)) == ["Hello", ", world"]
+    assert generation.completed and not generation.cancelled
+
+
+def test_cancel_stops_reading_the_stream():
+    generation = Generation()
+    model = FakeModel([chunk("one"), chunk("two"), chunk("three")])
+    answer = []
+    for text in stream_text("hi", generation, model):
+        answer.append(text)
+        generation.cancel()  # A newer message arrived
+    assert answer == ["one"]
+    assert model.read == 2 and generation.cancelled and not generation.completed
+
+
+def test_works_without_a_generation():
+    assert "".join(stream_text("hi", model=FakeModel([chunk("a"), chunk("b")]))) == "ab"
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from llm_scheduler import LLMScheduler, SchedulerBusy, TokenBucket, is_transient
+
+
+def scheduler(call, **kwargs):
+    options = dict(rate=1000.0, burst=1000, workers=1, base_delay=0.001, max_delay=0.01)
+    options.update(kwargs)
+    return LLMScheduler(call, **options)
+
+
+@pytest.mark.parametrize("exc", [
+    ConnectionError("reset"),
+    TimeoutError(),
+    requests.ConnectionError("x"),
+    requests.ReadTimeout("x"),
+    requests.ConnectTimeout("x"),
+    requests.exceptions.ChunkedEncodingError("x"),
+])
+def test_connection_errors_and_timeouts_are_transient(exc):
+    assert is_transient(exc)
+
+
+def test_transient_http_status():
+    response = requests.Response()
+    response.status_code = 503
+    assert is_transient(requests.HTTPError(response=response))
+    response.status_code = 400
+    assert not is_transient(requests.HTTPError(response=response))
+    assert not is_transient(ValueError("bad prompt"))
+
+
+def test_google_api_errors_are_classified():
+    api_errors = pytest.importorskip("google.api_core.exceptions")
+    assert is_transient(api_errors.ServiceUnavailable("x"))
+    assert is_transient(api_errors.TooManyRequests("x"))
+    assert not is_transient(api_errors.InvalidArgument("x"))
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        bucket.acquire()
+    assert time.monotonic() - start >= 5 / 50 * 0.9  # Two from the burst, five refilled
+
+
+def test_transient_failures_are_retried():
+    attempts = []
+
+    def call(prompt):
+        attempts.append(prompt)
+        if len(attempts) < 3:
+            raise requests.ConnectionError("reset")
+        yield "ok"
+
+    s = scheduler(call).start()
+    try:
+        assert s.submit("q").result(timeout=5) == "ok"
+        assert s.counters["retries"] == 2 and s.counters["completed"] == 1
+    finally:
+        s.stop()
+
+
+def test_permanent_failures_and_partial_answers_are_not_retried():
+    def permanent(prompt):
+        raise ValueError("bad prompt")
+        yield
+
+    def partial(prompt):
+        yield "half"
+        raise requests.ConnectionError("reset")
+
+    for call, error in ((permanent, ValueError), (partial, requests.ConnectionError)):
+        s = scheduler(call).start()
+        try:
+            with pytest.raises(error):
+                s.submit("q").result(timeout=5)
+            assert s.counters["retries"] == 0 and s.counters["failed"] == 1
+        finally:
+            s.stop()
+
+
+
+def test_a_failed_stream_never_marks_the_generation_completed():
+    # The pages cache an answer only when its generation completed
+    from llm_client import Generation
+
+    def partial(prompt):
+        yield "half"
+        raise ValueError("invalid API key")
+
+    s = scheduler(partial).start()
+    try:
+        generation, received = Generation(), []
+        with pytest.raises(ValueError):
+            for text in s.stream("q", generation=generation, timeout=5):
+                received.append(text)
+        assert received == ["half"] and not generation.completed
+    finally:
+        s.stop()
+
+
+def test_identical_prompts_in_flight_are_coalesced():
+    release, calls = threading.Event(), []
+
+    def call(prompt):
+        calls.append(prompt)
+        release.wait(5)
+        yield "answer"
+
+    s = scheduler(call).start()
+    try:
+        first, second = s.submit("q", "alice"), s.submit("q", "bob")
+        assert first is second
+        release.set()
+        assert second.result(timeout=5) == "answer"
+        assert calls == ["q"] and s.counters["coalesced"] == 1
+    finally:
+        s.stop()
+
+
+def test_queue_is_served_round_robin_and_bounded_per_user():
+    release, served = threading.Event(), []
+
+    def call(prompt):
+        served.append(prompt)
+        release.wait(5)
+        yield prompt
+
+    s = scheduler(call, max_per_user=2)
+    jobs = [s.submit(p, "alice") for p in ("a1", "a2")] + [s.submit("b1", "bob")]
+    with pytest.raises(SchedulerBusy):
+        s.submit("a3", "alice")
+    release.set()
+    s.start()
+    try:
+        for job in jobs:
+            job.result(timeout=5)
+        assert served == ["a1", "b1", "a2"]
+    finally:
+        s.stop()
+
+
+def test_result_times_out_instead_of_blocking():
+    release = threading.Event()
+
+    def call(prompt):
+        release.wait(5)
+        yield "late"
+
+    s = scheduler(call).start()
+    try:
+        job = s.submit("q")
+        with pytest.raises(TimeoutError):
+            job.result(timeout=0.2)
+        assert job.cancelled  # Nobody is left waiting for the answer
+    finally:
+        release.set()
+        s.stop()
@@ -0,0 +1,23 @@
+import perf
+from perf import begin_run, end_run, fragment_run, stage
+
+
+@fragment_run("test.fragment")
+def fragment_body():
+    with stage("fragment.work"):
+        return perf._run.get()
+
+
+def test_fragment_inside_a_full_rerun_records_on_that_rerun():
+    run = begin_run("test.page")
+    assert fragment_body() is run
+    end_run(run)
+    assert [name for name, *_ in run.stages] == ["fragment.work"]
+
+
+def test_fragment_only_rerun_opens_and_closes_its_own_run():
+    page = end_run(begin_run("test.page"))
+    run = fragment_body()
+    assert run is not page and run.app == "test.fragment"
+    assert run.seconds is not None and [name for name, *_ in run.stages] == ["fragment.work"]
+    assert perf._run.get() is None and not page.stages
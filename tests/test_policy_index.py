@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+policy_index = pytest.importorskip("policy_index")
+from policy_index import PolicyIndex, format_passages
+
+PAGES = {
+    "rice.pdf": ["Export of non basmati rice is prohibited", "Basmati rice exports need APEDA registration"],
+    "sugar.pdf": ["Sugar exports are restricted till further orders"],
+}
+
+
+@pytest.fixture
+def pdfs(tmp_path, monkeypatch):
+    read = []
+
+    def iter_passages(path):
+        name = os.path.basename(path)
+        read.append(name)
+        return iter(enumerate(PAGES[name], 1))
+
+    monkeypatch.setattr(policy_index, "iter_passages", iter_passages)
+    paths = []
+    for name in PAGES:
+        (tmp_path / name).write_text(name)  # Only hashed; the passages come from PAGES
+        paths.append(str(tmp_path / name))
+    return paths, read
+
+
+def test_search_ranks_passages_by_bm25(pdfs, tmp_path):
+    index = PolicyIndex.load_or_build(pdfs[0], path=str(tmp_path / "index"))
+    hits = index.search("basmati rice APEDA", k=2)
+    assert [(h["source"], h["page"]) for h in hits] == [("rice.pdf", 2), ("rice.pdf", 1)]
+    assert hits[0]["score"] > hits[1]["score"] > 0
+    assert index.search("sugar")[0]["source"] == "sugar.pdf"
+    assert index.search("the") == []  # Stop words only
+    assert format_passages(hits[:1]).startswith("[rice.pdf, p.2] Basmati")
+
+
+def test_index_persists_and_skips_unchanged_documents(pdfs, tmp_path):
+    paths, read = pdfs
+    PolicyIndex.load_or_build(paths, path=str(tmp_path / "index"))
+    assert read == ["rice.pdf", "sugar.pdf"]
+    index = PolicyIndex.load_or_build(paths, path=str(tmp_path / "index"))
+    assert read == ["rice.pdf", "sugar.pdf"]  # Nothing re-read
+    assert len(index.passages) == 3 and index.search("sugar")[0]["page"] == 1
+
+
+def test_changed_and_new_documents_are_indexed_incrementally(pdfs, tmp_path, monkeypatch):
+    paths, read = pdfs
+    PolicyIndex.load_or_build(paths[:1], path=str(tmp_path / "index"))
+    monkeypatch.setitem(PAGES, "rice.pdf", ["Rice export policy revised: broken rice is free"])
+    with open(paths[0], "a") as f:
+        f.write(" revised")
+    index = PolicyIndex.load_or_build(paths, path=str(tmp_path / "index"))
+    assert read == ["rice.pdf", "rice.pdf", "sugar.pdf"]
+    assert [p["text"] for p in index.passages if p["source"] == "rice.pdf"] == [
+        "Rice export policy revised: broken rice is free"]
+    assert index.search("APEDA") == []
+    assert PolicyIndex.load(str(tmp_path / "index")).search("broken rice")[0]["source"] == "rice.pdf"
@@ -0,0 +1,75 @@
+from collections import Counter
+
+import pytest
+
+prefetch = pytest.importorskip("prefetch")
+from signal_cache import SignalCache
+
+GRID = [(country, cpv) for country in ("DE", "FR", "IT", "ES", "NL") for cpv in ("42000000", "19000000")]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = Counter()
+
+    class FakeIngestor:
+        SOURCES = ("demand", "risk", "supply")
+        SHARED_SOURCES = ("risk",)
+
+        def __init__(self, country, cpv, cache=None):
+            self.params = (country, cpv)
+
+        def __getattr__(self, name):
+            source = name.split("_")[1]
+
+            def fetch():
+                calls[source] += 1
+                return [self.params]
+            return fetch
+
+    monkeypatch.setattr(prefetch, "DataIngestor", FakeIngestor)
+    return calls
+
+
+def run_cycle(scheduler):
+    scheduler.run_once()
+    scheduler._pool.shutdown(wait=True)
+
+
+def test_market_independent_sources_are_fetched_once_per_cycle(calls):
+    cache = SignalCache()
+    scheduler = prefetch.PrefetchScheduler(cache, GRID, interval=600)
+    run_cycle(scheduler)
+
+    assert calls == {"demand": len(GRID), "supply": len(GRID), "risk": 1}
+    for params in GRID:
+        assert cache.get("demand", params)[0] == [params]
+        assert scheduler.last_refreshed("risk", params) is not None
+    assert cache.get("risk", ())[1] is not None
+    assert cache.stats()["entries"] == 2 * len(GRID) + 1
+
+
+def test_fresh_entries_are_not_refetched(calls):
+    scheduler = prefetch.PrefetchScheduler(SignalCache(), GRID, interval=600)
+    run_cycle(scheduler)
+    assert list(scheduler._due(scheduler.last_refreshed("demand", GRID[0]) + 1)) == []
+
+
+def test_each_source_is_due_on_its_own_interval(calls):
+    cache = SignalCache()
+    scheduler = prefetch.PrefetchScheduler(cache, GRID, intervals={"demand": 900, "risk": 600, "supply": 3600})
+    run_cycle(scheduler)
+    refreshed = scheduler.last_refreshed("risk", GRID[0])
+    due = Counter(source for source, _ in scheduler._due(refreshed + 700))
+    assert due == {"risk": 1}
+    due = Counter(source for source, _ in scheduler._due(refreshed + 1000))
+    assert due == {"risk": 1, "demand": len(GRID)}
+
+
+def test_a_fetch_outside_the_prefetcher_counts_as_a_refresh(calls):
+    cache = SignalCache()
+    scheduler = prefetch.PrefetchScheduler(cache, GRID, interval=600)
+    assert scheduler.last_refreshed("demand", GRID[0]) is None
+    cache.fetch_and_store("demand", GRID[0], lambda: ["page fetch"])
+    assert scheduler.last_refreshed("demand", GRID[0]) == cache.stored_at("demand", GRID[0])
+    assert ("demand", GRID[0]) not in set(scheduler._due(cache.stored_at("demand", GRID[0]) + 1))
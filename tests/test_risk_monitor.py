@@ -0,0 +1,68 @@
+import pytest
+
+risk_monitor = pytest.importorskip("risk_monitor")
+from risk_monitor import RiskMonitor, classify, entry_key
+
+RSS = """<?xml version="1.0"?><rss version="2.0"><channel><title>feed</title>{}</channel></rss>"""
+ITEM = "<item><title>{}</title><link>https://example.org/{}</link><pubDate>{}</pubDate></item>"
+
+
+def rss(*items):
+    return RSS.format("".join(ITEM.format(title, i, date) for i, (title, date) in enumerate(items))).encode()
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code, self.content, self.headers = status_code, content, headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses  # url -> list of responses, served in order
+        self.sent = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.sent.append((url, headers))
+        return self.responses[url].pop(0)
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    return RiskMonitor(feeds=["http://a.test/rss", "http://b.test/rss"], path=str(tmp_path / "risk.sqlite"))
+
+
+def test_classify_matches_whole_words():
+    assert classify(["EU bans steel imports", "Relief for exporters extended", "Bank taxonomy update",
+                     "New anti-dumping duty on yarn"]) == ["High", "Low", "Medium", "High"]
+
+
+def test_entry_key_ignores_case_and_punctuation():
+    assert entry_key("CBAM: new rules!") == entry_key("cbam new rules")
+
+
+def test_poll_dedupes_across_feeds_and_revalidates(monitor):
+    feed = rss(("CBAM: new rules", "Mon, 01 Jan 2024 10:00:00 GMT"),
+               ("EU bans steel", "Tue, 02 Jan 2024 10:00:00 GMT"))
+    session = FakeSession({
+        "http://a.test/rss": [FakeResponse(200, feed, {"ETag": '"a1"'}), FakeResponse(304)],
+        "http://b.test/rss": [FakeResponse(200, rss(("cbam new rules", "Mon, 01 Jan 2024 10:00:00 GMT"))),
+                              FakeResponse(200, rss(("cbam new rules", "Mon, 01 Jan 2024 10:00:00 GMT")))],
+    })
+    assert monitor.poll(session, timeout=1) == 2
+    assert [row[3] for row in monitor.recent()] == ["High", "Medium"]  # Newest first
+
+    assert monitor.poll(session, timeout=1) == 0  # Unchanged feed and an already stored story
+    assert ("http://a.test/rss", {"If-None-Match": '"a1"'}) in session.sent
+    assert monitor.count() == 2
+
+
+def test_poll_raises_only_when_every_feed_fails(monitor):
+    session = FakeSession({"http://a.test/rss": [FakeResponse(500), FakeResponse(500)],
+                           "http://b.test/rss": [FakeResponse(200, rss(("Relief extended", ""))), FakeResponse(503)]})
+    assert monitor.poll(session, timeout=1) == 1
+    with pytest.raises(RuntimeError):
+        monitor.poll(session, timeout=1)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pandas as pd
+
+from signal_cache import FRESH, STALE, SignalCache
+
+
+def test_get_reports_fresh_then_stale_then_miss(monkeypatch):
+    cache = SignalCache(default_ttl=10, stale_ttl=20)
+    now = 1000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.put("demand", ("DE", "1"), [1])
+    assert cache.get("demand", ("DE", "1")) == ([1], FRESH)
+    now += 15
+    assert cache.get("demand", ("DE", "1")) == ([1], STALE)
+    now += 20
+    assert cache.get("demand", ("DE", "1")) == (None, None)
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = SignalCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return [{"Buyer": "A"}]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch_and_store("demand", (), fetch)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [[{"Buyer": "A"}]] * 8
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_failed_fetch_is_raised_to_every_waiter_and_not_cached():
+    cache = SignalCache()
+
+    def fetch():
+        time.sleep(0.1)
+        raise ValueError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.fetch_and_store("risk", (), fetch)
+        except ValueError:
+            errors.append(1)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert cache.get("risk", ()) == (None, None)
+
+
+def test_callers_get_private_copies():
+    cache = SignalCache()
+    value = cache.fetch_and_store("demand", (), lambda: [{"Buyer": "A"}])
+    value[0]["Buyer"] = "changed"
+    cache.get("demand", ())[0].append({"Buyer": "B"})
+    cache.put("supply", (), pd.DataFrame({"Competitor": ["China"]}))
+    supply, _ = cache.get("supply", ())
+    supply.loc[0, "Competitor"] = "changed"
+
+    assert cache.get("demand", ())[0] == [{"Buyer": "A"}]
+    assert cache.get("supply", ())[0]["Competitor"].tolist() == ["China"]
@@ -0,0 +1,110 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from tender_store import TenderStore, iter_new_tenders
+
+
+def day(offset):
+    return (date.today() - timedelta(days=offset)).isoformat()
+
+
+def tender(tender_id, published, deadline=None):
+    return {"id": tender_id, "title": f"Tender {tender_id}", "buyer": {"name": "Buyer"},
+            "value": {"amount": 1000}, "date": published, "bidDeadline": deadline}
+
+
+class FakeSession:
+    """Serves `tenders` (newest first) through opentender's paginated search."""
+
+    def __init__(self, tenders):
+        self.tenders = tenders
+        self.pages = []
+
+    def post(self, url, json, timeout):
+        self.pages.append(json["page"])
+        start = (json["page"] - 1) * json["limit"]
+        data = self.tenders[start:start + json["limit"]]
+        return FakeResponse({"data": data})
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TenderStore(str(tmp_path / "tenders.sqlite"))
+
+
+def test_incremental_sync_stops_at_stored_tenders(store):
+    history = [tender(str(i), day(i)) for i in range(250)]
+    first = FakeSession(history[50:])
+    store.sync(first, "url", "DE", "42000000", timeout=1, window_days=1000)
+    assert store.count("DE", "42000000") == 200
+
+    second = FakeSession(history)
+    assert store.sync(second, "url", "DE", "42000000", timeout=1, window_days=1000) == 50
+    assert second.pages == [1, 2]  # Page 2 holds nothing newer, so paging stops there
+    assert store.count("DE", "42000000") == 250
+
+
+def test_first_sync_is_bounded_by_the_window(store):
+    session = FakeSession([tender(str(i), day(i)) for i in range(1000)])
+    store.sync(session, "url", "DE", "42000000", timeout=1, window_days=30)
+    assert store.count("DE", "42000000") == 31
+    assert session.pages == [1]
+
+
+def test_tender_matching_several_markets_is_stored_in_each(store):
+    shared = [tender("T1", day(1))]
+    store.sync(FakeSession(shared), "url", "DE", "42000000", timeout=1)
+    store.sync(FakeSession(shared), "url", "FR", "42000000", timeout=1)
+    assert store.count("DE", "42000000") == store.count("FR", "42000000") == 1
+
+
+def test_resync_updates_amended_fields(store):
+    store.upsert([tender("T1", day(1))], "DE", "42000000")
+    amended = dict(tender("T1", day(1)), title="Amended")
+    assert store.upsert([amended], "DE", "42000000") == 0
+    assert store.recent("DE", "42000000")[0][2] == "Amended"
+
+
+def test_active_count_excludes_expired_tenders(store):
+    store.upsert([tender("open", day(5), deadline=day(-10)), tender("closed", day(5), deadline=day(1)),
+                  tender("unknown", day(5))], "DE", "42000000")
+    assert store.count_active("DE", "42000000", date.today().isoformat()) == 2
+
+
+def test_new_leads_count_by_publication_date_not_insert_time(store):
+    store.upsert([tender("old", day(40)), tender("new", day(0))], "DE", "42000000")
+    assert store.count_published_since("DE", "42000000", day(1)) == 1
+
+
+def test_stores_keyed_by_id_alone_are_migrated(tmp_path):
+    path = str(tmp_path / "tenders.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tenders (id TEXT PRIMARY KEY, country TEXT NOT NULL, cpv TEXT NOT NULL, buyer TEXT, "
+                 "title TEXT, amount REAL, deadline TEXT, published TEXT, first_seen REAL NOT NULL, "
+                 "updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO tenders VALUES ('T1', 'DE', '42000000', 'B', 'T', 1, '', '', 0, 0)")
+    conn.commit()
+    conn.close()
+
+    store = TenderStore(path)
+    assert store.count("DE", "42000000") == 1
+    store.upsert([tender("T1", day(1))], "FR", "42000000")
+    assert store.count("FR", "42000000") == 1
+
+
+def test_iter_new_tenders_stops_before_the_window():
+    pages = [[tender("a", "2024-03-02"), tender("b", "2024-02-01")], [tender("c", "2024-01-01")]]
+    assert [t["id"] for t in iter_new_tenders(iter(pages), None, oldest="2024-02-15")] == ["a"]
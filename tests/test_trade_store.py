@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from trade_store import USD_TO_EUR, TradeFlowStore
+
+HEADER = "cmdCode,reporterISO,partnerISO,period,primaryValue,netWgt,flowCode\n"
+ROWS_2023 = [
+    ("848180", "DEU", "CHN", 2023, 600, 60),
+    ("848180", "DEU", "IND", 2023, 200, 25),
+    ("848180", "DEU", "TUR", 2023, 200, 20),
+    ("848210", "DEU", "CHN", 2023, 100, 10),
+    ("848180", "DEU", "W00", 2023, 1000, 105),  # World total: dropped, the rollup is computed
+    ("848180", "DEU", "CHN", 2023, 999, 99, "X"),  # Re-export: dropped
+    ("8481", "DEU", "CHN", 2023, 999, 99),  # Not HS6: dropped
+    ("520100", "FRA", "IND", 2023, 50, 5),
+]
+ROWS_2024 = [
+    ("848180", "DEU", "CHN", 2024, 500, 50),
+    ("848180", "DEU", "IND", 2024, 400, 40),
+    ("848180", "DEU", "TUR", 2024, 100, 10),
+]
+
+
+def write_csv(path, rows):
+    lines = [",".join(map(str, row + ("M",) if len(row) == 6 else row)) for row in rows]
+    path.write_text(HEADER + "\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TradeFlowStore(path=str(tmp_path / "flows"))
+    store.import_csv([write_csv(tmp_path / "2023.csv", ROWS_2023), write_csv(tmp_path / "2024.csv", ROWS_2024)])
+    return store
+
+
+def test_import_keeps_hs6_import_flows_by_partner(store):
+    assert len(store.flows["hs"]) == 8
+    assert store.dims["hs"] == ["520100", "848180", "848210"]
+    assert "W00" not in store.dims["partner"]
+
+
+def test_import_demand_sums_every_partner_per_period(store):
+    demand = store.import_demand("8481", "DE")
+    assert demand["Period"].tolist() == [2023, 2024]
+    assert demand["Value"].tolist() == pytest.approx([1000 * USD_TO_EUR, 1000 * USD_TO_EUR])
+    assert demand["Volume"].tolist() == [105, 100]
+    assert store.import_demand("848210", "DEU")["Value"].tolist() == pytest.approx([100 * USD_TO_EUR])
+    assert store.import_demand("8481", "JP").empty
+
+
+def test_competitor_gap_reports_share_change_and_unit_price(store):
+    gap = store.competitor_gap("848180", "DE", top=2).set_index("Competitor")
+    assert list(gap.index) == ["China", "India"]
+    assert gap.loc["China", "Market_Share_Trend"] == -10.0
+    assert gap.loc["India", "Market_Share_Trend"] == 20.0
+    assert gap.loc["India", "Avg_Unit_Price_EUR"] == round(10 * USD_TO_EUR, 2)
+
+
+def test_focus_partner_is_always_included(store):
+    gap = store.competitor_gap("848180", "DE", top=1, focus="TUR")
+    assert gap["Competitor"].tolist() == ["China", "Turkey"]
+
+
+def test_reimporting_a_file_replaces_instead_of_adding(store, tmp_path):
+    before = store.import_demand("8481", "DE")
+    store.import_csv([write_csv(tmp_path / "again.csv", ROWS_2024)])
+    pd.testing.assert_frame_equal(store.import_demand("8481", "DE"), before)
+    assert len(store.flows["hs"]) == 8
+
+
+def test_a_revised_file_replaces_only_its_reporter_periods(store, tmp_path):
+    revised = [("848180", "DEU", "CHN", 2024, 300, 30), ("848180", "DEU", "VNM", 2024, 100, 10)]
+    store.import_csv([write_csv(tmp_path / "revised.csv", revised)])
+    demand = store.import_demand("8481", "DE")
+    assert demand["Value"].tolist() == pytest.approx([1000 * USD_TO_EUR, 400 * USD_TO_EUR])
+    assert store.import_demand("52", "FR")["Value"].tolist() == pytest.approx([50 * USD_TO_EUR])
+    reopened = TradeFlowStore(path=store.path)
+    assert reopened.competitor_gap("848180", "DE")["Competitor"].tolist()[:2] == ["China", "Vietnam"]